@@ -0,0 +1,377 @@
+"""
+Пакетная обработка файлов из командной строки (без графического интерфейса)
+
+Примеры:
+    python batch.py save --format pdf-jpeg --dpi 150 --quality 60 -o out in_dir
+    python batch.py save --singles --profile fast -o out big.pdf
+    python batch.py censore --no-qr -j 4 -r -o out in_dir
+    python batch.py tables --simple file1.pdf file2.pdf
+    python batch.py registry --qr -o out in_dir
+"""
+
+import logging
+import multiprocessing
+import os
+import sys
+from argparse import ArgumentParser
+from argparse import RawTextHelpFormatter
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+from PySide2.QtWidgets import QMessageBox
+
+import const
+from exportpd import export_pd
+from parallelpd import get_workers_count
+from params import FileFormat
+from params import PageMode
+from params import SaveParams
+from params import SaveProfile
+from qrdecode import get_qr_stats
+from qrdecode import reset_qr_stats
+from savepdf import SaveDocument
+from savepdf import saveas_process
+from tableanalize import parse_tables
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# настройка обработчика и форматировщика для logger
+handler = logging.FileHandler(os.path.join(os.path.dirname(__file__), 'log.log'))
+handler.setFormatter(logging.Formatter('%(name)s %(asctime)s %(levelname)s %(message)s'))
+logger.addHandler(handler)
+
+
+# Коды завершения программы
+EXIT_OK = 0  # все файлы обработаны успешно
+EXIT_FAILED = 1  # при обработке части файлов возникли ошибки
+EXIT_USAGE = 2  # неверные аргументы командной строки или нет файлов для обработки
+
+# Соответствие значений аргумента --format форматам файлов
+FORMATS = {
+    'pdf': FileFormat.FMT_PDF,
+    'pdf-jpeg': FileFormat.FMT_PDF_JPEG,
+    'jpeg': FileFormat.FMT_JPEG,
+    'png': FileFormat.FMT_PNG,
+}
+
+# Соответствие значений аргумента --profile профилям сохранения файлов PDF
+PROFILES = {
+    'fast': SaveProfile.SP_FAST,
+    'balanced': SaveProfile.SP_BALANCED,
+    'smallest': SaveProfile.SP_SMALLEST,
+}
+
+
+class BatchError(Exception):
+    """Исключение, инициируемое при ошибке обработки файла в пакетном режиме"""
+
+
+def _overwrite_msg(is_overwrite: bool):
+    """Создание callback функции с ответом на вопрос о перезаписи существующего файла"""
+
+    def callback(filename: str):
+        # Без разрешения на перезапись прекращаем обработку документа
+        if is_overwrite:
+            return QMessageBox.StandardButton.YesToAll
+        logger.error('Файл уже существует: %s', filename)
+        return QMessageBox.StandardButton.Cancel
+
+    return callback
+
+
+def _raise_error(e: BaseException):
+    """Callback функция вывода сообщения об ошибке (в пакетном режиме обработка файла прекращается,
+    а ошибка попадает в отчет)
+    """
+    raise e
+
+
+def _get_outfile(filename: str, output_dir: str, ext: str, is_overwrite: bool) -> str:
+    """Формирование имени файла результата с проверкой на совпадение с исходным и существование
+
+    Args:
+        filename (str): имя исходного файла
+        output_dir (str): каталог для результатов (пустая строка - каталог исходного файла)
+        ext (str): расширение файла результата
+        is_overwrite (bool): разрешение перезаписывать существующие файлы
+
+    Returns:
+        str: имя файла результата
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    outfile = os.path.join(output_dir or os.path.dirname(filename), stem + ext)
+
+    if os.path.abspath(outfile) == os.path.abspath(filename):
+        raise BatchError('Нельзя сохранять файл в самого себя')
+    if not is_overwrite and os.path.exists(outfile):
+        raise BatchError(f'Файл уже существует: {outfile}')
+
+    return outfile
+
+
+def _get_params(options) -> SaveParams:
+    """Формирование параметров сохранения из аргументов командной строки
+    (незаданные параметры - значения по умолчанию, сохраненные настройки окон программы не используются)
+    """
+    param = SaveParams(load_settings=False)
+
+    if options.command == 'censore':
+        # Деперсонификация сохраняется в своем формате (по умолчанию - PDF из изображений)
+        if options.format:
+            param.format_censore = FORMATS[options.format]
+        param.format = param.format_censore
+        param.censore_fio = not options.no_fio
+        param.censore_addr = not options.no_addr
+        param.censore_post = not options.no_post
+        param.censore_ipu = not options.no_ipu
+        param.censore_qr = not options.no_qr
+    elif options.format:
+        param.format = FORMATS[options.format]
+
+    if options.dpi:
+        param.dpi = options.dpi
+    if options.quality:
+        param.quality = options.quality
+    param.singles = options.singles
+    if options.profile:
+        param.profile = PROFILES[options.profile]
+
+    if options.pages:
+        param.pgmode = PageMode.PG_RANGE
+        param.pgrange = options.pages
+    else:
+        param.pgmode = PageMode.PG_ALL
+
+    # Если файлы обрабатываются параллельно, то страницы каждого файла обрабатываются последовательно
+    if options.parallel_files:
+        param.workers = 1
+
+    return param
+
+
+def _save_file(filename: str, options) -> str:
+    """Сохранение файла (с деперсонификацией или без) в соответствии с параметрами
+
+    Returns:
+        str: имя файла результата
+    """
+    param = _get_params(options)
+    censore = options.command == 'censore'
+
+    # Если сохраняем в графический формат, либо стоит признак "разбивать по страницам",
+    # то результат - серия файлов {имя}-XXXX{ext}
+    if param.format in (FileFormat.FMT_JPEG, FileFormat.FMT_PNG) or param.singles:
+        ext = ['.pdf', '.jpg', '.png'][max(param.format.value - 1, 0)]
+        outfile = _get_outfile(filename, options.output_dir, '', True)
+    else:
+        ext = '.pdf'
+        outfile = _get_outfile(filename, options.output_dir, ext, options.overwrite)
+
+    source = SaveDocument.open(filename, options.password)
+    try:
+        page_ranges, ranges_page_count = param.get_pages_ranges(0, source.page_count)
+        if not ranges_page_count:
+            raise BatchError('Не задан список страниц')
+
+        res = saveas_process(
+            source=source,
+            page_ranges=page_ranges,
+            ranges_page_count=ranges_page_count,
+            outfile=outfile,
+            ext=ext,
+            param=param,
+            censore=censore,
+            overwrite_msg_callback=_overwrite_msg(options.overwrite),
+            show_error_msg_callback=_raise_error,
+            show_save_error_msg_callback=_raise_error,
+        )
+    finally:
+        source.close()
+
+    if not res:
+        raise BatchError('Не удалось сохранить файл')
+    return outfile
+
+
+def _export_file(filename: str, options) -> str:
+    """Экспорт табличных данных или реестра ПД в XLSX
+
+    Returns:
+        str: имя файла результата
+    """
+    outfile = _get_outfile(filename, options.output_dir, '.xlsx', options.overwrite)
+
+    source = SaveDocument.open(filename, options.password)
+    try:
+        if options.command == 'tables':
+            res = parse_tables(source.doc, outfile, not options.simple) > 0
+        else:
+            res = export_pd(source.doc, outfile, source.filename, options.qr)
+    finally:
+        source.close()
+
+    if not res:
+        raise BatchError('Данные для экспорта не найдены')
+    return outfile
+
+
+def _process_file(filename: str, options) -> tuple:
+    """Обработка одного файла (выполняется в процессе-обработчике)
+
+    Returns:
+        tuple: (имя исходного файла, признак успеха, имя файла результата или текст ошибки)
+    """
+    # Отключаем режим small_glyph_heights при деперсонификации, т.к. с ним некорректно
+    # определяется положение "КУДА" и "ОТ КОГО". В остальных случаях он нужен для наилучшего
+    # распознания текстового слоя
+    fitz.TOOLS.set_small_glyph_heights(options.command != 'censore')
+    reset_qr_stats()
+
+    try:
+        if options.command in ('save', 'censore'):
+            outfile = _save_file(filename, options)
+        else:
+            outfile = _export_file(filename, options)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error(filename, exc_info=True)
+        return filename, False, str(e) or e.__class__.__name__
+
+    # Статистика распознавания QR кодов в файле (для подбора порогов отбора изображений)
+    stats = get_qr_stats()
+    if stats.images:
+        logger.info('%s: распознавание QR кодов - %s', filename, stats)
+
+    return filename, True, outfile
+
+
+def collect_files(paths: list, recursive: bool = False) -> list:
+    """Формирование списка файлов для обработки (каталоги заменяются содержащимися в них файлами
+    с подходящими расширениями)
+
+    Args:
+        paths (list): список файлов и каталогов
+        recursive (bool): обходить вложенные каталоги
+
+    Returns:
+        list: список имен файлов (без повторов)
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            files.extend(
+                os.path.join(root, name)
+                for name in sorted(names)
+                if os.path.splitext(name)[1].lower() in const.VALID_EXTENSIONS
+            )
+            if not recursive:
+                break
+
+    # Удаляем повторы с сохранением порядка
+    return list(dict.fromkeys(files))
+
+
+def run_batch(options) -> int:
+    """Обработка всех файлов в соответствии с аргументами командной строки
+
+    Returns:
+        int: код завершения программы
+    """
+    files = collect_files(options.paths, options.recursive)
+    if not files:
+        print('Нет файлов для обработки', file=sys.stderr)
+        return EXIT_USAGE
+
+    if options.output_dir:
+        os.makedirs(options.output_dir, exist_ok=True)
+
+    workers = min(get_workers_count(options.jobs), len(files))
+    options.parallel_files = workers > 1
+    failed = 0
+
+    def report(result: tuple):
+        nonlocal failed
+        filename, ok, message = result
+        if ok:
+            print(f'OK    {filename} -> {message}')
+        else:
+            failed += 1
+            print(f'ERROR {filename}: {message}', file=sys.stderr)
+
+    if workers == 1:
+        for filename in files:
+            report(_process_file(filename, options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(_process_file, files, [options] * len(files)):
+                report(result)
+
+    print(f'Обработано файлов: {len(files) - failed}, ошибок: {failed}')
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+def _create_parser() -> ArgumentParser:
+    """Создание разборщика аргументов командной строки"""
+    parser = ArgumentParser(description="Mini PDF Tools - batch mode", formatter_class=RawTextHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    # Общие аргументы всех команд
+    common = ArgumentParser(add_help=False)
+    common.add_argument('paths', help='The file(s) or directory(ies) to process', nargs='+', type=str)
+    common.add_argument('-o', '--output-dir', help='Output directory (default: next to the source file)', default='')
+    common.add_argument('-r', '--recursive', help='Process subdirectories', action='store_true')
+    common.add_argument('-j', '--jobs', help='Number of parallel processes (0 - one per CPU core)', type=int, default=0)
+    common.add_argument('--password', help='Password for encrypted files', default='')
+    common.add_argument('--overwrite', help='Overwrite existing output files', action='store_true')
+
+    # Аргументы команд сохранения (соответствуют SaveParams)
+    saving = ArgumentParser(add_help=False)
+    saving.add_argument('--format', help='Output format', choices=list(FORMATS))
+    saving.add_argument('--dpi', help='Resolution of rasterized pages', type=int)
+    saving.add_argument('--quality', help='JPEG quality (1-100)', type=int, choices=range(1, 101), metavar='1-100')
+    saving.add_argument('--pages', help='Page ranges, e.g. "1-3,5,8-" (default: all pages)', default='')
+    saving.add_argument('--singles', help='Save each page to a separate file', action='store_true')
+    saving.add_argument('--profile', help='PDF compression profile (speed vs file size)', choices=list(PROFILES))
+
+    commands.add_parser('save', parents=[common, saving], help='Save files in another format')
+
+    censore = commands.add_parser('censore', parents=[common, saving], help='Save depersonalized files')
+    censore.add_argument('--no-fio', help='Do not hide full names', action='store_true')
+    censore.add_argument('--no-addr', help='Do not hide addresses', action='store_true')
+    censore.add_argument('--no-post', help='Do not hide postal addresses', action='store_true')
+    censore.add_argument('--no-ipu', help='Do not hide meter readings', action='store_true')
+    censore.add_argument('--no-qr', help='Do not hide QR codes', action='store_true')
+
+    tables = commands.add_parser('tables', parents=[common], help='Export tables to XLSX')
+    tables.add_argument('--simple', help='Simple split into rows and columns', action='store_true')
+
+    registry = commands.add_parser('registry', parents=[common], help='Export payment documents registry to XLSX')
+    registry.add_argument('--qr', help='Recognize QR codes', action='store_true')
+
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """Точка входа пакетного режима
+
+    Returns:
+        int: код завершения программы
+    """
+    options = _create_parser().parse_args(argv)
+    if options.jobs < 0:
+        print('Количество процессов не может быть отрицательным', file=sys.stderr)
+        return EXIT_USAGE
+    return run_batch(options)
+
+
+if __name__ == "__main__":
+    # Необходимо для работы пула процессов в собранном (frozen) приложении под Windows
+    multiprocessing.freeze_support()
+
+    sys.exit(main())
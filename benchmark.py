@@ -0,0 +1,276 @@
+"""
+Замеры производительности отдельных операций обработки документов
+
+Примеры:
+    python benchmark.py censore --dpi 300 --rects 50
+    python benchmark.py save --singles file.pdf
+    python benchmark.py qr registry.pdf
+"""
+
+import io
+import os
+import random
+import tempfile
+import time
+from argparse import ArgumentParser
+from argparse import RawTextHelpFormatter
+
+import fitz
+from PIL import Image as PILImage
+from PIL import ImageOps
+from PySide2.QtWidgets import QMessageBox
+from pyzbar.pyzbar import decode
+from pyzbar.wrapper import ZBarSymbol
+
+from censorepd import censore_img
+from censorepd import censore_pixmap
+from params import FileFormat
+from params import PageMode
+from params import SaveParams
+from params import SaveProfile
+from qrdecode import QR_DOWNSCALE_SIDE
+from qrdecode import QR_MAX_ASPECT
+from qrdecode import QR_MAX_BPC
+from qrdecode import QR_MIN_SIDE
+from qrdecode import QrCodeCache
+from qrdecode import QrDetectParams
+from qrdecode import pixmap_to_gray
+from savepdf import SaveDocument
+from savepdf import saveas_process
+
+
+def _measure(func, repeat: int) -> float:
+    """Среднее время выполнения функции (сек.)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def _report(title: str, seconds: float, base: float = 0.0):
+    """Вывод результата замера (с ускорением относительно base, если он задан)"""
+    speedup = f'  x{base / seconds:.1f}' if base else ''
+    print(f'{title:<40} {seconds * 1000:10.2f} ms{speedup}')
+
+
+def _make_page(doc):
+    """Создание тестовой страницы с цветным содержимым"""
+    page = doc.new_page()
+    for k in range(30):
+        color, fill = (k / 30, 0, 1 - k / 30), (0.1 * (k % 10), 0.5, 0.2)
+        page.draw_circle((100 + k * 15, 300 + k * 10), 50 + k, color=color, fill=fill)
+    page.insert_text((50, 80), 'Mini PDF Tools benchmark', fontsize=24)
+    return page
+
+
+def bench_censore(options):
+    """Сравнение пикселизации/заливки через PIL (censore_img) и NumPy (censore_pixmap)"""
+    doc = fitz.open()
+    page = _make_page(doc)
+    zoom = options.dpi / 72
+    mat = fitz.Matrix(zoom, zoom)
+    pixelator = options.dpi // 20
+
+    # Случайные области размером примерно с ФИО/адрес на платежном документе
+    rnd = random.Random(0)
+    rects = []
+    for _ in range(options.rects):
+        x0, y0 = rnd.uniform(0, page.rect.width - 200), rnd.uniform(0, page.rect.height - 40)
+        rects.append(fitz.Rect(x0, y0, x0 + rnd.uniform(50, 200), y0 + rnd.uniform(10, 40)) * mat)
+
+    print(f'Страница {options.dpi} DPI, областей: {len(rects)}, повторов: {options.repeat}')
+
+    # Рендер страницы одинаков для обоих вариантов, поэтому замеряется отдельно
+    pix = page.get_pixmap(matrix=mat)
+    _report('рендер страницы', _measure(lambda: page.get_pixmap(matrix=mat), options.repeat))
+
+    for mode, title in ((1, 'пикселизация'), (2, 'заливка')):
+
+        def with_pil():
+            img = PILImage.frombytes('RGB', (pix.width, pix.height), pix.samples)
+            for rect in rects:
+                censore_img(img, fitz.Rect(rect), pixelator, mode)  # pylint: disable=cell-var-from-loop
+            return fitz.Pixmap(fitz.csRGB, img.size[0], img.size[1], img.tobytes())
+
+        def with_numpy():
+            # Обработка идет на месте, поэтому работаем с копией изображения
+            result = fitz.Pixmap(pix)
+            censore_pixmap(result, rects, pixelator, mode)  # pylint: disable=cell-var-from-loop
+            return result
+
+        base = _measure(with_pil, options.repeat)
+        _report(f'{title}: PIL (censore_img)', base)
+        _report(f'{title}: NumPy (censore_pixmap)', _measure(with_numpy, options.repeat), base)
+
+
+def _get_size(path: str) -> int:
+    """Суммарный размер файлов в каталоге (байт)"""
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def bench_save(options):
+    """Сравнение профилей сохранения файлов PDF: время сохранения и размер результата"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = options.file
+        if not filename:
+            # Тестовый документ из одинаковых страниц
+            filename = os.path.join(tmpdir, 'source.pdf')
+            doc = fitz.open()
+            for _ in range(options.pages):
+                _make_page(doc)
+            doc.save(filename)
+            doc.close()
+
+        source = SaveDocument.open(filename)
+        page_count = source.page_count
+        mode = 'по одной странице' if options.singles else 'одним файлом'
+        print(f'Страниц: {page_count}, сохранение {mode}, повторов: {options.repeat}')
+
+        param = SaveParams()
+        param.format = FileFormat.FMT_PDF
+        # Все страницы задаются диапазоном, иначе файл сохраняется инкрементально (без учета профиля)
+        param.pgmode = PageMode.PG_RANGE
+        param.pgrange = '-'
+        param.singles = options.singles
+        page_ranges, ranges_page_count = param.get_pages_ranges(0, page_count)
+        # При сохранении по одной странице к имени добавляются номер страницы и расширение
+        outname = 'out' if options.singles else 'out.pdf'
+
+        # Ускорение считается относительно профиля с минимальным размером файла
+        base = 0.0
+        for profile in reversed(SaveProfile):
+            param.profile = profile
+            outdir = os.path.join(tmpdir, profile.name)
+            os.mkdir(outdir)
+
+            def save():
+                saveas_process(
+                    source,
+                    page_ranges,
+                    ranges_page_count,
+                    os.path.join(outdir, outname),  # pylint: disable=cell-var-from-loop
+                    '.pdf',
+                    param,
+                    False,
+                    overwrite_msg_callback=lambda _: QMessageBox.StandardButton.YesToAll,
+                )
+
+            seconds = _measure(save, options.repeat)
+            base = base or seconds
+            _report(f'{profile.name} ({_get_size(outdir) / 1024:.0f} KB)', seconds, base)
+
+        source.close()
+
+
+def _make_registry(filename: str, pages: int, size: int):
+    """Создание тестового реестра: на каждой странице свое изображение size x size в градациях серого
+    (как QR код платежного документа) и общий для всех страниц цветной логотип
+    """
+    logo = io.BytesIO()
+    PILImage.effect_noise((200, 80), 64).convert('RGB').save(logo, 'PNG')
+
+    doc = fitz.open()
+    logo_xref = 0
+    for _ in range(pages):
+        page = _make_page(doc)
+        if logo_xref:
+            page.insert_image(fitz.Rect(400, 20, 550, 80), xref=logo_xref)
+        else:
+            logo_xref = page.insert_image(fitz.Rect(400, 20, 550, 80), stream=logo.getvalue())
+        code = io.BytesIO()
+        PILImage.effect_noise((size, size), 128).save(code, 'PNG')
+        page.insert_image(fitz.Rect(400, 650, 550, 800), stream=code.getvalue())
+    doc.save(filename, garbage=1, deflate=True)
+    doc.close()
+
+
+def bench_qr(options):
+    """Сравнение способов подготовки встроенных изображений для распознавания QR кодов:
+    через PNG и PIL (как раньше) и напрямую из пикселей pixmap, а также распознавания с отбором
+    изображений, уменьшением и кэшем (со статистикой для подбора порогов)
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = options.file
+        if not filename:
+            filename = os.path.join(tmpdir, 'registry.pdf')
+            _make_registry(filename, options.pages, options.size)
+
+        doc = fitz.open(filename)
+        images = [docimg for pno in range(len(doc)) for docimg in doc.get_page_images(pno)]
+        xrefs = [docimg[0] for docimg in images]
+        print(f'Страниц: {len(doc)}, изображений: {len(xrefs)} (разных: {len(set(xrefs))}), повторов: {options.repeat}')
+
+        def with_png():
+            images = []
+            for xref in xrefs:
+                img = PILImage.open(io.BytesIO(fitz.Pixmap(doc, xref).tobytes()))
+                if img.getpixel(xy=(0, 0)) == 0:
+                    img = ImageOps.invert(img)
+                images.append(img)
+            return images
+
+        def with_samples():
+            return [pixmap_to_gray(fitz.Pixmap(doc, xref)) for xref in xrefs]
+
+        base = _measure(with_png, options.repeat)
+        _report('подготовка: PNG + PIL', base)
+        _report('подготовка: пиксели pixmap', _measure(with_samples, options.repeat), base)
+
+        base = _measure(lambda: [decode(img, [ZBarSymbol.QRCODE]) for img in with_png()], options.repeat)
+        _report('распознавание: PNG + PIL', base)
+        _report(
+            'распознавание: пиксели pixmap',
+            _measure(lambda: [decode(img, [ZBarSymbol.QRCODE]) for img in with_samples()], options.repeat),
+            base,
+        )
+
+        detect_params = QrDetectParams(options.min_side, options.max_aspect, options.max_bpc, options.downscale)
+        cache = None
+
+        def with_cache():
+            nonlocal cache
+            cache = QrCodeCache(detect_params=detect_params)
+            return [cache.decode(doc, docimg) for docimg in images]
+
+        _report('распознавание: отбор + уменьшение + кэш', _measure(with_cache, options.repeat), base)
+        print(cache.stats)
+        doc.close()
+
+
+def _create_parser() -> ArgumentParser:
+    """Создание разборщика аргументов командной строки"""
+    parser = ArgumentParser(description="Mini PDF Tools - benchmarks", formatter_class=RawTextHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    censore = commands.add_parser('censore', help='Pixelation and white fill of page regions')
+    censore.add_argument('--dpi', help='Page resolution', type=int, default=300)
+    censore.add_argument('--rects', help='Number of regions on the page', type=int, default=50)
+    censore.add_argument('--repeat', help='Number of repetitions', type=int, default=10)
+    censore.set_defaults(func=bench_censore)
+
+    save = commands.add_parser('save', help='Time and output size of PDF save profiles')
+    save.add_argument('file', help='PDF file to save (default: generated document)', nargs='?', default='')
+    save.add_argument('--pages', help='Number of pages of the generated document', type=int, default=200)
+    save.add_argument('--singles', help='Save each page to a separate file', action='store_true')
+    save.add_argument('--repeat', help='Number of repetitions', type=int, default=3)
+    save.set_defaults(func=bench_save)
+
+    qr = commands.add_parser('qr', help='Preparing embedded images for QR code recognition')
+    qr.add_argument('file', help='PDF registry file (default: generated document)', nargs='?', default='')
+    qr.add_argument('--pages', help='Number of pages of the generated document', type=int, default=100)
+    qr.add_argument('--size', help='Size of QR code images of the generated document', type=int, default=400)
+    qr.add_argument('--repeat', help='Number of repetitions', type=int, default=3)
+    qr.add_argument('--min-side', help='Minimum image side', type=int, default=QR_MIN_SIDE)
+    qr.add_argument('--max-aspect', help='Maximum image aspect ratio', type=float, default=QR_MAX_ASPECT)
+    qr.add_argument('--max-bpc', help='Maximum bits per component', type=int, default=QR_MAX_BPC)
+    qr.add_argument(
+        '--downscale', help='Image side to downscale to first (0 - no downscaling)', type=int, default=QR_DOWNSCALE_SIDE
+    )
+    qr.set_defaults(func=bench_qr)
+
+    return parser
+
+
+if __name__ == "__main__":
+    args = _create_parser().parse_args()
+    args.func(args)
@@ -2,20 +2,24 @@
 Этот файл содержит функции для обработки деперсонификации ПД
 """
 
-import io
+import ctypes
 import logging
 import os
 import re
+from contextlib import closing
 from itertools import groupby
 
 import fitz
+import numpy as np
 from PIL import Image as PILImage
 from PIL import ImageDraw
-from PIL import ImageOps
-from pyzbar.pyzbar import decode
-from pyzbar.wrapper import ZBarSymbol
 
+from parallelpd import PARALLEL_MIN_PAGES
+from parallelpd import get_workers_count
+from parallelpd import map_pages
 from params import SaveParams
+from qrdecode import decode_image_qr
+from textcache import get_page_words
 
 
 # Настраиваем логирование
@@ -59,40 +63,15 @@ def censore_page(doc, pno: int, param: SaveParams, add_selection_callback=None):
         #             "внешние" координаты страницы PDF
         _, transform = page.get_image_bbox(docimg, transform=True)
 
-        # Выделяем изображение и запихиваем его в PIL
-
-        # Перестало работать в версии PyMuPDF-1.22.0...
-        # image = doc.extract_image(docimg[0])
-
-        # Вариант для версии PyMuPDF-1.22.0...
-        pix = fitz.Pixmap(doc, docimg[0])
-        temp = io.BytesIO(pix.tobytes())
-
-        # Загружаем картинку в Pillow
-        img = PILImage.open(temp)
-
-        # Левый верхний пиксель изображения черный??? Тогда инвертируем цвета
-        if img.getpixel(xy=(0, 0)) == 0:
-            img = ImageOps.invert(img)
-
-        # Распознаем QR коды
-        decocde_qr = decode(img, [ZBarSymbol.QRCODE])
-
-        # Обходим все распознанные QR коды
-        for qr_obj in decocde_qr:
-            txt = qr_obj.data.decode('utf-8')
+        # Распознаем QR коды (одинаковые изображения распознаются только один раз)
+        for txt, (left, top, width, height) in decode_image_qr(doc, docimg):
             # Это банковский QR код?
             if txt.startswith('ST00012|'):
                 if not qr_txt:  # сохраняем первый попавшийся
                     qr_txt = txt
 
                 # Расширяем границы QR (в исходных координатах изображения)
-                r = fitz.Rect(
-                    qr_obj.rect.left,
-                    qr_obj.rect.top,
-                    qr_obj.rect.left + qr_obj.rect.width,
-                    qr_obj.rect.top + qr_obj.rect.height,
-                ) + fitz.Rect(-3, -3, 4, 4)
+                r = fitz.Rect(left, top, left + width, top + height) + fitz.Rect(-3, -3, 4, 4)
 
                 # Переводим в координаты PDF
                 r = r * shrink * transform
@@ -128,7 +107,7 @@ def censore_page(doc, pno: int, param: SaveParams, add_selection_callback=None):
     hor_center = page.rect.height // 2
 
     # Получаем список слов на странице с их координатами
-    words = page.get_text("words")
+    words = get_page_words(doc, pno)
 
     # Переменные для fitz.Rect областей с соответствующими словами
     rect_ls = rect_period = rect_kuda = rect_kogo = None
@@ -278,10 +257,11 @@ def censore_page(doc, pno: int, param: SaveParams, add_selection_callback=None):
         mat = fitz.Matrix(zoom, zoom)  # матрица трансформирования для растеризации изображения
         pixelator = param.dpi // 20  # коэффициент пикселизации конфиденциальной информации
 
-        # Растеризуем страницу и запихиваем изображение в PIL
+        # Растеризуем страницу (участки замазываются прямо в pixmap)
         pix = page.get_pixmap(matrix=mat)
         pix.set_dpi(param.dpi, param.dpi)
-        img = PILImage.frombytes('RGB', (pix.width, pix.height), pix.samples)
+
+    censore_rects = []  # список участков изображения, которые необходимо замазать
 
     # Пробегаем по всем найденным областям
     for anon_rect in anon_rects:
@@ -296,20 +276,75 @@ def censore_page(doc, pno: int, param: SaveParams, add_selection_callback=None):
             continue
 
         # Трансформируем координаты в масштаб изображения
-        r = anon_rect[0] * page.rotation_matrix * mat
-        # Замазываем участок
-        censore_img(img, r, pixelator, param.censore)
+        censore_rects.append(anon_rect[0] * page.rotation_matrix * mat)
 
     # Если просто выделяем области, а не формируем картинку, выходим с None
     if param.setselectionsonly:
         return None
 
-    # Обратно конвертируем картинку в формат fitz.Pixmap и возвращаем...
-    samples = img.tobytes()
-    pix = fitz.Pixmap(fitz.csRGB, img.size[0], img.size[1], samples)
+    # Замазываем все участки разом
+    censore_pixmap(pix, censore_rects, pixelator, param.censore)
+
     return pix
 
 
+def find_censore_rects(doc, pno: int, param: SaveParams) -> list:
+    """Поиск областей с персональными данными на одной странице без ее растеризации
+    (в param должен быть установлен признак setselectionsonly)
+
+    Args:
+        doc (fitz doc): документ PDF
+        pno (int): индекс обрабатываемой страницы
+        param (SaveParams): параметры деперсонификации
+
+    Returns:
+        list: список найденных областей fitz.Rect
+    """
+    rects = []
+    censore_page(doc, pno, param, lambda _, rect: rects.append(rect))
+    return rects
+
+
+def find_pages_censore_rects(
+    doc,
+    filename: str,
+    psw: str,
+    is_real_file: bool,
+    pages: list,
+    param: SaveParams,
+    found: list,
+    progress_callback=None,
+):  # pylint: disable=too-many-arguments
+    """Поиск областей с персональными данными на нескольких страницах. Страницы реального файла
+    распределяются между процессами (каждый процесс сам открывает документ), результаты собираются
+    в порядке страниц
+
+    Args:
+        doc (fitz doc): документ PDF
+        filename (str): имя файла документа
+        psw (str): пароль к зашифрованному документу
+        is_real_file (bool): документ соответствует файлу на диске (иначе обработка идет в одном потоке)
+        pages (list): список индексов страниц
+        param (SaveParams): параметры деперсонификации (в том числе количество процессов)
+        found (list): список, в который добавляются найденные области (индекс страницы, fitz.Rect).
+                      При прерывании обработки в нем остаются области уже обработанных страниц
+        progress_callback: функция обновления прогресса
+    """
+    workers = min(get_workers_count(param.workers), len(pages))
+    if workers > 1 and is_real_file and len(pages) >= PARALLEL_MIN_PAGES:
+        # Повороты страниц, установленные в программе, процессы должны применить к своим документам
+        rotations = {pno: doc[pno].rotation for pno in pages}
+        results = map_pages(filename, psw, rotations, find_censore_rects, pages, (param,), workers)
+    else:
+        results = (find_censore_rects(doc, pno, param) for pno in pages)
+
+    with closing(results):
+        for ind, (pno, rects) in enumerate(zip(pages, results), 1):
+            found.extend((pno, rect) for rect in rects)
+            if progress_callback is not None:
+                progress_callback(ind * 100 // len(pages))
+
+
 def censore_img(img: PILImage.Image, rect, pixelator: int, mode: int = 1):
     """Замазать участок изображения
 
@@ -333,3 +368,70 @@ def censore_img(img: PILImage.Image, rect, pixelator: int, mode: int = 1):
         # Заливка белым
         draw = ImageDraw.Draw(img)
         draw.rectangle(rect, fill=(255, 255, 255, 0))
+
+
+def censore_pixmap(pix, rects: list, pixelator: int, mode: int = 1):
+    """Замазать участки растеризованной страницы на месте: пикселизация усреднением по блокам
+    или заливка белым выполняются средствами NumPy прямо в памяти pixmap
+
+    Args:
+        pix (fitz.Pixmap): изображение страницы
+        rects (list): список областей (fitz.Rect) для "деперсонификации" в координатах изображения
+                      (области обрезаются по границам изображения)
+        pixelator (int): коэффициент пикселизации (размер блока в пикселях)
+        mode (int, optional): режим 1-пикселизация, 2 или др.-заливка белым. По умолчанию 1.
+    """
+    if not rects:
+        return
+
+    pixels = _get_pixmap_array(pix)
+    pixelator = max(pixelator, 1)
+
+    for rect in rects:
+        # Заливка белым (как и в censore_img) включает в область правую и нижнюю границы
+        border = 0 if mode == 1 else 1
+        x0, y0 = max(int(rect.x0) - pix.x, 0), max(int(rect.y0) - pix.y, 0)
+        x1 = min(max(int(rect.x1) - pix.x + border, 0), pix.width)
+        y1 = min(max(int(rect.y1) - pix.y + border, 0), pix.height)
+
+        region = pixels[y0:y1, x0:x1]
+        if not region.size:
+            continue
+
+        if mode == 1:
+            _pixelate_array(region, pixelator)
+        else:
+            region[...] = 255
+
+
+def _get_pixmap_array(pix) -> np.ndarray:
+    """Массив NumPy (высота, ширина, компоненты цвета), работающий напрямую с памятью pixmap
+    (без копирования). Массив можно использовать, только пока существует pix
+    """
+    buffer = (ctypes.c_ubyte * (pix.stride * pix.height)).from_address(pix.samples_ptr)
+    return np.ndarray((pix.height, pix.width, pix.n), dtype=np.uint8, buffer=buffer, strides=(pix.stride, pix.n, 1))
+
+
+def _pixelate_array(region: np.ndarray, pixelator: int):
+    """Пикселизация участка изображения на месте: участок разбивается на блоки размером
+    примерно pixelator x pixelator, каждый блок заливается средним цветом своих пикселей
+    """
+    height, width = region.shape[:2]
+
+    # Границы блоков (блоки распределяются по участку равномерно)
+    rows_count, cols_count = max(height // pixelator, 1), max(width // pixelator, 1)
+    rows = [i * height // rows_count for i in range(rows_count + 1)]
+    cols = np.arange(cols_count) * width // cols_count
+    cols_size = np.diff(np.append(cols, width))
+
+    # Суммы компонент цвета по полосам блоков (по строкам полос суммируем сразу, это быстрее reduceat),
+    # затем по блокам внутри полос
+    sums = np.stack([region[y0:y1].sum(axis=0, dtype=np.uint32) for y0, y1 in zip(rows, rows[1:])])
+    sums = np.add.reduceat(sums, cols, axis=1)
+    rows_size = np.diff(rows)
+    means = (sums // np.outer(rows_size, cols_size)[:, :, None]).astype(np.uint8)
+
+    # Растягиваем средние значения по ширине полос и заливаем ими полосы
+    lines = np.repeat(means, cols_size, axis=1)
+    for line, y0, y1 in zip(lines, rows, rows[1:]):
+        region[y0:y1] = line
@@ -0,0 +1,129 @@
+"""
+Этот файл содержит класс журнала изменений документа (повороты страниц, добавление и удаление
+выделенных областей) с возможностью отмены и повтора изменений
+"""
+
+# Виды изменений документа
+CH_ROTATE = 0  # поворот страниц
+CH_ADD_SELECTIONS = 1  # добавление выделенных областей
+CH_REMOVE_SELECTIONS = 2  # удаление выделенных областей
+
+
+class Change:
+    """Запись журнала об одном изменении документа"""
+
+    def __init__(
+        self, kind: int, pages: list, angle: int = 0, items: list = None, current_page: int = -1
+    ):  # pylint: disable=too-many-arguments
+        """
+        Args:
+            kind (int): вид изменения (CH_ROTATE, CH_ADD_SELECTIONS, CH_REMOVE_SELECTIONS)
+            pages (list): индексы затронутых страниц (-1 - глобальные выделения, действующие на всех страницах)
+            angle (int): угол поворота страниц по часовой стрелке (для CH_ROTATE)
+            items (list): список (индекс в общем списке выделений, выделение), упорядоченный по индексу
+                          (для CH_ADD_SELECTIONS и CH_REMOVE_SELECTIONS)
+            current_page (int): текущая страница в момент изменения (при повороте страниц глобальные
+                                выделения трансформируются по ней)
+        """
+        self.kind = kind
+        self.pages = pages
+        self.angle = angle
+        self.items = items or []
+        self.current_page = current_page
+
+
+class ChangeJournal:
+    """Журнал изменений документа с момента его открытия. Хранит стеки отмены и повтора изменений
+    и позволяет определить страницы, затронутые изменениями (чтобы обрабатывать только их)
+    """
+
+    def __init__(self):
+        self._undo = []  # Примененные изменения (стек отмены)
+        self._redo = []  # Отмененные изменения (стек повтора)
+        self._rotations = {}  # Суммарный угол поворота страниц {индекс страницы: угол}
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    @property
+    def can_undo(self) -> bool:
+        """Признак наличия изменений для отмены"""
+        return bool(self._undo)
+
+    @property
+    def can_redo(self) -> bool:
+        """Признак наличия отмененных изменений для повтора"""
+        return bool(self._redo)
+
+    @property
+    def rotated_pages(self) -> set:
+        """Индексы страниц, положение которых отличается от исходного"""
+        return {pno for pno, angle in self._rotations.items() if angle}
+
+    @property
+    def selection_pages(self) -> set:
+        """Индексы страниц, на которых добавлялись или удалялись выделенные области
+        (-1 - изменялись глобальные выделения)
+        """
+        return {pno for change in self._undo if change.kind != CH_ROTATE for pno in change.pages}
+
+    @property
+    def dirty_pages(self) -> set:
+        """Индексы всех страниц, затронутых изменениями (-1 - изменялись глобальные выделения)"""
+        return self.rotated_pages | self.selection_pages
+
+    def clear(self):
+        """Очистка журнала (при открытии и закрытии документа)"""
+        self._undo.clear()
+        self._redo.clear()
+        self._rotations.clear()
+
+    @property
+    def referenced_selections(self) -> set:
+        """Выделенные области, которые упоминаются в изменениях, доступных для отмены или повтора"""
+        return {sel for change in self._undo + self._redo for _, sel in change.items}
+
+    def record(self, change: Change) -> list:
+        """Запись примененного изменения (отмененные изменения больше не могут быть повторены)
+
+        Returns:
+            list: отброшенные отмененные изменения
+        """
+        discarded = self._redo
+        self._undo.append(change)
+        self._redo = []
+        self._apply_rotation(change, 1)
+        return discarded
+
+    def undo(self):
+        """Отмена последнего изменения
+
+        Returns:
+            Change: отменяемое изменение (его необходимо откатить в документе) или None, если отменять нечего
+        """
+        if not self._undo:
+            return None
+        change = self._undo.pop()
+        self._redo.append(change)
+        self._apply_rotation(change, -1)
+        return change
+
+    def redo(self):
+        """Повтор последнего отмененного изменения
+
+        Returns:
+            Change: повторяемое изменение (его необходимо применить к документу) или None, если повторять нечего
+        """
+        if not self._redo:
+            return None
+        change = self._redo.pop()
+        self._undo.append(change)
+        self._apply_rotation(change, 1)
+        return change
+
+    def _apply_rotation(self, change: Change, direction: int):
+        """Учет поворота страниц в суммарных углах поворота (direction: 1 - применение, -1 - отмена)"""
+        if change.kind != CH_ROTATE:
+            return
+        for pno in change.pages:
+            self._rotations[pno] = (self._rotations.get(pno, 0) + direction * change.angle) % 360
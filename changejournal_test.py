@@ -0,0 +1,65 @@
+import unittest
+
+from changejournal import CH_ADD_SELECTIONS
+from changejournal import CH_REMOVE_SELECTIONS
+from changejournal import CH_ROTATE
+from changejournal import Change
+from changejournal import ChangeJournal
+
+
+class TestChangeJournal(unittest.TestCase):
+    def setUp(self):
+        self.journal = ChangeJournal()
+
+    def test_empty(self):
+        self.assertFalse(self.journal.can_undo)
+        self.assertFalse(self.journal.can_redo)
+        self.assertIsNone(self.journal.undo())
+        self.assertIsNone(self.journal.redo())
+        self.assertEqual(self.journal.dirty_pages, set())
+
+    def test_rotated_pages(self):
+        self.journal.record(Change(CH_ROTATE, [0, 1, 2], 90))
+        self.journal.record(Change(CH_ROTATE, [1], 270))
+        self.assertEqual(self.journal.rotated_pages, {0, 2})
+
+    def test_undo_redo_rotation(self):
+        change = Change(CH_ROTATE, [3], 180)
+        self.journal.record(change)
+        self.assertIs(self.journal.undo(), change)
+        self.assertEqual(self.journal.rotated_pages, set())
+        self.assertTrue(self.journal.can_redo)
+        self.assertIs(self.journal.redo(), change)
+        self.assertEqual(self.journal.rotated_pages, {3})
+
+    def test_selection_pages(self):
+        self.journal.record(Change(CH_ADD_SELECTIONS, [2], items=[(0, 'sel')]))
+        self.journal.record(Change(CH_REMOVE_SELECTIONS, [-1, 5], items=[(1, 'sel1'), (2, 'sel2')]))
+        self.assertEqual(self.journal.selection_pages, {-1, 2, 5})
+        self.journal.undo()
+        self.assertEqual(self.journal.dirty_pages, {2})
+
+    def test_record_clears_redo(self):
+        self.journal.record(Change(CH_ROTATE, [0], 90))
+        self.journal.undo()
+        self.journal.record(Change(CH_ADD_SELECTIONS, [0], items=[(0, 'sel')]))
+        self.assertFalse(self.journal.can_redo)
+        self.assertEqual(len(self.journal), 1)
+
+    def test_clear(self):
+        self.journal.record(Change(CH_ROTATE, [0], 90))
+        self.journal.clear()
+        self.assertFalse(self.journal.can_undo)
+        self.assertEqual(self.journal.rotated_pages, set())
+
+    def test_discarded_changes(self):
+        added = Change(CH_ADD_SELECTIONS, [0], items=[(0, 'sel')])
+        self.journal.record(added)
+        self.journal.undo()
+        self.assertEqual(self.journal.referenced_selections, {'sel'})
+        self.assertEqual(self.journal.record(Change(CH_ROTATE, [0], 90)), [added])
+        self.assertEqual(self.journal.referenced_selections, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
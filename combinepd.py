@@ -0,0 +1,202 @@
+"""
+Этот файл содержит функции для загрузки нескольких файлов перед их объединением в один документ PDF
+(файлы других форматов конвертируются в PDF параллельно в нескольких процессах)
+"""
+
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz
+
+from parallelpd import get_workers_count
+
+
+# Минимальное количество файлов, при котором имеет смысл запускать пул процессов
+PARALLEL_MIN_FILES = 4
+
+# Разрешение изображений, в которых оно не указано (так же считает MuPDF при конвертации)
+DEFAULT_IMAGE_DPI = 96
+
+# Сигнатура файла PNG
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Блоки PNG, влияющие на цвета изображения (цветовой профиль, гамма, прозрачность). При прямом встраивании
+# они теряются, поэтому такие изображения конвертируются средствами MuPDF
+PNG_COLOR_CHUNKS = (b'iCCP', b'gAMA', b'sRGB', b'cHRM', b'tRNS')
+
+
+class LoadedFile:
+    """Результат загрузки файла для объединения"""
+
+    def __init__(self, filename: str, pdfbytes: bytes = None, needs_pass: bool = False, error: str = ''):
+        """
+        Args:
+            filename (str): имя файла
+            pdfbytes (bytes): содержимое сконвертированного в PDF файла (None - файл уже в формате PDF)
+            needs_pass (bool): файл зашифрован и для его открытия нужен пароль
+            error (str): текст ошибки открытия/конвертации файла (пустая строка - ошибки нет)
+        """
+        self.filename = filename
+        self.pdfbytes = pdfbytes
+        self.needs_pass = needs_pass
+        self.error = error
+
+    def open(self) -> fitz.Document:
+        """Открытие загруженного файла в виде документа PDF"""
+        if self.pdfbytes is not None:
+            return fitz.open('pdf', self.pdfbytes)
+        return fitz.open(self.filename)
+
+
+def image_to_pdf(filename: str):
+    """Быстрое преобразование изображения PNG в документ PDF из одной страницы: сжатые данные
+    изображения встраиваются в PDF как есть, без декодирования и повторного сжатия. Размер страницы
+    определяется по разрешению изображения.
+    Изображения JPEG сюда не относятся: MuPDF при конвертации и так встраивает их без перекодирования
+
+    Args:
+        filename (str): имя файла изображения
+
+    Returns:
+        bytes: содержимое документа PDF или None, если файл не подходит для быстрого преобразования
+               (в этом случае его необходимо конвертировать средствами MuPDF)
+    """
+    if os.path.splitext(filename)[1].lower() != '.png':
+        return None
+    try:
+        return _png_to_pdf(filename)
+    except (OSError, ValueError, struct.error):
+        # Файл поврежден или не соответствует расширению - пусть с ним разбирается MuPDF
+        return None
+
+
+def _new_image_page(doc, width: int, height: int, dpi: tuple):
+    """Создание страницы под изображение размером width x height пикселей с разрешением dpi"""
+    xres, yres = (round(res) if res > 0 else DEFAULT_IMAGE_DPI for res in dpi)
+    return doc.new_page(width=width * 72 / xres, height=height * 72 / yres)
+
+
+def _png_to_pdf(filename: str):
+    """Встраивание файла PNG в PDF: сжатые данные PNG (блоки IDAT) записываются в PDF напрямую,
+    т.к. PDF поддерживает тот же способ сжатия (Flate с предикторами PNG)
+    """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+
+    header = None  # параметры изображения из блока IHDR
+    idat = []  # сжатые данные изображения
+    dpi = (0, 0)  # разрешение изображения из блока pHYs
+
+    # Разбираем блоки файла PNG
+    pos = len(PNG_SIGNATURE)
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos : pos + 8])
+        chunk = data[pos + 8 : pos + 8 + length]
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif chunk_type == b'IDAT':
+            idat.append(chunk)
+        elif chunk_type == b'pHYs':
+            ppu_x, ppu_y, unit = struct.unpack('>IIB', chunk)
+            if unit == 1:  # точек на метр
+                dpi = (ppu_x * 0.0254, ppu_y * 0.0254)
+        elif chunk_type in PNG_COLOR_CHUNKS:
+            return None
+        elif chunk_type == b'IEND':
+            break
+        pos += length + 12
+
+    if header is None or not idat:
+        return None
+
+    # Напрямую встраиваем только 8-битные изображения в градациях серого и RGB без чересстрочности
+    # (палитра, альфа-канал и чересстрочность требуют перекодирования)
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if bit_depth != 8 or color_type not in (0, 2) or interlace:
+        return None
+    colors, colorspace = (1, 'DeviceGray') if color_type == 0 else (3, 'DeviceRGB')
+
+    doc = fitz.open()
+    page = _new_image_page(doc, width, height, dpi)
+
+    # Создаем объект изображения с уже сжатыми данными
+    xref = doc.get_new_xref()
+    doc.update_object(
+        xref,
+        f'<< /Type /XObject /Subtype /Image /Width {width} /Height {height} '
+        f'/ColorSpace /{colorspace} /BitsPerComponent {bit_depth} >>',
+    )
+    doc.update_stream(xref, b''.join(idat), compress=False)
+    doc.xref_set_key(xref, 'Filter', '/FlateDecode')
+    doc.xref_set_key(
+        xref, 'DecodeParms', f'<< /Predictor 15 /Colors {colors} /BitsPerComponent {bit_depth} /Columns {width} >>'
+    )
+
+    page.insert_image(page.rect, xref=xref)
+    return doc.tobytes()
+
+
+def _load_file(filename: str) -> LoadedFile:
+    """Загрузка одного файла (выполняется в процессе-обработчике): файлы PDF только проверяются,
+    остальные конвертируются в PDF
+    """
+    try:
+        # Изображения PNG по возможности встраиваем в PDF как есть
+        pdfbytes = image_to_pdf(filename)
+        if pdfbytes is not None:
+            return LoadedFile(filename, pdfbytes)
+
+        doc = fitz.open(filename)
+        try:
+            # Это не PDF? Пытаемся сконвертировать в PDF
+            if not doc.is_pdf:
+                return LoadedFile(filename, doc.convert_to_pdf())
+            return LoadedFile(filename, needs_pass=doc.needs_pass)
+        finally:
+            doc.close()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        return LoadedFile(filename, error=str(e) or e.__class__.__name__)
+
+
+def load_files(filelist: list, workers: int = 0, progress_callback=None) -> list:
+    """Загрузка файлов для объединения (при большом количестве файлов - в пуле процессов)
+
+    Args:
+        filelist (list): список имен файлов в порядке объединения
+        workers (int): количество процессов (0 - по количеству ядер процессора)
+        progress_callback: callback-функция, которой необходимо передать процент проделанной работы
+
+    Returns:
+        list: список объектов LoadedFile в том же порядке, что и filelist
+    """
+    workers = min(get_workers_count(workers), len(filelist))
+    loaded = []
+
+    # Файлов мало или параллельная обработка отключена - загружаем их последовательно
+    if workers <= 1 or len(filelist) < PARALLEL_MIN_FILES:
+        for filename in filelist:
+            loaded.append(_load_file(filename))
+            if progress_callback is not None:
+                progress_callback(len(loaded) * 100 // len(filelist))
+        return loaded
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = []
+    try:
+        futures = [executor.submit(_load_file, filename) for filename in filelist]
+
+        # Забираем результаты строго по порядку файлов
+        for future in futures:
+            loaded.append(future.result())
+            if progress_callback is not None:
+                progress_callback(len(loaded) * 100 // len(filelist))
+    finally:
+        # При досрочном прекращении (например, прерывании пользователем) отменяем оставшиеся задания
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+    return loaded
@@ -0,0 +1,85 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import zlib
+
+import fitz
+from PIL import Image
+
+from combinepd import PNG_SIGNATURE
+from combinepd import image_to_pdf
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+class TestPngToPdf(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _save_png(self, name: str, mode: str, **kwargs) -> str:
+        # Градиент с шумом, чтобы в данных встречались разные фильтры строк PNG
+        if mode == 'RGB':
+            pixels = [(x * 3, y * 5, (x * y) % 256) for y in range(41) for x in range(67)]
+        else:
+            pixels = [((x * 7 + y * 13) ^ (x * y)) % 256 for y in range(41) for x in range(67)]
+        img = Image.new(mode, (67, 41))
+        img.putdata(pixels)
+        filename = os.path.join(self.tmpdir, name)
+        img.save(filename, **kwargs)
+        return filename
+
+    def _assert_same_as_mupdf(self, filename: str):
+        pdfbytes = image_to_pdf(filename)
+        self.assertIsNotNone(pdfbytes)
+        with fitz.open('pdf', pdfbytes) as doc, fitz.open(filename) as img:
+            with fitz.open('pdf', img.convert_to_pdf()) as expected:
+                self.assertEqual(doc[0].rect, expected[0].rect)
+                pix = doc[0].get_pixmap()
+                pix_expected = expected[0].get_pixmap()
+                self.assertEqual((pix.width, pix.height), (pix_expected.width, pix_expected.height))
+                self.assertEqual(pix.samples, pix_expected.samples)
+
+    def test_gray(self):
+        self._assert_same_as_mupdf(self._save_png('gray.png', 'L'))
+
+    def test_rgb(self):
+        self._assert_same_as_mupdf(self._save_png('rgb.png', 'RGB', dpi=(150, 150)))
+
+    def test_fallback_palette(self):
+        self.assertIsNone(image_to_pdf(self._save_png('palette.png', 'P')))
+
+    def test_fallback_interlaced(self):
+        filename = self._save_png('interlaced.png', 'L')
+        with open(filename, 'rb') as f:
+            data = f.read()
+        # Заменяем блок IHDR на такой же с признаком чересстрочности
+        pos = len(PNG_SIGNATURE)
+        header = bytearray(data[pos + 8 : pos + 21])
+        header[12] = 1
+        with open(filename, 'wb') as f:
+            f.write(PNG_SIGNATURE + _png_chunk(b'IHDR', bytes(header)) + data[pos + 25 :])
+        self.assertIsNone(image_to_pdf(filename))
+
+    def test_fallback_gamma(self):
+        filename = self._save_png('gamma.png', 'RGB')
+        with open(filename, 'rb') as f:
+            data = f.read()
+        # Вставляем блок gAMA сразу после IHDR
+        pos = len(PNG_SIGNATURE) + 25
+        with open(filename, 'wb') as f:
+            f.write(data[:pos] + _png_chunk(b'gAMA', struct.pack('>I', 45455)) + data[pos:])
+        self.assertIsNone(image_to_pdf(filename))
+        # MuPDF такой файл открывает
+        with fitz.open(filename) as img:
+            self.assertEqual(len(img), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
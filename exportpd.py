@@ -2,16 +2,13 @@
 Этот файл содержит функции для экспорта реестра платежных документов КТК в файл xlsx
 """
 
-import io
 import os
 import re
 
-import fitz
 import xlsxwriter
-from PIL import Image as PILImage
-from PIL import ImageOps
-from pyzbar.pyzbar import decode
-from pyzbar.wrapper import ZBarSymbol
+
+from qrdecode import decode_image_qr
+from textcache import get_page_text
 
 
 def export_pd(doc, xlsfile: str, current_filename: str, recognize_qr: bool = True, progress_callback=None):
@@ -82,9 +79,9 @@ def export_pd(doc, xlsfile: str, current_filename: str, recognize_qr: bool = Tru
         # Переходим на следующую строку листа с детальной информацией
         current_row += 1
 
-        # Из текстового слоя очередной страницы берем все содержимое
-        page = doc.load_page(current_page)
-        page_text = page.get_text("text")
+        # Из текстового слоя очередной страницы берем все содержимое (слой разбирается один раз
+        # и используется также при деперсонификации и анализе таблиц)
+        page_text = get_page_text(doc, current_page)
 
         # Заполняем номер строки по порядку
         worksheet_det.write(current_row, 0, current_row, cell_format)
@@ -117,24 +114,10 @@ def export_pd(doc, xlsfile: str, current_filename: str, recognize_qr: bool = Tru
         if recognize_qr:
             qr_codes = []
 
-            # Перебираем все картинки на странице
+            # Перебираем все картинки на странице и собираем все полученные расшифровки кодов QR
+            # (одинаковые изображения распознаются только один раз)
             for docimg in doc.get_page_images(current_page):
-                # Вариант для версии PyMuPDF-1.22.0...
-                pix = fitz.Pixmap(doc, docimg[0])
-                temp = io.BytesIO(pix.tobytes())
-
-                # Загружаем картинку в Pillow
-                img = PILImage.open(temp)
-
-                # Проверяем цвет первого пикселя, если он черный, то инвертируем изображение
-                if img.getpixel(xy=(0, 0)) == 0:
-                    img = ImageOps.invert(img)
-
-                # Декодируем код или несколько кодов QR
-                decocde_qr = decode(img, [ZBarSymbol.QRCODE])
-
-                # Собираем все полученные расшифровки кодов QR в одну строку
-                qr_codes.extend(qr_obj.data.decode('utf-8') for qr_obj in decocde_qr)
+                qr_codes.extend(txt for txt, _ in decode_image_qr(doc, docimg))
 
             # Заполняем в таблице расшифровки кодов QR
             worksheet_det.write_string(
@@ -0,0 +1,173 @@
+"""
+Этот файл содержит класс для выполнения длительных операций в отдельном потоке
+(без блокирования интерфейса пользователя)
+"""
+
+import threading
+import time
+
+from PySide2.QtCore import QEventLoop
+from PySide2.QtCore import QObject
+from PySide2.QtCore import QThread
+from PySide2.QtCore import Qt
+from PySide2.QtCore import Signal
+from PySide2.QtCore import Slot
+
+
+# Минимальный интервал между обновлениями прогресс-бара (сек.)
+PROGRESS_INTERVAL = 0.1
+
+
+class JobCancelledError(Exception):
+    """Исключение, инициируемое при прерывании операции пользователем"""
+
+    def __init__(self):
+        super().__init__('Операция прервана пользователем')
+
+
+class _GuiInvoker(QObject):
+    """Вспомогательный объект для синхронного выполнения функций в потоке интерфейса"""
+
+    call = Signal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Поток-обработчик ждет, пока функция не будет выполнена в потоке интерфейса
+        self.call.connect(self._run, Qt.BlockingQueuedConnection)
+
+    @Slot(object)
+    def _run(self, task):
+        task()
+
+
+class JobRunner(QThread):
+    """Выполнение функции в отдельном потоке с передачей прогресса через сигналы
+    и возможностью прерывания
+    """
+
+    progress = Signal(int)  # сигнал об изменении прогресса (в процентах)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._invoker = _GuiInvoker(self)
+        self._func = None  # функция, выполняемая в потоке
+        self._args = ()  # позиционные аргументы функции
+        self._kwargs = {}  # именованные аргументы функции
+        self._result = None  # результат выполнения функции
+        self._error = None  # исключение, возникшее при выполнении функции
+        self._is_busy = False  # признак выполнения операции
+        self._is_cancelled = threading.Event()  # признак прерывания операции пользователем
+        self._last_emit = 0.0  # время последней отправки сигнала progress
+        self._last_procent = -1  # последнее значение прогресса
+        self._worker_ident = None  # идентификатор потока-обработчика
+
+    @property
+    def is_busy(self) -> bool:
+        """Признак выполнения операции"""
+        return self._is_busy
+
+    @property
+    def is_cancelled(self) -> bool:
+        """Признак прерывания операции пользователем"""
+        return self._is_cancelled.is_set()
+
+    @Slot()
+    def cancel(self):
+        """Запрос на прерывание операции (операция прерывается при очередном обновлении прогресса)"""
+        if self._is_busy:
+            self._is_cancelled.set()
+
+    def execute(self, func, *args, **kwargs):
+        """Выполнение функции в отдельном потоке. Пока функция выполняется, события интерфейса
+        обрабатываются во вложенном цикле событий
+
+        Args:
+            func: выполняемая функция
+            *args, **kwargs: аргументы функции
+
+        Returns:
+            результат выполнения функции (исключения, возникшие в потоке, инициируются повторно)
+        """
+        if self._is_busy:
+            raise RuntimeError('Предыдущая операция еще не завершена')
+
+        self._func, self._args, self._kwargs = func, args, kwargs
+        self._result, self._error = None, None
+        self._is_cancelled.clear()
+        self._last_emit, self._last_procent = 0.0, -1
+        self._is_busy = True
+
+        loop = QEventLoop()
+        self.finished.connect(loop.quit)
+        try:
+            self.start()
+            loop.exec_()
+            self.wait()
+        finally:
+            self.finished.disconnect(loop.quit)
+            self._func, self._args, self._kwargs = None, (), {}
+            self._is_busy = False
+
+        # Отправляем последнее значение прогресса, если оно было пропущено
+        if self._last_procent >= 0:
+            self.progress.emit(self._last_procent)
+
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+        return self._result
+
+    def run(self):
+        """Выполнение функции (в отдельном потоке)"""
+        self._worker_ident = threading.get_ident()
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            self._error = e
+
+    def progress_callback(self, procent: int):
+        """Callback функция для обновления прогресса (вызывается из потока-обработчика).
+        Сигналы отправляются не чаще, чем раз в PROGRESS_INTERVAL секунд
+
+        Raises:
+            JobCancelledError: если пользователь прервал операцию
+        """
+        if self._is_cancelled.is_set():
+            raise JobCancelledError()
+
+        self._last_procent = procent
+        now = time.monotonic()
+        if now - self._last_emit >= PROGRESS_INTERVAL or procent >= 100:
+            self._last_emit = now
+            self.progress.emit(procent)
+
+    def gui_callback(self, func):
+        """Обертка для функции, которую необходимо выполнять в потоке интерфейса
+        (вывод сообщений, изменение виджетов). Поток-обработчик ждет результата ее выполнения
+
+        Args:
+            func: функция, выполняемая в потоке интерфейса
+
+        Returns:
+            функция с теми же аргументами и результатом
+        """
+
+        def wrapper(*args, **kwargs):
+            # Если мы не в потоке-обработчике, то просто вызываем функцию
+            if threading.get_ident() != self._worker_ident:
+                return func(*args, **kwargs)
+
+            res = {}
+
+            def task():
+                try:
+                    res['result'] = func(*args, **kwargs)
+                except BaseException as e:  # pylint: disable=broad-exception-caught
+                    res['error'] = e
+
+            self._invoker.call.emit(task)
+            if 'error' in res:
+                raise res['error']
+            return res.get('result')
+
+        return wrapper
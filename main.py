@@ -2,6 +2,7 @@
 Приложение Mini PDF Tools
 """
 
+import multiprocessing
 import sys
 from argparse import ArgumentParser
 from argparse import RawTextHelpFormatter
@@ -15,6 +16,9 @@ from mainwindow import MainWindow
 # apt-get install qtbase5-dev qtchooser qt5-qmake qtbase5-dev-tools tesseract-ocr tesseract-ocr-rus
 
 if __name__ == "__main__":
+    # Необходимо для работы пула процессов в собранном (frozen) приложении под Windows
+    multiprocessing.freeze_support()
+
     argument_parser = ArgumentParser(description="Mini PDF Tools", formatter_class=RawTextHelpFormatter)
     argument_parser.add_argument("file", help="The file(s) to open", nargs='*', type=str)
     options = argument_parser.parse_args()
@@ -14,21 +14,25 @@ from PySide2.QtGui import QCloseEvent
 from PySide2.QtGui import QDragEnterEvent
 from PySide2.QtGui import QDropEvent
 from PySide2.QtWidgets import QAbstractSpinBox
-from PySide2.QtWidgets import QApplication
 from PySide2.QtWidgets import QFileDialog
 from PySide2.QtWidgets import QMainWindow
 from PySide2.QtWidgets import QMenu
 from PySide2.QtWidgets import QMessageBox
 from PySide2.QtWidgets import QProgressBar
+from PySide2.QtWidgets import QPushButton
 
 import const
 import params
 from censoredlg import CensoreDialog
-from censorepd import censore_page
+from censorepd import find_pages_censore_rects
 from combinedlg import CombineDialog
+from combinepd import load_files
 from exportpd import export_pd
+from jobrunner import JobCancelledError
+from jobrunner import JobRunner
 from mainwindow_ui import Ui_MainWindow
 from saveasdlg import SaveAsDialog
+from savepdf import SaveDocument
 from savepdf import saveas_process
 from siapdfview import PageNumberSpinBox
 from siapdfview import SiaPdfView
@@ -90,6 +94,14 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         self.statusBar().addPermanentWidget(self.ui.progress_bar)
         self.ui.progress_bar.setGeometry(30, 40, 200, 20)
         self.ui.progress_bar.setVisible(False)
+        self.ui.cancel_button = QPushButton('Прервать')
+        self.statusBar().addPermanentWidget(self.ui.cancel_button)
+        self.ui.cancel_button.setVisible(False)
+
+        # Объект для выполнения длительных операций в отдельном потоке
+        self._job = JobRunner(self)
+        self._job.progress.connect(self.ui.progress_bar.setValue)
+        self.ui.cancel_button.clicked.connect(self._job.cancel)
 
         # Вставляем zoomSelector перед actionZoom_In
         self.ui.mainToolBar.insertWidget(self.ui.actionZoom_In, self.ui.zoom_selector)
@@ -177,6 +189,7 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         self.pdf_view.current_page_changed.connect(self.ui.page_selector.change_page_number)
         self.pdf_view.zoom_factor_changed.connect(self.ui.zoom_selector.set_zoom_factor)
         self.pdf_view.rect_selected.connect(self._process_rect_selection)
+        self.pdf_view.history_changed.connect(self._process_history_change)
         self.pdf_view.coords_text_emited.connect(self.statusBar().showMessage)
 
         # Привязываем обработчик изменения значения зум-фактора и номера страницы в панели инструментов
@@ -195,6 +208,7 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         self.ui.actionZoom_In.triggered.connect(self.pdf_view.zoom_in)
         self.ui.actionZoom_Out.triggered.connect(self.pdf_view.zoom_out)
         self.ui.actionZoom_Normal.triggered.connect(lambda: self.pdf_view.set_zoom_factor(1.0))
+        self.ui.actionContinuousScroll.toggled.connect(self.pdf_view.set_continuous_mode)
 
         self.ui.actionCbdPageImageCopy.triggered.connect(lambda: self.pdf_view.copy_page_image_to_clipboard(False))
         self.ui.actionCbdRectImageCopy.triggered.connect(lambda: self.pdf_view.copy_page_image_to_clipboard(True))
@@ -212,6 +226,9 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         self.ui.actionCbdRectsInfoCopy.triggered.connect(lambda: self.pdf_view.copy_rects_info_to_clipboard(False))
         self.ui.actionCbdRectsAllInfoCopy.triggered.connect(lambda: self.pdf_view.copy_rects_info_to_clipboard(True))
 
+        self.ui.actionUndo.triggered.connect(self.pdf_view.undo)
+        self.ui.actionRedo.triggered.connect(self.pdf_view.redo)
+
         self.ui.actionSelectAll.triggered.connect(self.pdf_view.select_all)
         self.ui.actionRemoveSelection.triggered.connect(self.pdf_view.remove_selection)
         self.ui.actionRemoveAllSelections.triggered.connect(lambda: self.pdf_view.remove_selection(True))
@@ -310,6 +327,11 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         for widget in (self.ui.actionCbdRectsAllInfoCopy, self.ui.actionRemoveAllSelections):
             widget.setEnabled(is_selections_exists)
 
+    def _process_history_change(self):
+        """Обработчик изменения журнала изменений документа (доступность отмены и повтора)"""
+        self.ui.actionUndo.setEnabled(self.pdf_view.journal.can_undo)
+        self.ui.actionRedo.setEnabled(self.pdf_view.journal.can_redo)
+
     def _show_context_menu(self, position):
         """Вывод контекстного меню (если файл открыт)"""
 
@@ -325,11 +347,35 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         elif isinstance(files_list, str):  # если строка
             self.pdf_view.open_file(files_list)
         elif isinstance(files_list, list):  # если список
-            self.pdf_view.combine_files(files_list)
+            self._combine_files_process(files_list)
 
         # Обновляем значения и доступность контролов
         self._setup_controls()
 
+    def _combine_files_process(self, files_list: list):
+        """Объединение нескольких файлов в один: файлы загружаются (и конвертируются в PDF)
+        в отдельном потоке, затем запрашиваются пароли и документ собирается в просмотрщике
+        """
+        self._title = 'Объединение файлов'
+
+        # Включаем прогресс-бар и блокируем интерфейс
+        self._progress_status_start(self._title + '...')
+
+        # Загружаем файлы в отдельном потоке (при большом количестве файлов - в пуле процессов)
+        try:
+            files = self._job.execute(
+                load_files, files_list, params.get_workers_setting(), self._job.progress_callback
+            )
+        except Exception as e:
+            self._show_job_error(e)
+            files = None
+
+        self._progress_status_turnoff()
+
+        if files is not None:
+            self.pdf_view.combine_files(files)
+            self.statusBar().showMessage('')
+
     def _change_page(self, page):
         """Обработчик события смены номера страницы, полученного от панели инструментов"""
 
@@ -397,23 +443,24 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         # Включаем прогресс-бар и блокируем интерфейс
         self._progress_status_start(self._title + '...')
 
-        # Запускаем основную функцию сохранения файла
+        # Запускаем основную функцию сохранения файла в отдельном потоке
         try:
-            res = saveas_process(
-                pdf_view=self.pdf_view,
+            res = self._job.execute(
+                saveas_process,
+                source=self._get_save_document(),
                 page_ranges=page_ranges,
                 ranges_page_count=ranges_page_count,
                 outfile=outfile,
                 ext=ext_tp,
                 param=p,
                 censore=censore,
-                progress_callback=self._progress_status_refresh,
-                overwrite_msg_callback=self._show_file_overwrite_msg,
-                show_error_msg_callback=self._show_error_message,
-                show_save_error_msg_callback=self._show_save_error_msg,
+                progress_callback=self._job.progress_callback,
+                overwrite_msg_callback=self._job.gui_callback(self._show_file_overwrite_msg),
+                show_error_msg_callback=self._job.gui_callback(self._show_error_message),
+                show_save_error_msg_callback=self._job.gui_callback(self._show_save_error_msg),
             )
         except Exception as e:
-            self._show_error_message(e)
+            self._show_job_error(e)
             return
 
         # Выводим финальные сообщения
@@ -444,9 +491,6 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         for page_range in page_ranges:
             pages_set.update(page_range)
 
-        # Подсчитываем количество страниц
-        ranges_page_count = len(pages_set)
-
         # Если выделенные участки уже есть, то предложим их сбросить
         if self.pdf_view.selections_all_count > 0:
             # Выводим сообщение с тремя вариантами ответа Да-Нет-Отмена
@@ -463,13 +507,25 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
         # Сохраняем старое количество выделений
         old_count = self.pdf_view.selections_all_count
 
-        ind = 0
-        # Обходим указанные пользователем страницы
-        for pno in pages_set:
-            # Запускаем обработку страницы
-            censore_page(doc=self.pdf_view.doc, pno=pno, param=p, add_selection_callback=self.pdf_view.add_selection)
-            ind += 1
-            self._progress_status_refresh(ind * 100 // ranges_page_count)
+        # Запускаем обработку страниц в отдельном потоке (при большом количестве страниц - в пуле процессов)
+        found = []
+        try:
+            self._job.execute(
+                find_pages_censore_rects,
+                doc=self.pdf_view.doc,
+                filename=self.pdf_view.current_filename,
+                psw=self.pdf_view.psw,
+                is_real_file=self.pdf_view.is_real_file,
+                pages=sorted(pages_set),
+                param=p,
+                found=found,
+                progress_callback=self._job.progress_callback,
+            )
+        except Exception as e:
+            self._show_job_error(e)
+
+        # Добавляем все найденные области (в том числе найденные до прерывания) одним изменением
+        self.pdf_view.add_selections(found)
 
         # Обновляем доступность элементов
         self._process_rect_selection(self.pdf_view.selected_rect > -1)
@@ -502,11 +558,16 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
 
         # Запускаем парсинг таблиц на всех страницах документа
         try:
-            res = export_pd(
-                self.pdf_view.doc, outfile, self.pdf_view.current_filename, recognize_qr, self._progress_status_refresh
+            res = self._job.execute(
+                export_pd,
+                self.pdf_view.doc,
+                outfile,
+                self.pdf_view.current_filename,
+                recognize_qr,
+                self._job.progress_callback,
             )
         except Exception as e:
-            self._show_error_message(e)
+            self._show_job_error(e)
             return
 
         # Выводим финальные сообщения
@@ -530,9 +591,11 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
 
         # Запускаем парсинг таблиц на всех страницах документа
         try:
-            rows_count = parse_tables(self.pdf_view.doc, outfile, strong, self._progress_status_refresh)
+            rows_count = self._job.execute(
+                parse_tables, self.pdf_view.doc, outfile, strong, self._job.progress_callback
+            )
         except Exception as e:
-            self._show_error_message(e)
+            self._show_job_error(e)
             return
 
         # Выводим финальные сообщения
@@ -543,6 +606,17 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
             fault_message='Табличные данные найти не удалось...',
         )
 
+    def _get_save_document(self) -> SaveDocument:
+        """Формирование сохраняемого документа из текущего состояния просмотрщика"""
+        return SaveDocument(
+            self.pdf_view.doc,
+            self.pdf_view.current_filename,
+            self.pdf_view.psw,
+            self.pdf_view.is_real_file,
+            [(sel.pno, self.pdf_view.get_selection_fitz_rect(sel)) for sel in self.pdf_view.selections_all],
+            self.pdf_view.rotated_pages,
+        )
+
     def _get_savefilename(self, file_dir: str, file_filter: str, file_ext: str, file_delete: bool = False) -> str:
         """Диалог выбора имени файла для сохранения"""
         if file_delete:
@@ -571,25 +645,26 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
 
         return outfile
 
-    def _progress_status_refresh(self, procent: int):
-        """Обновление прогресс-бара"""
-        self.ui.progress_bar.setValue(procent)
-        QApplication.processEvents()
+    def _set_interface_locked(self, locked: bool):
+        """Блокирование/разблокирование интерфейса (кроме кнопки прерывания операции)"""
+        for widget in (self.menuBar(), self.ui.mainToolBar, self.pdf_view):
+            widget.setDisabled(locked)
+        self.setAcceptDrops(not locked)
 
     def _progress_status_turnoff(self):
         """Отключение прогресс-бара с разблокированием интерфейса"""
         self.ui.progress_bar.setVisible(False)
-        self.setDisabled(False)
+        self.ui.cancel_button.setVisible(False)
+        self._set_interface_locked(False)
         # self.statusBar().showMessage('')
-        QApplication.processEvents()
 
     def _progress_status_start(self, status_message: str = ''):
         """Включение прогресс-бара с блокированием интерфейса и вывод статус-сообщения"""
         self.statusBar().showMessage(status_message)
         self.ui.progress_bar.setValue(0)
         self.ui.progress_bar.setVisible(True)
-        self.setDisabled(True)
-        QApplication.processEvents()
+        self.ui.cancel_button.setVisible(True)
+        self._set_interface_locked(True)
 
     def _progress_status_final(
         self,
@@ -617,6 +692,13 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
                 QMessageBox.warning(self, self._title, fault_message)
             self.statusBar().showMessage('')
 
+    def _show_job_error(self, e: BaseException):
+        """Вывод сообщения об ошибке (или о прерывании) операции, выполнявшейся в отдельном потоке"""
+        if isinstance(e, JobCancelledError):
+            self.statusBar().showMessage(str(e))
+        else:
+            self._show_error_message(e)
+
     def _show_error_message(self, e: BaseException):
         """Вывод сообщения об ошибке"""
         logger.error('', exc_info=True)
@@ -681,8 +763,15 @@ class MainWindow(QMainWindow):  # pylint: disable=too-many-instance-attributes,
     # Обработчики событий
     ###########################################################################
 
-    def closeEvent(self, event: QCloseEvent):  # pylint: disable=unused-argument
+    def closeEvent(self, event: QCloseEvent):
         """Обработчик события Close"""
+
+        # Пока выполняется операция, закрывать окно нельзя - прерываем операцию
+        if self._job.is_busy:
+            self._job.cancel()
+            event.ignore()
+            return
+
         logger.info('Выход из приложения...')
 
     def dragEnterEvent(self, event: QDragEnterEvent):
@@ -79,6 +79,9 @@ class Ui_MainWindow(object):
         icon9 = QIcon()
         icon9.addFile(u":/icons/images/Paomedia-Small-N-Flat-Sign-down.svg", QSize(), QIcon.Normal, QIcon.Off)
         self.actionEnd.setIcon(icon9)
+        self.actionContinuousScroll = QAction(MainWindow)
+        self.actionContinuousScroll.setObjectName(u"actionContinuousScroll")
+        self.actionContinuousScroll.setCheckable(True)
         self.actionSaveAs = QAction(MainWindow)
         self.actionSaveAs.setObjectName(u"actionSaveAs")
         self.actionSaveAs.setEnabled(False)
@@ -136,6 +139,12 @@ class Ui_MainWindow(object):
         icon16 = QIcon()
         icon16.addFile(u":/icons/images/Close2Cross.svg", QSize(), QIcon.Normal, QIcon.Off)
         self.actionRemoveAllSelections.setIcon(icon16)
+        self.actionUndo = QAction(MainWindow)
+        self.actionUndo.setObjectName(u"actionUndo")
+        self.actionUndo.setEnabled(False)
+        self.actionRedo = QAction(MainWindow)
+        self.actionRedo.setObjectName(u"actionRedo")
+        self.actionRedo.setEnabled(False)
         self.actionCbdRectsInfoCopy = QAction(MainWindow)
         self.actionCbdRectsInfoCopy.setObjectName(u"actionCbdRectsInfoCopy")
         self.actionCbdRectsInfoCopy.setEnabled(False)
@@ -283,6 +292,7 @@ class Ui_MainWindow(object):
         self.menuView.addAction(self.actionNext_Page)
         self.menuView.addAction(self.actionEnd)
         self.menuView.addSeparator()
+        self.menuView.addAction(self.actionContinuousScroll)
         self.menuTools.addAction(self.menuPageRotate.menuAction())
         self.menuTools.addAction(self.menuPagesRotate.menuAction())
         self.menuTools.addSeparator()
@@ -299,6 +309,9 @@ class Ui_MainWindow(object):
         self.menuPagesRotate.addAction(self.actionPagesRotate180)
         self.menuTablesAnalize.addAction(self.actionTablesAnalizeStrong)
         self.menuTablesAnalize.addAction(self.actionTablesAnalizeSimple)
+        self.menuEdit.addAction(self.actionUndo)
+        self.menuEdit.addAction(self.actionRedo)
+        self.menuEdit.addSeparator()
         self.menuEdit.addAction(self.actionCbdRectTextCopy)
         self.menuEdit.addAction(self.actionCbdRectTextTrimCopy)
         self.menuEdit.addSeparator()
@@ -423,6 +436,13 @@ class Ui_MainWindow(object):
 #if QT_CONFIG(shortcut)
         self.actionEnd.setShortcut(QCoreApplication.translate("MainWindow", u"End", None))
 #endif // QT_CONFIG(shortcut)
+        self.actionContinuousScroll.setText(QCoreApplication.translate("MainWindow", u"\u041d\u0435\u043f\u0440\u0435\u0440\u044b\u0432\u043d\u0430\u044f \u043f\u0440\u043e\u043a\u0440\u0443\u0442\u043a\u0430", None))
+#if QT_CONFIG(tooltip)
+        self.actionContinuousScroll.setToolTip(QCoreApplication.translate("MainWindow", u"\u041d\u0435\u043f\u0440\u0435\u0440\u044b\u0432\u043d\u0430\u044f \u043f\u0440\u043e\u043a\u0440\u0443\u0442\u043a\u0430 \u0432\u0441\u0435\u0445 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0434\u043e\u043a\u0443\u043c\u0435\u043d\u0442\u0430", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(statustip)
+        self.actionContinuousScroll.setStatusTip(QCoreApplication.translate("MainWindow", u"\u041d\u0435\u043f\u0440\u0435\u0440\u044b\u0432\u043d\u0430\u044f \u043f\u0440\u043e\u043a\u0440\u0443\u0442\u043a\u0430 \u0432\u0441\u0435\u0445 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0434\u043e\u043a\u0443\u043c\u0435\u043d\u0442\u0430", None))
+#endif // QT_CONFIG(statustip)
         self.actionSaveAs.setText(QCoreApplication.translate("MainWindow", u"\u0421\u043e\u0445\u0440\u0430\u043d\u0438\u0442\u044c \u043a\u0430\u043a...", None))
 #if QT_CONFIG(tooltip)
         self.actionSaveAs.setToolTip(QCoreApplication.translate("MainWindow", u"\u0421\u043e\u0445\u0440\u0430\u043d\u0438\u0442\u044c \u043a\u0430\u043a \u0434\u0440\u0443\u0433\u043e\u0439 \u0444\u0430\u0439\u043b/\u0441\u0435\u0440\u0438\u044e \u0444\u0430\u0439\u043b\u043e\u0432", None))
@@ -525,6 +545,26 @@ class Ui_MainWindow(object):
 #endif // QT_CONFIG(statustip)
 #if QT_CONFIG(shortcut)
         self.actionRemoveAllSelections.setShortcut(QCoreApplication.translate("MainWindow", u"Ctrl+Del", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionUndo.setText(QCoreApplication.translate("MainWindow", u"\u041e\u0442\u043c\u0435\u043d\u0438\u0442\u044c", None))
+#if QT_CONFIG(tooltip)
+        self.actionUndo.setToolTip(QCoreApplication.translate("MainWindow", u"\u041e\u0442\u043c\u0435\u043d\u0438\u0442\u044c \u043f\u043e\u0441\u043b\u0435\u0434\u043d\u0438\u0439 \u043f\u043e\u0432\u043e\u0440\u043e\u0442 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0438\u043b\u0438 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0435 \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u0438\u0439", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(statustip)
+        self.actionUndo.setStatusTip(QCoreApplication.translate("MainWindow", u"\u041e\u0442\u043c\u0435\u043d\u0438\u0442\u044c \u043f\u043e\u0441\u043b\u0435\u0434\u043d\u0438\u0439 \u043f\u043e\u0432\u043e\u0440\u043e\u0442 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0438\u043b\u0438 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0435 \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u0438\u0439", None))
+#endif // QT_CONFIG(statustip)
+#if QT_CONFIG(shortcut)
+        self.actionUndo.setShortcut(QCoreApplication.translate("MainWindow", u"Ctrl+Z", None))
+#endif // QT_CONFIG(shortcut)
+        self.actionRedo.setText(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0432\u0442\u043e\u0440\u0438\u0442\u044c", None))
+#if QT_CONFIG(tooltip)
+        self.actionRedo.setToolTip(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0432\u0442\u043e\u0440\u0438\u0442\u044c \u043e\u0442\u043c\u0435\u043d\u0435\u043d\u043d\u044b\u0439 \u043f\u043e\u0432\u043e\u0440\u043e\u0442 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0438\u043b\u0438 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0435 \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u0438\u0439", None))
+#endif // QT_CONFIG(tooltip)
+#if QT_CONFIG(statustip)
+        self.actionRedo.setStatusTip(QCoreApplication.translate("MainWindow", u"\u041f\u043e\u0432\u0442\u043e\u0440\u0438\u0442\u044c \u043e\u0442\u043c\u0435\u043d\u0435\u043d\u043d\u044b\u0439 \u043f\u043e\u0432\u043e\u0440\u043e\u0442 \u0441\u0442\u0440\u0430\u043d\u0438\u0446 \u0438\u043b\u0438 \u0438\u0437\u043c\u0435\u043d\u0435\u043d\u0438\u0435 \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u0438\u0439", None))
+#endif // QT_CONFIG(statustip)
+#if QT_CONFIG(shortcut)
+        self.actionRedo.setShortcut(QCoreApplication.translate("MainWindow", u"Ctrl+Y", None))
 #endif // QT_CONFIG(shortcut)
         self.actionCbdRectsInfoCopy.setText(QCoreApplication.translate("MainWindow", u"\u041a\u043e\u043f\u0438\u0440\u043e\u0432\u0430\u0442\u044c \u0438\u043d\u0444\u043e\u0440\u043c\u0430\u0446\u0438\u044e \u043e \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u043d\u044b\u0445 \u0443\u0447\u0430\u0441\u0442\u043a\u0430\u0445", None))
 #if QT_CONFIG(tooltip)
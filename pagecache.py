@@ -0,0 +1,83 @@
+"""
+Этот файл содержит класс кэша отрендеренных изображений страниц документа
+"""
+
+from collections import OrderedDict
+
+
+# Объем памяти под кэш изображений страниц по умолчанию (байт)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class PageCache:
+    """Кэш изображений с вытеснением давно не использовавшихся элементов (LRU)
+    при превышении заданного объема памяти
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._max_bytes = max_bytes  # Максимальный объем памяти под кэш
+        self._size_bytes = 0  # Текущий объем памяти, занятый элементами кэша
+        self._items = OrderedDict()  # Элементы кэша {ключ: (значение, размер)} в порядке использования
+
+    def __contains__(self, key) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size_bytes(self) -> int:
+        """Текущий объем памяти, занятый элементами кэша"""
+        return self._size_bytes
+
+    @property
+    def max_bytes(self) -> int:
+        """Максимальный объем памяти под кэш"""
+        return self._max_bytes
+
+    def get(self, key):
+        """Получение элемента кэша (элемент становится самым "свежим")
+
+        Args:
+            key: ключ элемента
+
+        Returns:
+            значение элемента или None, если его нет в кэше
+        """
+        item = self._items.get(key)
+        if item is None:
+            return None
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, value, size: int):
+        """Добавление элемента в кэш с вытеснением самых "старых" элементов при нехватке памяти.
+        Элемент, который в одиночку превышает объем кэша, не сохраняется
+
+        Args:
+            key: ключ элемента
+            value: значение элемента
+            size (int): размер элемента в байтах
+        """
+        self.discard(key)
+        if size > self._max_bytes:
+            return
+
+        self._items[key] = (value, size)
+        self._size_bytes += size
+
+        # Вытесняем самые "старые" элементы, пока не уложимся в заданный объем
+        while self._size_bytes > self._max_bytes:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self._size_bytes -= old_size
+
+    def discard(self, key):
+        """Удаление элемента из кэша (если он есть)"""
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._size_bytes -= item[1]
+
+    def clear(self):
+        """Очистка кэша"""
+        self._items.clear()
+        self._size_bytes = 0
@@ -0,0 +1,52 @@
+import unittest
+
+from pagecache import PageCache
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = PageCache(100)
+
+    def test_get_missing(self):
+        self.assertIsNone(self.cache.get((0, 0, 288)))
+
+    def test_put_get(self):
+        self.cache.put((0, 0, 288), 'p0', 40)
+        self.assertEqual(self.cache.get((0, 0, 288)), 'p0')
+        self.assertEqual(self.cache.size_bytes, 40)
+
+    def test_rotation_is_part_of_key(self):
+        self.cache.put((0, 0, 288), 'p0', 40)
+        self.assertIsNone(self.cache.get((0, 90, 288)))
+
+    def test_evict_least_recently_used(self):
+        self.cache.put(1, 'p1', 40)
+        self.cache.put(2, 'p2', 40)
+        self.cache.get(1)
+        self.cache.put(3, 'p3', 40)
+        self.assertIn(1, self.cache)
+        self.assertNotIn(2, self.cache)
+        self.assertIn(3, self.cache)
+        self.assertEqual(self.cache.size_bytes, 80)
+
+    def test_replace_same_key(self):
+        self.cache.put(1, 'p1', 40)
+        self.cache.put(1, 'p1-new', 60)
+        self.assertEqual(self.cache.get(1), 'p1-new')
+        self.assertEqual(self.cache.size_bytes, 60)
+
+    def test_too_large_item(self):
+        self.cache.put(1, 'p1', 40)
+        self.cache.put(2, 'big', 101)
+        self.assertNotIn(2, self.cache)
+        self.assertIn(1, self.cache)
+
+    def test_clear(self):
+        self.cache.put(1, 'p1', 40)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.size_bytes, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
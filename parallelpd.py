@@ -0,0 +1,117 @@
+"""
+Этот файл содержит функции для параллельной обработки страниц документа PDF
+в нескольких процессах (каждый процесс открывает собственный объект fitz.Document)
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import fitz
+
+
+# Минимальное количество страниц, при котором имеет смысл запускать пул процессов
+# (запуск процессов и открытие в них документа тоже занимает время)
+PARALLEL_MIN_PAGES = 8
+
+# Максимальное количество пакетов на процесс, одновременно находящихся в работе. Следующий пакет
+# отправляется только после того, как забран результат предыдущего, поэтому готовые, но еще не забранные
+# результаты (например, изображения страниц) не накапливаются в памяти основного процесса
+PENDING_CHUNKS_PER_WORKER = 2
+
+# Документ, открытый в процессе-обработчике (у каждого процесса он свой)
+_worker_doc = None
+
+
+def get_workers_count(workers: int = 0) -> int:
+    """Определение количества процессов-обработчиков
+
+    Args:
+        workers (int): желаемое количество процессов (0 - по количеству ядер процессора)
+
+    Returns:
+        int: количество процессов-обработчиков (не меньше 1)
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    return max(workers, 1)
+
+
+def _init_worker(filename: str, psw: str, rotations: dict, small_glyph_heights: bool):
+    """Инициализация процесса-обработчика: открываем документ и приводим его в состояние,
+    соответствующее документу в основном процессе
+    """
+    global _worker_doc  # pylint: disable=global-statement
+
+    # Режим определения высоты символов должен совпадать с основным процессом
+    fitz.TOOLS.set_small_glyph_heights(small_glyph_heights)
+
+    doc = fitz.open(filename)
+    if doc.needs_pass:
+        doc.authenticate(psw)
+
+    # Поворачиваем страницы так же, как они повернуты в основном процессе
+    for pno, rotation in rotations.items():
+        if doc[pno].rotation != rotation:
+            doc[pno].set_rotation(rotation)
+
+    _worker_doc = doc
+
+
+def _process_chunk(func, items: list, args: tuple) -> list:
+    """Обработка пакета заданий в процессе-обработчике"""
+    return [func(_worker_doc, item, *args) for item in items]
+
+
+def _split_chunks(items: list, workers: int) -> list:
+    """Разбиение списка заданий на непересекающиеся пакеты (по несколько пакетов на процесс,
+    чтобы процессы равномерно загружались и результаты начинали поступать как можно раньше)
+    """
+    chunk_size = min(max(len(items) // (workers * 4), 1), 16)
+    return [items[i : i + chunk_size] for i in range(0, len(items), chunk_size)]
+
+
+def map_pages(filename: str, psw: str, rotations: dict, func, items: list, args: tuple = (), workers: int = 0):
+    """Параллельная обработка заданий по страницам документа в пуле процессов
+
+    Args:
+        filename (str): имя файла документа (каждый процесс открывает его самостоятельно)
+        psw (str): пароль к зашифрованному документу
+        rotations (dict): словарь {индекс страницы: угол поворота} для страниц, которые
+                          необходимо повернуть так же, как в основном процессе
+        func: функция уровня модуля func(doc, item, *args), выполняющая одно задание
+        items (list): список заданий
+        args (tuple): дополнительные аргументы функции func
+        workers (int): количество процессов (0 - по количеству ядер процессора)
+
+    Yields:
+        результаты выполнения func в порядке следования заданий в items
+    """
+    workers = min(get_workers_count(workers), len(items))
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(filename, psw, rotations, fitz.TOOLS.set_small_glyph_heights()),
+    )
+    chunks = iter(_split_chunks(items, workers))
+    futures = deque()
+    try:
+        # Отправляем в работу первые пакеты (не более PENDING_CHUNKS_PER_WORKER на процесс)
+        for chunk in islice(chunks, workers * PENDING_CHUNKS_PER_WORKER):
+            futures.append(executor.submit(_process_chunk, func, chunk, args))
+
+        # Забираем результаты строго по порядку пакетов, на место каждого забранного отправляем следующий
+        while futures:
+            results = futures.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                futures.append(executor.submit(_process_chunk, func, chunk, args))
+            yield from results
+    finally:
+        # При досрочном прекращении (исключение или отказ от результатов) отменяем оставшиеся пакеты
+        # (параметр cancel_futures у shutdown появился только в Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=True)
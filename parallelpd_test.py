@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+import fitz
+
+import parallelpd
+from parallelpd import PENDING_CHUNKS_PER_WORKER
+from parallelpd import map_pages
+
+
+def _page_width(doc, pno: int) -> int:
+    return int(doc[pno].rect.width)
+
+
+class _SyncExecutor:
+    """Пул процессов, выполняющий задания сразу в основном процессе и считающий отправленные пакеты"""
+
+    submitted = 0
+
+    def __init__(self, max_workers, initializer, initargs):
+        self.max_workers = max_workers
+        initializer(*initargs)
+
+    def submit(self, func, *args):
+        _SyncExecutor.submitted += 1
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class TestMapPages(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+        doc = fitz.open()
+        for pno in range(100):
+            doc.new_page(width=100 + pno, height=200)
+        doc.save(self.filename)
+        doc.close()
+        _SyncExecutor.submitted = 0
+
+    def tearDown(self):
+        parallelpd._worker_doc.close()  # pylint: disable=protected-access
+        os.remove(self.filename)
+
+    def test_ordered_and_bounded(self):
+        workers = 2
+        with mock.patch.object(parallelpd, 'ProcessPoolExecutor', _SyncExecutor):
+            results = []
+            for width in map_pages(self.filename, '', {}, _page_width, list(range(100)), workers=workers):
+                results.append(width)
+                # Пакеты по 12 страниц: в работе (отправлены, но не забраны) не больше допустимого
+                taken = (len(results) - 1) // 12 + 1
+                self.assertLessEqual(_SyncExecutor.submitted - taken, workers * PENDING_CHUNKS_PER_WORKER)
+        self.assertEqual(results, [100 + pno for pno in range(100)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -47,31 +47,51 @@ class CensoreMode(enum.IntEnum):
     CM_FILLWHITE = 2
 
 
+class SaveProfile(enum.IntEnum):
+    """Профили сохранения файлов PDF (соотношение скорости сохранения и размера файла)"""
+
+    SP_FAST = 0
+    SP_BALANCED = 1
+    SP_SMALLEST = 2
+
+
 class SaveParams:  # pylint: disable=too-many-instance-attributes
     """Настройки сохранения документа"""
 
-    def __init__(self):
+    def __init__(self, load_settings: bool = True):
+        """
+        Args:
+            load_settings (bool): считать сохраненные настройки программы (False - значения по умолчанию,
+                                  например, для пакетного режима, не зависящего от последних настроек окон)
+        """
         # Считывание настроек
-        settings = QSettings(const.SETTINGS_ORGANIZATION, const.SETTINGS_APPLICATION)
+        settings = QSettings(const.SETTINGS_ORGANIZATION, const.SETTINGS_APPLICATION) if load_settings else None
 
-        self.format = FileFormat(int(settings.value('format', FileFormat.FMT_PDF.value)))
-        self.format_censore = FileFormat(int(settings.value('format_censore', FileFormat.FMT_PDF_JPEG.value)))
-        self.pgmode = PageMode(int(settings.value('pgmode', PageMode.PG_ALL.value)))
+        def value(key: str, default):
+            return settings.value(key, default) if settings is not None else default
 
-        self.pgrange = settings.value('pgrange', '')
-        self.dpi = settings.value('dpi', 300)
-        self.quality = int(settings.value('quality', 75))
-        self.singles = self.value_to_bool(settings.value('singles', False))
+        self.format = FileFormat(int(value('format', FileFormat.FMT_PDF.value)))
+        self.format_censore = FileFormat(int(value('format_censore', FileFormat.FMT_PDF_JPEG.value)))
+        self.pgmode = PageMode(int(value('pgmode', PageMode.PG_ALL.value)))
 
-        self.censore_fio = self.value_to_bool(settings.value('censoreFIO', True))
-        self.censore_addr = self.value_to_bool(settings.value('censoreAddr', True))
-        self.censore_post = self.value_to_bool(settings.value('censorePost', True))
-        self.censore_ipu = self.value_to_bool(settings.value('censoreIPU', True))
-        self.censore_qr = self.value_to_bool(settings.value('censoreQR', True))
+        self.pgrange = value('pgrange', '')
+        self.dpi = int(value('dpi', 300))
+        self.quality = int(value('quality', 75))
+        self.singles = self.value_to_bool(value('singles', False))
+        self.profile = SaveProfile(int(value('profile', SaveProfile.SP_BALANCED.value)))
+
+        self.censore_fio = self.value_to_bool(value('censoreFIO', True))
+        self.censore_addr = self.value_to_bool(value('censoreAddr', True))
+        self.censore_post = self.value_to_bool(value('censorePost', True))
+        self.censore_ipu = self.value_to_bool(value('censoreIPU', True))
+        self.censore_qr = self.value_to_bool(value('censoreQR', True))
 
         self.censore = CensoreMode.CM_NONE
         self.setselectionsonly = False
 
+        # Количество процессов для параллельной растеризации страниц (0 - по количеству ядер процессора)
+        self.workers = get_workers_setting()
+
     def save_params(self):
         """Сохранение настроек в реестре"""
         settings = QSettings(const.SETTINGS_ORGANIZATION, const.SETTINGS_APPLICATION)
@@ -83,6 +103,7 @@ class SaveParams:  # pylint: disable=too-many-instance-attributes
         settings.setValue('dpi', self.dpi)
         settings.setValue('quality', self.quality)
         settings.setValue('singles', self.singles)
+        settings.setValue('profile', self.profile.value)
 
         settings.setValue('censoreFIO', self.censore_fio)
         settings.setValue('censoreAddr', self.censore_addr)
@@ -187,3 +208,17 @@ def get_apps_paths() -> tuple:
 
     except configparser.Error:
         return '', '', ''
+
+
+def get_workers_setting() -> int:
+    """Получение из ini файла количества процессов для параллельной обработки страниц
+
+    Возвращается 0, если значение не задано (т.е. количество процессов определяется по количеству ядер)
+    """
+    config = configparser.ConfigParser()
+    try:
+        # Считываем INI файл
+        config.read(os.path.join(os.path.dirname(__file__), const.SETTINGS_FILENAME))
+        return max(config.getint(const.SETTINGS_SECTION, 'workers', fallback=0), 0)
+    except (configparser.Error, ValueError):
+        return 0
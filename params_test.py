@@ -1,5 +1,6 @@
 import unittest
 
+from params import FileFormat
 from params import PageMode
 from params import SaveParams
 
@@ -57,5 +58,15 @@ class TestPageRanges(unittest.TestCase):
         self.assertEqual(self.params.get_pages_ranges(4, 20), ([], 0))
 
 
+class TestDefaultParams(unittest.TestCase):
+    def test_defaults(self):
+        params = SaveParams(load_settings=False)
+        self.assertEqual(params.format, FileFormat.FMT_PDF)
+        self.assertEqual(params.format_censore, FileFormat.FMT_PDF_JPEG)
+        self.assertEqual(params.pgmode, PageMode.PG_ALL)
+        self.assertEqual(params.dpi, 300)
+        self.assertFalse(params.singles)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,271 @@
+"""
+Этот файл содержит функции распознавания QR кодов во встроенных изображениях документов PDF.
+Результаты распознавания кэшируются: одно и то же изображение (например, повторяющееся на многих
+страницах) распознается не более одного раза за время работы программы.
+
+Распознавание двухэтапное: изображения, которые по размерам и глубине цвета не могут содержать
+QR код, отсеиваются без декодирования, а большие изображения сначала распознаются в уменьшенном
+виде и только при неудаче - в исходном разрешении
+"""
+
+import hashlib
+
+import fitz
+import numpy as np
+from PIL import Image as PILImage
+from pyzbar.pyzbar import decode
+from pyzbar.wrapper import ZBarSymbol
+
+from pagecache import PageCache
+
+
+# Объем памяти под кэш результатов распознавания (байт)
+QR_CACHE_BYTES = 16 * 1024 * 1024
+
+# Примерный объем памяти, занимаемый одним элементом кэша без учета текста QR кодов (байт)
+QR_CACHE_ITEM_BYTES = 256
+
+# Минимальный размер стороны изображения с QR кодом (в QR коде версии 1 - 21 модуль)
+QR_MIN_SIDE = 21
+
+# Максимальное отношение сторон изображения с QR кодом (более вытянутые изображения - линии, полосы и т.п.)
+QR_MAX_ASPECT = 4.0
+
+# Максимальная глубина цвета изображения с QR кодом (бит на компонент)
+QR_MAX_BPC = 8
+
+# Размер большей стороны изображения, начиная с которого сначала распознается уменьшенная копия
+# (0 - всегда распознавать в исходном разрешении)
+QR_DOWNSCALE_SIDE = 800
+
+# Таблица инвертирования значений пикселей изображения в градациях серого
+_INVERT_TABLE = bytes(range(255, -1, -1))
+
+
+class QrDetectParams:
+    """Пороги предварительного отбора изображений и параметры двухэтапного распознавания QR кодов"""
+
+    def __init__(
+        self,
+        min_side: int = QR_MIN_SIDE,
+        max_aspect: float = QR_MAX_ASPECT,
+        max_bpc: int = QR_MAX_BPC,
+        downscale_side: int = QR_DOWNSCALE_SIDE,
+    ):
+        """
+        Args:
+            min_side (int): минимальный размер стороны изображения (пикселей)
+            max_aspect (float): максимальное отношение большей стороны изображения к меньшей
+            max_bpc (int): максимальная глубина цвета изображения (бит на компонент)
+            downscale_side (int): размер большей стороны, до которого уменьшаются большие изображения
+                                  на первом этапе распознавания (0 - без уменьшения)
+        """
+        self.min_side = min_side
+        self.max_aspect = max_aspect
+        self.max_bpc = max_bpc
+        self.downscale_side = downscale_side
+
+    def is_candidate(self, width: int, height: int, bpc: int) -> bool:
+        """Может ли изображение с такими параметрами содержать QR код"""
+        if min(width, height) < self.min_side or bpc > self.max_bpc:
+            return False
+        return max(width, height) <= min(width, height) * self.max_aspect
+
+
+class QrStats:
+    """Статистика распознавания QR кодов (для подбора порогов на реальных документах)"""
+
+    def __init__(self):
+        self.images = 0  # Всего обработано изображений
+        self.skipped = 0  # Отсеяно по размерам и глубине цвета
+        self.cached = 0  # Результат взят из кэша
+        self.downscaled = 0  # Распознавалось в уменьшенном виде
+        self.downscaled_found = 0  # QR код найден в уменьшенном виде
+        self.full = 0  # Распознавалось в исходном разрешении
+        self.found = 0  # Изображений с найденными QR кодами
+
+    def __str__(self) -> str:
+        hit_rate = self.downscaled_found * 100 / self.downscaled if self.downscaled else 0.0
+        return (
+            f'изображений: {self.images}, отсеяно: {self.skipped}, из кэша: {self.cached}, '
+            f'уменьшенных: {self.downscaled} (найдено {self.downscaled_found}, {hit_rate:.0f}%), '
+            f'в исходном разрешении: {self.full}, с QR кодами: {self.found}'
+        )
+
+
+class QrCodeCache:
+    """Кэш результатов распознавания QR кодов во встроенных изображениях. В пределах документа
+    изображение определяется по xref, а одинаковые изображения разных документов - по хэшу их содержимого
+    """
+
+    def __init__(self, max_bytes: int = QR_CACHE_BYTES, detect_params: QrDetectParams = None):
+        self._results = PageCache(max_bytes)  # Результаты распознавания {хэш изображения: список QR кодов}
+        # Хэши изображений документов {id документа: (документ, {xref: хэш})}. Документ хранится вместе
+        # с хэшами, чтобы до освобождения (release) его id не мог достаться другому документу
+        self._keys = {}
+        self.detect_params = detect_params or QrDetectParams()  # Параметры отбора и распознавания
+        self.stats = QrStats()  # Статистика распознавания
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def decode(self, doc, docimg: tuple) -> list:
+        """Распознавание QR кодов во встроенном изображении (или получение результата из кэша)
+
+        Args:
+            doc (fitz doc): документ PDF
+            docimg (tuple): описание изображения из doc.get_page_images (xref, smask, ширина, высота,
+                            глубина цвета, ...)
+
+        Returns:
+            list: список (текст QR кода, (left, top, width, height) - положение QR кода в исходных
+                  пикселях изображения)
+        """
+        xref, _, width, height, bpc = docimg[:5]
+        self.stats.images += 1
+
+        # Изображение не может содержать QR код - даже не декодируем его
+        if not self.detect_params.is_candidate(width, height, bpc):
+            self.stats.skipped += 1
+            return []
+
+        keys = self._keys.setdefault(id(doc), (doc, {}))[1]
+        key = keys.get(xref)
+        if key is None:
+            key = keys[xref] = _get_image_key(doc, xref)
+
+        result = self._results.get(key)
+        if result is not None:
+            self.stats.cached += 1
+            return result
+
+        result = self._decode_image(doc, xref)
+        self.stats.found += bool(result)
+        self._results.put(key, result, QR_CACHE_ITEM_BYTES + sum(len(txt) for txt, _ in result))
+        return result
+
+    def _decode_image(self, doc, xref: int) -> list:
+        """Двухэтапное распознавание QR кодов во встроенном изображении (без кэша)"""
+        # Выделяем изображение (doc.extract_image перестал работать в версии PyMuPDF-1.22.0...)
+        gray = pixmap_to_gray(fitz.Pixmap(doc, xref))
+
+        # Большое изображение сначала распознаем в уменьшенном виде
+        side = self.detect_params.downscale_side
+        factor = -(-max(gray[1], gray[2]) // side) if side > 0 else 1
+        if factor > 1:
+            self.stats.downscaled += 1
+            result = _decode_gray(downscale_gray(gray, factor))
+            if result:
+                self.stats.downscaled_found += 1
+                # Переводим положение QR кодов в исходные пиксели с запасом на потерю точности
+                return [
+                    (txt, (left * factor, top * factor, (width + 1) * factor, (height + 1) * factor))
+                    for txt, (left, top, width, height) in result
+                ]
+
+        # Распознаем в исходном разрешении
+        self.stats.full += 1
+        return _decode_gray(gray)
+
+    def release(self, doc):
+        """Освобождение хэшей изображений документа (при его закрытии). Результаты распознавания
+        остаются в кэше и используются для таких же изображений других документов
+        """
+        self._keys.pop(id(doc), None)
+
+    def clear(self):
+        """Очистка кэша и статистики"""
+        self._results.clear()
+        self._keys.clear()
+        self.stats = QrStats()
+
+
+# Общий кэш для деперсонификации и экспорта реестра (в каждом процессе-обработчике - свой)
+_qr_cache = QrCodeCache()
+
+
+def decode_image_qr(doc, docimg: tuple) -> list:
+    """Распознавание QR кодов во встроенном изображении документа с использованием общего кэша
+
+    Args:
+        doc (fitz doc): документ PDF
+        docimg (tuple): описание изображения из doc.get_page_images
+
+    Returns:
+        list: список (текст QR кода, (left, top, width, height) - положение QR кода в исходных
+              пикселях изображения)
+    """
+    return _qr_cache.decode(doc, docimg)
+
+
+def release_document_qr(doc):
+    """Освобождение хэшей изображений документа в общем кэше (при закрытии документа)"""
+    _qr_cache.release(doc)
+
+
+def get_qr_stats() -> QrStats:
+    """Статистика распознавания QR кодов с использованием общего кэша"""
+    return _qr_cache.stats
+
+
+def reset_qr_stats():
+    """Сброс статистики распознавания QR кодов с использованием общего кэша (кэш сохраняется)"""
+    _qr_cache.stats = QrStats()
+
+
+def _get_image_key(doc, xref: int) -> bytes:
+    """Хэш изображения: его словарь (размеры, цветовое пространство, фильтры) и сжатые данные"""
+    digest = hashlib.sha1(doc.xref_object(xref, compressed=True).encode())
+    digest.update(doc.xref_stream_raw(xref) or b'')
+    return digest.digest()
+
+
+def pixmap_to_gray(pix) -> tuple:
+    """Подготовка изображения для zbar: 8-битные пиксели в градациях серого без альфа-канала,
+    взятые прямо из буфера pixmap (без кодирования в PNG и обратного декодирования)
+
+    Args:
+        pix (fitz.Pixmap): изображение
+
+    Returns:
+        tuple: (пиксели, ширина, высота) - в таком виде изображение принимает pyzbar.decode
+    """
+    # Изображение в градациях серого без альфа-канала берем как есть
+    if pix.n == 1:
+        samples = pix.samples
+        # Левый верхний пиксель изображения черный??? Тогда инвертируем цвета
+        if samples and samples[0] == 0:
+            samples = samples.translate(_INVERT_TABLE)
+        return samples, pix.width, pix.height
+
+    # Прочие цветовые пространства (кроме серого и RGB) сначала приводим к RGB
+    if pix.n - pix.alpha not in (1, 3):
+        pix = fitz.Pixmap(fitz.csRGB, pix)
+
+    # Переводим в градации серого по той же формуле, что и PIL (альфа-канал отбрасывается)
+    arr = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.width, pix.n).astype(np.uint32)
+    if pix.n - pix.alpha == 1:
+        gray = arr[:, :, 0]
+    else:
+        gray = (arr[:, :, 0] * 19595 + arr[:, :, 1] * 38470 + arr[:, :, 2] * 7471 + 0x8000) >> 16
+    return gray.astype(np.uint8).tobytes(), pix.width, pix.height
+
+
+def downscale_gray(gray: tuple, factor: int) -> tuple:
+    """Уменьшение изображения в градациях серого в factor раз (усреднением блоков factor x factor)
+
+    Args:
+        gray (tuple): изображение (пиксели, ширина, высота)
+        factor (int): коэффициент уменьшения
+
+    Returns:
+        tuple: уменьшенное изображение (пиксели, ширина, высота)
+    """
+    samples, width, height = gray
+    img = PILImage.frombytes('L', (width, height), samples).reduce(factor)
+    return img.tobytes(), img.width, img.height
+
+
+def _decode_gray(gray: tuple) -> list:
+    """Распознавание QR кодов в изображении в градациях серого"""
+    return [(qr_obj.data.decode('utf-8'), tuple(qr_obj.rect)) for qr_obj in decode(gray, [ZBarSymbol.QRCODE])]
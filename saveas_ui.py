@@ -181,6 +181,21 @@ class Ui_SaveAsDialog(object):
 
         self.verticalLayout.addWidget(self.grpJPEG)
 
+        self.grpProfile = QGroupBox(SaveAsDialog)
+        self.grpProfile.setObjectName(u"grpProfile")
+        self.verticalLayout_5 = QVBoxLayout(self.grpProfile)
+        self.verticalLayout_5.setObjectName(u"verticalLayout_5")
+        self.cmbProfile = QComboBox(self.grpProfile)
+        self.cmbProfile.addItem("")
+        self.cmbProfile.addItem("")
+        self.cmbProfile.addItem("")
+        self.cmbProfile.setObjectName(u"cmbProfile")
+
+        self.verticalLayout_5.addWidget(self.cmbProfile)
+
+
+        self.verticalLayout.addWidget(self.grpProfile)
+
         self.grpCensore = QGroupBox(SaveAsDialog)
         self.grpCensore.setObjectName(u"grpCensore")
         self.verticalLayout_4 = QVBoxLayout(self.grpCensore)
@@ -236,6 +251,11 @@ class Ui_SaveAsDialog(object):
 
         self.lblQualityVal.setText(QCoreApplication.translate("SaveAsDialog", u"100", None))
         self.lblQuality.setText(QCoreApplication.translate("SaveAsDialog", u"\u041a\u0430\u0447\u0435\u0441\u0442\u0432\u043e:", None))
+        self.grpProfile.setTitle(QCoreApplication.translate("SaveAsDialog", u"\u0421\u0436\u0430\u0442\u0438\u0435 \u0444\u0430\u0439\u043b\u0430 PDF", None))
+        self.cmbProfile.setItemText(0, QCoreApplication.translate("SaveAsDialog", u"\u0411\u044b\u0441\u0442\u0440\u043e\u0435 \u0441\u043e\u0445\u0440\u0430\u043d\u0435\u043d\u0438\u0435 (\u0431\u0435\u0437 \u043f\u043e\u0432\u0442\u043e\u0440\u043d\u043e\u0433\u043e \u0441\u0436\u0430\u0442\u0438\u044f \u0434\u0430\u043d\u043d\u044b\u0445)", None))
+        self.cmbProfile.setItemText(1, QCoreApplication.translate("SaveAsDialog", u"\u0421\u0431\u0430\u043b\u0430\u043d\u0441\u0438\u0440\u043e\u0432\u0430\u043d\u043d\u043e\u0435 (\u0441\u0436\u0430\u0442\u0438\u0435 \u0434\u0430\u043d\u043d\u044b\u0445 \u0431\u0435\u0437 \u043e\u043f\u0442\u0438\u043c\u0438\u0437\u0430\u0446\u0438\u0438 \u0441\u0442\u0440\u0443\u043a\u0442\u0443\u0440\u044b \u0444\u0430\u0439\u043b\u0430)", None))
+        self.cmbProfile.setItemText(2, QCoreApplication.translate("SaveAsDialog", u"\u041c\u0438\u043d\u0438\u043c\u0430\u043b\u044c\u043d\u044b\u0439 \u0440\u0430\u0437\u043c\u0435\u0440 \u0444\u0430\u0439\u043b\u0430 (\u043f\u043e\u043b\u043d\u0430\u044f \u043e\u043f\u0442\u0438\u043c\u0438\u0437\u0430\u0446\u0438\u044f, \u043c\u0435\u0434\u043b\u0435\u043d\u043d\u043e)", None))
+
         self.grpCensore.setTitle(QCoreApplication.translate("SaveAsDialog", u"\u041f\u0435\u0440\u0441\u043e\u043d\u0430\u043b\u044c\u043d\u044b\u0435 \u0434\u0430\u043d\u043d\u044b\u0435 / \u043a\u043e\u043c\u043c\u0435\u0440\u0447\u0435\u0441\u043a\u0430\u044f \u0442\u0430\u0439\u043d\u0430", None))
         self.cmbCensore.setItemText(0, QCoreApplication.translate("SaveAsDialog", u"\u0411\u0435\u0437 \u043e\u0431\u0440\u0430\u0431\u043e\u0442\u043a\u0438 \u0438\u0437\u043e\u0431\u0440\u0430\u0436\u0435\u043d\u0438\u044f", None))
         self.cmbCensore.setItemText(1, QCoreApplication.translate("SaveAsDialog", u"\u0420\u0430\u0437\u043c\u044b\u0442\u044c \u0438\u043d\u0444\u043e\u0440\u043c\u0430\u0446\u0438\u044e \u0432 \u0432\u044b\u0434\u0435\u043b\u0435\u043d\u043d\u044b\u0445 \u043e\u0431\u043b\u0430\u0441\u0442\u044f\u0445 \u0434\u043e\u043a\u0443\u043c\u0435\u043d\u0442\u0430", None))
@@ -12,6 +12,7 @@ from params import CensoreMode
 from params import FileFormat
 from params import PageMode
 from params import SaveParams
+from params import SaveProfile
 from saveas_ui import Ui_SaveAsDialog
 
 
@@ -62,6 +63,9 @@ class SaveAsDialog(QDialog):
         self.ui.cmbDPI.setCurrentText(str(self._current_params.dpi))
         self.ui.SliderQuality.setValue(self._current_params.quality)
 
+        # -- профиль сжатия создаваемых файлов PDF
+        self.ui.cmbProfile.setCurrentIndex(self._current_params.profile.value)
+
         # -- порядок деперсонификации данных в выделенных областях
         self.ui.cmbCensore.setCurrentIndex(self._current_params.censore.value)
 
@@ -81,6 +85,7 @@ class SaveAsDialog(QDialog):
         self._current_params.singles = self.ui.chkSingles.isChecked()
         self._current_params.dpi = int(self.ui.cmbDPI.currentText())
         self._current_params.quality = self.ui.SliderQuality.value()
+        self._current_params.profile = SaveProfile(self.ui.cmbProfile.currentIndex())
         self._current_params.censore = CensoreMode(self.ui.cmbCensore.currentIndex())
 
     def _format_checked(self, m_format: FileFormat):
@@ -107,6 +112,9 @@ class SaveAsDialog(QDialog):
         self.ui.SliderQuality.setEnabled(is_quality)
         self.ui.lblQualityVal.setEnabled(is_quality)
 
+        # Переключаем доступность выбора профиля сжатия (только для файлов PDF)
+        self.ui.cmbProfile.setEnabled(m_format in (FileFormat.FMT_PDF, FileFormat.FMT_PDF_JPEG))
+
     def _pagemode_checked(self, m_pgmode: PageMode):
         """Обработка выбора формата файла/файлов"""
 
@@ -3,22 +3,188 @@
 (с возможностью деперсонификации выделенных областей)
 """
 
-import io
+import heapq
 import os
 import shutil
+from contextlib import closing
+
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
 
 import fitz
-from PIL import Image as PILImage
 from PySide2.QtWidgets import QMessageBox
 
-from censorepd import censore_img
 from censorepd import censore_page
+from censorepd import censore_pixmap
+from combinepd import image_to_pdf
+from parallelpd import PARALLEL_MIN_PAGES
+from parallelpd import get_workers_count
+from parallelpd import map_pages
 
 # from mainwindow import MainWindow
 from params import FileFormat
 from params import PageMode
 from params import SaveParams
-from siapdfview import SiaPdfView
+from params import SaveProfile
+from qrdecode import release_document_qr
+from textcache import release_document_text
+
+
+# Количество страниц PDF_JPEG, после добавления которых они сбрасываются на диск
+JPEG_PDF_FLUSH_PAGES = 16
+
+# Код операции ioctl FICLONE (Linux): клонирование файла без копирования данных (reflink)
+FICLONE = 0x40049409
+
+# Параметры сохранения файлов PDF для каждого профиля сохранения. insert_pdf переносит в новый
+# документ только объекты, на которые ссылаются страницы, поэтому для обычного сохранения достаточно
+# удаления неиспользуемых объектов (garbage=1). Поиск дубликатов объектов и очистка содержимого страниц
+# (garbage=4, clean=True) уменьшают файл ненамного, но в разы замедляют сохранение
+SAVE_PROFILES = {
+    SaveProfile.SP_FAST: {'garbage': 1},
+    SaveProfile.SP_BALANCED: {'garbage': 1, 'deflate': True, 'deflate_images': True, 'deflate_fonts': True},
+    SaveProfile.SP_SMALLEST: {
+        'garbage': 4,
+        'clean': True,
+        'deflate': True,
+        'deflate_images': True,
+        'deflate_fonts': True,
+    },
+}
+
+
+class SaveDocument:
+    """Сохраняемый документ: объект fitz.Document (с поворотами страниц) и список выделенных
+    областей в координатах страниц. Функции сохранения работают только с ним и не зависят от виджетов
+    """
+
+    def __init__(
+        self,
+        doc,
+        filename: str = '',
+        psw: str = '',
+        is_real_file: bool = False,
+        selections: list = None,
+        rotated_pages: set = None,
+    ):  # pylint: disable=too-many-arguments
+        """
+        Args:
+            doc (fitz doc): документ PDF
+            filename (str): имя файла документа на диске
+            psw (str): пароль к зашифрованному документу
+            is_real_file (bool): True - документ соответствует файлу filename на диске,
+                                 False - документ создан в памяти (объединение, конвертация)
+            selections (list): список выделений (индекс страницы или -1, fitz.Rect в координатах страницы)
+            rotated_pages (set): индексы страниц, повернутых после открытия файла
+                                 (None - неизвестно, при сохранении проверяются все страницы)
+        """
+        self.doc = doc
+        self.filename = filename
+        self.psw = psw
+        self.is_real_file = is_real_file
+        self.selections = selections or []
+        self.rotated_pages = rotated_pages
+
+    @classmethod
+    def open(cls, filename: str, psw: str = '', selections: list = None):
+        """Открытие файла (файлы других форматов конвертируются в PDF)
+
+        Args:
+            filename (str): имя файла
+            psw (str): пароль к зашифрованному документу
+            selections (list): список выделений (индекс страницы или -1, fitz.Rect в координатах страницы)
+
+        Returns:
+            SaveDocument: открытый документ (его необходимо закрыть методом close)
+        """
+        doc = fitz.open(filename)
+        is_real_file = True
+
+        # Это не PDF? Пытаемся сконвертировать в PDF (изображения PNG по возможности встраиваем как есть)
+        if not doc.is_pdf:
+            pdfbytes = image_to_pdf(filename) or doc.convert_to_pdf()
+            doc.close()
+            doc = fitz.open('pdf', pdfbytes)
+            is_real_file = False  # Это виртуальный/новый файл
+
+        # Этот документ зашифрован?
+        if doc.needs_pass and not doc.authenticate(psw):
+            doc.close()
+            raise ValueError('Неверный пароль к зашифрованному документу')
+
+        # Только что открытый документ еще не содержит повернутых страниц
+        return cls(doc, filename, psw, is_real_file, selections, set())
+
+    @property
+    def page_count(self) -> int:
+        """Количество страниц документа"""
+        return len(self.doc)
+
+    def close(self):
+        """Закрытие документа"""
+        release_document_text(self.doc)
+        release_document_qr(self.doc)
+        self.doc.close()
+
+
+class _JpegPdfWriter:
+    """Постраничная запись файла PDF_JPEG. Страницы периодически сбрасываются на диск
+    (инкрементальным сохранением во временный файл), поэтому в памяти одновременно находится
+    не больше JPEG_PDF_FLUSH_PAGES изображений страниц независимо от размера документа
+    """
+
+    def __init__(self, outfile: str, profile: SaveProfile = SaveProfile.SP_BALANCED):
+        self._outfile = outfile  # имя итогового файла
+        self._profile = profile  # профиль сохранения
+        self._tmpfile = outfile + '.part'  # имя временного файла (переименовывается по окончании записи)
+        self._doc = fitz.open()  # документ с еще не сброшенными на диск страницами
+        self._pending = 0  # количество страниц, не сброшенных на диск
+        self._is_saved = False  # признак того, что временный файл уже создан
+
+    def add_page(self, rect, stream: bytes):
+        """Добавление страницы размером rect с изображением в формате JPEG"""
+        _insert_jpeg_page(self._doc, rect, stream)
+        self._pending += 1
+        if self._pending >= JPEG_PDF_FLUSH_PAGES:
+            self._flush()
+
+    def _flush(self):
+        """Сброс добавленных страниц на диск и освобождение занятой ими памяти"""
+        if self._is_saved:
+            self._doc.saveIncr()
+        else:
+            self._doc.save(self._tmpfile, **SAVE_PROFILES[self._profile])
+            self._is_saved = True
+
+        # Переоткрываем файл: сброшенные страницы больше не держат изображения в памяти
+        self._doc.close()
+        self._doc = fitz.open(self._tmpfile)
+        self._pending = 0
+
+    def finish(self):
+        """Завершение записи файла"""
+        if self._pending or not self._is_saved:
+            self._flush()
+
+        # Для минимального размера файла переписываем его целиком (без инкрементальных обновлений)
+        if self._profile == SaveProfile.SP_SMALLEST:
+            self._doc.save(self._outfile, **SAVE_PROFILES[self._profile])
+            self._doc.close()
+            os.remove(self._tmpfile)
+            return
+
+        self._doc.close()
+        os.replace(self._tmpfile, self._outfile)
+
+    def abort(self):
+        """Прекращение записи с удалением временного файла"""
+        if not self._doc.is_closed:
+            self._doc.close()
+        if os.path.exists(self._tmpfile):
+            os.remove(self._tmpfile)
 
 
 def _check_new_file(
@@ -54,31 +220,43 @@ def _check_new_file(
     return fn, is_overwrite_all, False
 
 
-def _saveas_incrementally(pdf_view: SiaPdfView, outfile: str, progress_callback=None, show_error_message_callback=None):
+def _saveas_incrementally(
+    source: SaveDocument, outfile: str, progress_callback=None, show_error_message_callback=None
+):
     """Инкрементальный вариант сохранения - когда существующий файл пересохраняется
     сам в себя целиком в исходном формате (когда необходимо только повернуть страницы)
     """
     # Копируем исходный файл в файл с новым именем
-    shutil.copyfile(pdf_view.current_filename, outfile)
+    _copy_file(source.filename, outfile)
 
     # noinspection PyUnresolvedReferences
     doc = fitz.open(outfile)
     if doc.needs_pass:
-        doc.authenticate(pdf_view.psw)
+        doc.authenticate(source.psw)
+
+    # Проверяем только страницы, повернутые в программе (если они известны)
+    if source.rotated_pages is not None:
+        pages = sorted(pno for pno in source.rotated_pages if pno < len(doc))
+    else:
+        pages = range(len(doc))
 
-    ranges_page_count = len(doc)
-    for pno in range(ranges_page_count):
+    is_changed = False  # признак наличия измененных страниц
+    for ind, pno in enumerate(pages):
         # Поворачиваем страницу в соответствии с отображаемым на экране объектом
-        doc[pno].set_rotation(pdf_view.doc[pno].rotation)
+        # (страница могла вернуться в исходное положение - тогда она не изменяется)
+        rotation = source.doc[pno].rotation
+        page = doc[pno]
+        if page.rotation != rotation:
+            page.set_rotation(rotation)
+            is_changed = True
 
         # Вызываем callback функцию для обновления прогрессбара
         if progress_callback is not None:
-            progress_callback(pno * 95 // ranges_page_count)
+            progress_callback(ind * 95 // len(pages))
     try:
-        # Сохраняем файл в инкрементальном режиме
-        doc.save(
-            outfile, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP
-        )  # , garbage=4, clean=True, deflate=True, deflate_images=True, deflate_fonts=True)
+        # Дописываем в файл инкрементальное обновление только с измененными страницами
+        if is_changed:
+            doc.save(outfile, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
     except Exception as e:
         doc.close()
         if show_error_message_callback is not None:
@@ -93,11 +271,30 @@ def _saveas_incrementally(pdf_view: SiaPdfView, outfile: str, progress_callback=
     return True
 
 
+def _copy_file(src: str, dst: str):
+    """Быстрое копирование файла: на файловых системах с поддержкой reflink (Btrfs, XFS) файл клонируется
+    без копирования данных, иначе копируется средствами ОС (shutil использует sendfile/fcopyfile)
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f'{src!r} and {dst!r} are the same file')
+
+    if fcntl is not None:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            return
+        except OSError:
+            pass  # клонирование не поддерживается - копируем файл обычным способом
+
+    shutil.copyfile(src, dst)
+
+
 def _saveas_by_ranges(
-    pdf_view: SiaPdfView,
+    source: SaveDocument,
     page_ranges: list,
     ranges_page_count: int,
     outfile: str,
+    profile: SaveProfile = SaveProfile.SP_BALANCED,
     progress_callback=None,
     show_error_message_callback=None,
 ):
@@ -105,15 +302,15 @@ def _saveas_by_ranges(
     (например, когда необходимо разделить файл)
     """
     # Объект fitz с документом
-    doc = pdf_view.doc
+    doc = source.doc
 
     # Создаем объект fitz Document для нового документа
     pdfout = fitz.open()
 
     ind = 0  # Счетчик страниц в конечном файле
 
-    # Обходим все объекты range из списка page_ranges
-    for page_range in page_ranges:
+    # Обходим все объекты range из списка page_ranges (смежные диапазоны переносим за один раз)
+    for page_range in _merge_ranges(page_ranges):
         # Если это нормальный диапазон (не обратный), то сразу его и переносим в новый документ
         if page_range.step == 1:
             ind += page_range.stop - page_range.start  # Счетчик страниц/файлов в конечном файле
@@ -129,15 +326,7 @@ def _saveas_by_ranges(
 
     try:
         # Сохраняем новый файл
-        pdfout.save(
-            outfile,
-            garbage=4,
-            clean=True,
-            deflate=True,
-            deflate_images=True,
-            deflate_fonts=True,
-            encryption=fitz.PDF_ENCRYPT_KEEP,
-        )
+        pdfout.save(outfile, encryption=fitz.PDF_ENCRYPT_KEEP, **SAVE_PROFILES[profile])
     except Exception as e:
         pdfout.close()
         if show_error_message_callback is not None:
@@ -152,8 +341,21 @@ def _saveas_by_ranges(
     return True
 
 
+def _merge_ranges(page_ranges: list) -> list:
+    """Объединение смежных диапазонов страниц одного направления (например, "1,2,3-5" -> "1-5"),
+    чтобы переносить их в новый документ за один вызов insert_pdf
+    """
+    merged = []
+    for page_range in page_ranges:
+        if merged and page_range.step == merged[-1].step and page_range.start == merged[-1].stop:
+            merged[-1] = range(merged[-1].start, page_range.stop, page_range.step)
+        else:
+            merged.append(page_range)
+    return merged
+
+
 def saveas_process(  # noqa: ignore=C901
-    pdf_view: SiaPdfView,
+    source: SaveDocument,
     page_ranges: list,
     ranges_page_count: int,
     outfile: str,
@@ -180,34 +382,94 @@ def saveas_process(  # noqa: ignore=C901
     # Инкрементальный вариант сохранения - когда существующий файл пересохраняется
     # сам в себя целиком в исходном формате (когда необходимо только повернуть страницы)
     if (
-        pdf_view.is_real_file
+        source.is_real_file
         and param.format == FileFormat.FMT_PDF
         and param.pgmode == PageMode.PG_ALL
         and (not m_singles)
-        and pdf_view.doc.can_save_incrementally()
+        and source.doc.can_save_incrementally()
     ):
         # Обрабатываем инкрементальное сохранение и возвращаем результат
-        return _saveas_incrementally(pdf_view, outfile, progress_callback, show_error_msg_callback)
+        return _saveas_incrementally(source, outfile, progress_callback, show_error_msg_callback)
 
     # Вариант сохранения по диапазонам - когда файл сохраняется в исходном формате диапазонами страниц
     # (например, когда необходимо разделить файл)
     if param.format == FileFormat.FMT_PDF and (not m_singles):
         # Обрабатываем подиапазонное сохранение и возвращаем результат
         return _saveas_by_ranges(
-            pdf_view, page_ranges, ranges_page_count, outfile, progress_callback, show_error_msg_callback
+            source, page_ranges, ranges_page_count, outfile, param.profile, progress_callback, show_error_msg_callback
         )
 
-    # Объект fitz с документом
-    doc = pdf_view.doc
-
-    # Если сохраняем целиком файл в формате PDF_JPG, то создаем объект fitz Document (pdfout)
+    # Если сохраняем целиком файл в формате PDF_JPG, то страницы сразу записываются в файл (pdfout)
     if param.format == FileFormat.FMT_PDF_JPEG and not m_singles:
-        # noinspection PyUnresolvedReferences
-        pdfout = fitz.open()
+        pdfout = _JpegPdfWriter(outfile, param.profile)
+    else:
+        pdfout = None
 
-    zoom = param.dpi / 72  # зум-фактор для растеризации изображения
-    mat = fitz.Matrix(zoom, zoom)  # матрица трансформирования для растеризации изображения
-    pixelator = param.dpi // 20  # коэффициент пикселизации конфиденциальной информации
+    # Если сохраняем много страниц реального файла в графические форматы (или по отдельным файлам PDF),
+    # то обрабатываем их параллельно в нескольких процессах, каждый из которых сам открывает исходный файл
+    workers = get_workers_count(param.workers)
+    is_parallel = workers > 1 and source.is_real_file and ranges_page_count >= PARALLEL_MIN_PAGES
+
+    try:
+        if is_parallel:
+            _saveas_pages_parallel(
+                source,
+                page_ranges,
+                ranges_page_count,
+                outfile,
+                ext,
+                param,
+                censore,
+                pdfout,
+                workers,
+                progress_callback,
+                overwrite_msg_callback,
+                show_save_error_msg_callback,
+            )
+        else:
+            _saveas_pages_serial(
+                source,
+                page_ranges,
+                ranges_page_count,
+                outfile,
+                ext,
+                param,
+                censore,
+                pdfout,
+                progress_callback,
+                overwrite_msg_callback,
+                show_save_error_msg_callback,
+            )
+    except BaseException:
+        # Процесс прерван - удаляем недописанный файл
+        if pdfout is not None:
+            pdfout.abort()
+        raise
+
+    return _save_pdfout(pdfout, progress_callback, show_error_msg_callback)
+
+
+def _saveas_pages_serial(
+    source: SaveDocument,
+    page_ranges: list,
+    ranges_page_count: int,
+    outfile: str,
+    ext: str,
+    param: SaveParams,
+    censore: bool,
+    pdfout,
+    progress_callback=None,
+    overwrite_msg_callback=None,
+    show_save_error_msg_callback=None,
+):  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+    """Последовательное сохранение страниц в отдельные файлы (PDF, JPEG, PNG, PDF_JPEG)
+    или в один файл PDF_JPEG (pdfout)
+    """
+    # Объект fitz с документом
+    doc = source.doc
+
+    # Выделения в координатах страниц документа по страницам (используются при растеризации с размытием)
+    selections = _group_selections(source.selections)
 
     is_overwrite_all = False  # признак "перезаписывать все файлы"
     ind = 0  # Счетчик страниц/файлов в конечном файле
@@ -226,12 +488,6 @@ def saveas_process(  # noqa: ignore=C901
             # Сохраняем файлы в PDF? (остался только постраничный вариант)
             ###################################################################
             if param.format == FileFormat.FMT_PDF:
-                # Создаем новый объект fitz Document
-                newdoc = fitz.open()
-
-                # Вставляем страницу
-                newdoc.insert_pdf(doc, from_page=pno, to_page=pno)
-
                 # Проверяем существование файла с таким же именем, спрашиваем пользователя если что
                 fn, is_overwrite_all, abort = _check_new_file(
                     outfile, ext, ind, is_overwrite_all, overwrite_msg_callback
@@ -241,166 +497,231 @@ def saveas_process(  # noqa: ignore=C901
                     raise FileNotFoundError('Файл для записи не определен')
                 # Если пользователь решил не перезаписывать файл, то идем к следующей странице
                 if not fn:
-                    # Закрываем объект fitz Document
-                    newdoc.close()
                     continue
 
-                while True:
-                    try:
-                        # Пытаемся записать файл
-                        newdoc.save(fn, garbage=4, clean=True, deflate=True, deflate_images=True, deflate_fonts=True)
-                        break
-                    except Exception as e:
-                        # Вызываем callback функцию для вывода сообщения об ошибке и получаем реакцию пользователя
-                        if show_save_error_msg_callback is not None:
-                            res = show_save_error_msg_callback(e)
-                        else:
-                            res = False
-
-                        if res:
-                            break
-
-                        newdoc.close()
-                        raise FileNotFoundError('Пользователь прервал процесс') from e
-
-                # Закрываем объект fitz Document и идем к следующей странице
-                newdoc.close()
+                try:
+                    # Пытаемся записать файл
+                    _save_page_pdf(doc, pno, fn, param.profile)
+                except Exception as e:
+                    # Выясняем у пользователя, продолжать ли процесс
+                    _process_save_error(e, show_save_error_msg_callback)
                 continue
 
             ###################################################################
             # Остались варианты с графическими форматами
             ###################################################################
 
-            # Если мы в режиме деперсонификации,
-            if censore:
-                # то формируем отцензуренное изображение (при этом выделения игнорируются)
-                pix = censore_page(doc=doc, pno=pno, param=param)
-            else:
-                # иначе растеризуем страницу (при этом учитывается настройка размытия выделений)
-                pix = _render_page(pdf_view, pno, param, mat, pixelator)
+            # Растеризуем страницу (с деперсонификацией или с учетом настройки размытия выделений)
+            pix = _get_page_pixmap(doc, pno, param, censore, selections)
 
-            # Берем страницу документа
-            page = doc[pno]
+            # Если это PDF с растровым изображением без разбивки на отдельные PDF, то добавляем
+            # страницу в pdfout и переходим к следующей странице
+            if pdfout is not None:
+                pdfout.add_page(doc[pno].rect, _encode_jpeg(pix, param.quality))
+                continue
 
-            ###################################################################
-            # Это формат PDF с растровым изображением???
-            ###################################################################
-            if param.format == FileFormat.FMT_PDF_JPEG:
-                # Сохраняем изображение в буфер в формате jpeg
-                temp = io.BytesIO()
-                pix.pil_save(temp, format="jpeg", quality=param.quality)
-
-                # Если без разбивки на отдельные PDF, то добавляем страницу в pdfout и переходим к следующей странице
-                if not m_singles:
-                    opage = pdfout.new_page(width=page.rect.width, height=page.rect.height)
-                    opage.insert_image(opage.rect, stream=temp)
-                    continue
+            # Проверяем существование файла с таким же именем, спрашиваем пользователя если что
+            fn, is_overwrite_all, abort = _check_new_file(outfile, ext, ind, is_overwrite_all, overwrite_msg_callback)
+            # Если пользователь прервал процесс, то инициируем исключение
+            if abort:
+                raise FileNotFoundError('Файл для записи не определен')
 
-                # Создаем новый объект fitz Document
-                newdoc = fitz.open()
+            # Если пользователь решил не перезаписывать файл, то идем к следующей странице
+            if not fn:
+                continue
 
-                # Вставляем страницу
-                opage = newdoc.new_page(width=page.rect.width, height=page.rect.height)
-                opage.insert_image(opage.rect, stream=temp)
+            try:
+                # Пытаемся записать файл
+                _save_page_image(doc, pno, pix, fn, param)
+            except Exception as e:
+                # Выясняем у пользователя, продолжать ли процесс
+                _process_save_error(e, show_save_error_msg_callback)
 
-                # Проверяем существование файла с таким же именем, спрашиваем пользователя если что
-                fn, is_overwrite_all, abort = _check_new_file(
-                    outfile, ext, ind, is_overwrite_all, overwrite_msg_callback
-                )
-                # Если пользователь прервал процесс, то инициируем исключение
-                if abort:
-                    raise FileNotFoundError('Файл для записи не определен')
 
-                # Если пользователь решил не перезаписывать файл, то идем к следующей странице
-                if not fn:
-                    # Закрываем объект fitz Document
-                    newdoc.close()
-                    continue
+def _saveas_pages_parallel(
+    source: SaveDocument,
+    page_ranges: list,
+    ranges_page_count: int,
+    outfile: str,
+    ext: str,
+    param: SaveParams,
+    censore: bool,
+    pdfout,
+    workers: int,
+    progress_callback=None,
+    overwrite_msg_callback=None,
+    show_save_error_msg_callback=None,
+):  # pylint: disable=too-many-arguments,too-many-locals
+    """Параллельное сохранение страниц в отдельные файлы (PDF, JPEG, PNG, PDF_JPEG) или растеризация
+    в один файл PDF_JPEG в пуле процессов. Результат полностью совпадает с последовательным вариантом
+    """
+    doc = source.doc
+
+    # Заранее формируем список заданий (порядковый номер, индекс страницы, имя файла)
+    # и выясняем у пользователя все вопросы о перезаписи существующих файлов
+    tasks = []
+    is_overwrite_all = False  # признак "перезаписывать все файлы"
+    ind = 0  # Счетчик страниц/файлов в конечном файле
+    for page_range in page_ranges:
+        for pno in page_range:
+            ind += 1
 
-                while True:
-                    try:
-                        # Пытаемся записать файл
-                        newdoc.save(
-                            fn,
-                            garbage=4,
-                            clean=True,
-                            deflate=True,
-                            deflate_images=True,
-                            deflate_fonts=True,
-                            encryption=fitz.PDF_ENCRYPT_KEEP,
-                        )
-                        break
-                    except Exception as e:
-                        # Вызываем callback функцию для вывода сообщения об ошибке и получаем реакцию пользователя
-                        if show_save_error_msg_callback is not None:
-                            res = show_save_error_msg_callback(e)
-                        else:
-                            res = False
-
-                        if res:
-                            break
-
-                        newdoc.close()
-                        raise FileNotFoundError('Пользователь прервал процесс') from e
-
-                # Закрываем объект fitz Document и идем к следующей странице
-                newdoc.close()
+            # Если страницы собираются в один PDF, то процесс возвращает изображение, а не пишет файл
+            if pdfout is not None:
+                tasks.append((ind, pno, ''))
                 continue
 
-            ###################################################################
-            # Остались форматы JPEG и PNG
-            ###################################################################
             # Проверяем существование файла с таким же именем, спрашиваем пользователя если что
             fn, is_overwrite_all, abort = _check_new_file(outfile, ext, ind, is_overwrite_all, overwrite_msg_callback)
             # Если пользователь прервал процесс, то инициируем исключение
             if abort:
                 raise FileNotFoundError('Файл для записи не определен')
+            # Если пользователь решил не перезаписывать файл, то пропускаем страницу
+            if fn:
+                tasks.append((ind, pno, fn))
+
+    if not tasks:
+        return
+
+    # Повороты страниц, установленные в программе, процессы должны применить к своим документам
+    rotations = {pno: doc[pno].rotation for _, pno, _ in tasks}
+
+    results = map_pages(
+        source.filename,
+        source.psw,
+        rotations,
+        _render_task,
+        tasks,
+        (param, censore, _group_selections(source.selections)),
+        workers,
+    )
+    with closing(results):
+        for (ind, pno, _), (data, error) in zip(tasks, results):
+            # Вызываем callback функцию для обновления прогрессбара
+            if progress_callback is not None:
+                progress_callback(ind * 99 // ranges_page_count)
 
-            # Если пользователь решил не перезаписывать файл, то идем к следующей странице
-            if not fn:
-                continue
+            if error is not None:
+                # Процесс не смог записать файл - выясняем у пользователя, продолжать ли
+                _process_save_error(error, show_save_error_msg_callback)
+            elif data is not None:
+                # Процесс вернул изображение в формате JPEG - добавляем страницу в pdfout
+                pdfout.add_page(doc[pno].rect, data)
 
-            while True:
-                try:
-                    # Пытаемся записать файл
-                    if param.format == FileFormat.FMT_JPEG:
-                        pix.pil_save(fn, format="jpeg", quality=param.quality)
-                    else:
-                        pix.pil_save(fn, format="png")
-                    break
 
-                except Exception as e:
-                    # Вызываем callback функцию для вывода сообщения об ошибке и получаем реакцию пользователя
-                    if show_save_error_msg_callback is not None:
-                        res = show_save_error_msg_callback(e)
-                    else:
-                        res = False
+def _render_task(doc, task: tuple, param: SaveParams, censore: bool, selections: dict) -> tuple:
+    """Растеризация страницы и запись файла (или кодирование в JPEG), либо запись страницы
+    в отдельный файл PDF в процессе-обработчике
+
+    Returns:
+        tuple: изображение в формате JPEG (или None, если записан файл) и исключение при ошибке записи (или None)
+    """
+    _, pno, fn = task
+
+    # Страница сохраняется в отдельный файл PDF без растеризации
+    if param.format == FileFormat.FMT_PDF:
+        try:
+            _save_page_pdf(doc, pno, fn, param.profile)
+        except Exception as e:
+            return None, e
+        return None, None
+
+    # Растеризуем страницу (с деперсонификацией или с учетом настройки размытия выделений)
+    pix = _get_page_pixmap(doc, pno, param, censore, selections)
+
+    # Имя файла не задано - возвращаем изображение в формате JPEG
+    if not fn:
+        return _encode_jpeg(pix, param.quality), None
+
+    try:
+        # Пытаемся записать файл
+        _save_page_image(doc, pno, pix, fn, param)
+    except Exception as e:
+        return None, e
+    return None, None
+
+
+def _get_page_pixmap(doc, pno: int, param: SaveParams, censore: bool, selections: dict):
+    """Растеризация страницы с деперсонификацией или с учетом настройки размытия выделений"""
+
+    # Если мы в режиме деперсонификации,
+    if censore:
+        # то формируем отцензуренное изображение (при этом выделения игнорируются)
+        return censore_page(doc=doc, pno=pno, param=param)
+
+    zoom = param.dpi / 72  # зум-фактор для растеризации изображения
+    mat = fitz.Matrix(zoom, zoom)  # матрица трансформирования для растеризации изображения
+    pixelator = param.dpi // 20  # коэффициент пикселизации конфиденциальной информации
+
+    # иначе растеризуем страницу (при этом учитывается настройка размытия выделений)
+    return _render_page(doc, pno, param, mat, pixelator, selections)
+
+
+def _encode_jpeg(pix, quality: int) -> bytes:
+    """Кодирование изображения в формат JPEG (напрямую из буфера pixmap, без промежуточных копий)"""
+    return pix.tobytes('jpeg', jpg_quality=quality)
+
+
+def _insert_jpeg_page(pdfout, rect, stream: bytes):
+    """Добавление в документ новой страницы размером rect с изображением в формате JPEG"""
+    opage = pdfout.new_page(width=rect.width, height=rect.height)
+    opage.insert_image(opage.rect, stream=stream)
+
+
+def _save_page_pdf(doc, pno: int, fn: str, profile: SaveProfile):
+    """Запись страницы в отдельный файл PDF (в файл попадают только нужные странице объекты)"""
+    newdoc = fitz.open()
+    try:
+        newdoc.insert_pdf(doc, from_page=pno, to_page=pno)
+        newdoc.save(fn, **SAVE_PROFILES[profile])
+    finally:
+        newdoc.close()
+
+
+def _save_page_image(doc, pno: int, pix, fn: str, param: SaveParams):
+    """Запись растеризованной страницы в отдельный файл JPEG, PNG или PDF_JPEG"""
+    if param.format == FileFormat.FMT_JPEG:
+        pix.pil_save(fn, format="jpeg", quality=param.quality)
+        return
+
+    if param.format == FileFormat.FMT_PNG:
+        pix.pil_save(fn, format="png")
+        return
+
+    # Создаем новый объект fitz Document и вставляем страницу
+    newdoc = fitz.open()
+    try:
+        _insert_jpeg_page(newdoc, doc[pno].rect, _encode_jpeg(pix, param.quality))
+        newdoc.save(fn, encryption=fitz.PDF_ENCRYPT_KEEP, **SAVE_PROFILES[param.profile])
+    finally:
+        # Закрываем объект fitz Document
+        newdoc.close()
+
+
+def _process_save_error(e: BaseException, show_save_error_msg_callback=None):
+    """Обработка ошибки записи одного файла из серии: если пользователь решил
+    не продолжать процесс, то инициируется исключение
+    """
+    # Вызываем callback функцию для вывода сообщения об ошибке и получаем реакцию пользователя
+    if show_save_error_msg_callback is not None and show_save_error_msg_callback(e):
+        return
+    raise FileNotFoundError('Пользователь прервал процесс') from e
 
-                    if res:
-                        break
 
-                    raise FileNotFoundError('Пользователь прервал процесс') from e
+def _save_pdfout(pdfout, progress_callback=None, show_error_msg_callback=None) -> bool:
+    """Завершение сохранения: дозапись собранного файла PDF_JPEG (если он есть)"""
 
     # Если сохраняем целиком файл в формате PDF_JPG, то завершаем этот процесс
-    if param.format == FileFormat.FMT_PDF_JPEG and not m_singles:
+    if pdfout is not None:
         try:
-            # Пфтаемся сохранить файл
-            pdfout.save(
-                outfile,
-                garbage=4,
-                clean=True,
-                deflate=True,
-                deflate_images=True,
-                deflate_fonts=True,
-                encryption=fitz.PDF_ENCRYPT_KEEP,
-            )
+            # Пытаемся дописать файл
+            pdfout.finish()
         except Exception as e:
-            pdfout.close()
+            pdfout.abort()
             # Вызываем callback функцию для вывода сообщения об ошибке
             if show_error_msg_callback is not None:
                 show_error_msg_callback(e)
             return False
-        pdfout.close()
 
     # Вызываем callback функцию для обновления прогрессбара
     if progress_callback is not None:
@@ -408,11 +729,35 @@ def saveas_process(  # noqa: ignore=C901
     return True
 
 
-def _render_page(pdf_view: SiaPdfView, pno: int, param: SaveParams, mat, pixelator: int):
-    """Растеризуем страницу с учетом настроек размытия выделений"""
+def _group_selections(selections: list) -> dict:
+    """Группировка выделений по страницам, чтобы при растеризации каждой страницы не перебирать все выделения
+
+    Args:
+        selections (list): список выделений (индекс страницы или -1, fitz.Rect в координатах страницы)
+
+    Returns:
+        dict: {индекс страницы (-1 - глобальные выделения): [(порядковый номер выделения, fitz.Rect)]}
+    """
+    grouped = {}
+    for ind, (pno, rect) in enumerate(selections):
+        grouped.setdefault(pno, []).append((ind, rect))
+    return grouped
+
+
+def _render_page(doc, pno: int, param: SaveParams, mat, pixelator: int, selections: dict):
+    """Растеризуем страницу с учетом настроек размытия выделений
+
+    Args:
+        doc (fitz doc): документ PDF
+        pno (int): индекс страницы
+        param (SaveParams): параметры сохранения
+        mat (fitz.Matrix): матрица трансформирования для растеризации
+        pixelator (int): коэффициент пикселизации
+        selections (dict): выделения по страницам (см. _group_selections)
+    """
 
     # Берем страницу документа
-    page = pdf_view.doc[pno]
+    page = doc[pno]
 
     # Растеризуем страницу
     pix = page.get_pixmap(matrix=mat)
@@ -422,28 +767,19 @@ def _render_page(pdf_view: SiaPdfView, pno: int, param: SaveParams, mat, pixelat
     if not param.censore:
         return pix
 
-    # Собираем список выделенных областей на этой странице
-    sels = [sel for sel in pdf_view.selections_all if (sel.pno == -1 or sel.pno == pno)]
+    # Собираем список выделенных областей на этой странице (в порядке их создания)
+    sels = [
+        rect
+        for _, rect in heapq.merge(selections.get(pno, []), selections.get(-1, []), key=lambda item: item[0])
+    ]
 
     # Если выделенных областей нет, то возвращаем результат рендера
     if not sels:
         return pix
 
-    # Запихиваем изображение в PIL
-    img = PILImage.frombytes('RGB', (pix.width, pix.height), pix.samples)
-    # Задаем область всей страницы
-    page_r = fitz.Rect(0, 0, pix.width, pix.height)
-
-    # Перебираем выделения
-    for sel in sels:
-        # Трансформируем координаты выделения в координаты страницы pdf документа
-        # и приводим их к системе координат ранее подготовленного изображения
-        r = pdf_view.get_selection_fitz_rect(sel) * mat
-        # Выделение в пределах страницы???
-        if page_r.contains(r):
-            # Замазываем участок
-            censore_img(img, r, pixelator, param.censore)
-
-    # Обратно конвертируем картинку в формат fitz.Pixmap и возвращаем...
-    samples = img.tobytes()
-    return fitz.Pixmap(fitz.csRGB, img.size[0], img.size[1], samples)
+    # Приводим координаты выделений к системе координат ранее подготовленного изображения
+    # и замазываем участки прямо в pixmap. Выделения, выходящие за края страницы (например,
+    # выделения "на всех страницах" на странице меньшего размера), обрезаются по ее границам
+    censore_pixmap(pix, [rect * mat for rect in sels], pixelator, param.censore)
+
+    return pix
@@ -1,11 +1,16 @@
 """
-Класс для хранения данных о выделенных областях в документе (для виджета SiaPdfView)
+Классы для хранения данных о выделенных областях в документе и их индексации (для виджета SiaPdfView)
 
 Зависимости
 ===========
 * PySide2
+* numpy
 """
 
+import heapq
+from collections import defaultdict
+
+import numpy as np
 from PySide2.QtCore import QPoint
 from PySide2.QtCore import QRect
 from PySide2.QtCore import QRectF
@@ -26,10 +31,17 @@ DIR_SE = 9  # Правый нижний угол
 # Допуск в пикселях вокруг центров маркеров, используемых для изменения размера выделенной области
 MOUSE_TOLERANCE = 4
 
+# Размер ячейки сетки для поиска выделенных областей под указателем мыши (в экранных пикселях)
+HIT_GRID_CELL = 128
+
 
 class SelectionRect:
     """Класс для хранения данных о выделенных областях"""
 
+    # Выделений на документ может быть очень много (например, найденных автоматически),
+    # поэтому объекты не содержат словаря атрибутов
+    __slots__ = ('pno', 'rect', 'rect_ref', 'enabled')
+
     def __init__(self, pno: int = -1):
         self.pno = pno  # Номер страницы, к которой "привязана" область. Если -1,
         # то это глобальная область (т.е. действует на всех страницах)
@@ -323,3 +335,157 @@ class SelectionRect:
             self.rect.setHeight(min(self.rect.height() + offset, page_height - self.y1 - 1))
         # Возвращаем себя
         return self
+
+
+def update_rects(
+    selections: list, scr_w: int, scr_h: int, ref_w: int, ref_h: int
+):  # pylint: disable=too-many-arguments
+    """Пересчитать экранные QRect группы выделенных областей (то же, что SelectionRect.update_rect,
+    но расчет координат выполняется сразу для всех областей)
+
+    Args:
+        selections (list): список выделенных областей
+        scr_w (int): экранная ширина страницы
+        scr_h (int): экранная высота страницы
+        ref_w (int): ширина эталлоной страницы
+        ref_h (int): высота эталлоной страницы
+    """
+    if not selections:
+        return
+
+    # "Эталонные" координаты областей: x, y, ширина, высота
+    ref = np.array([sel.rect_ref.getRect() for sel in selections], dtype=np.float64).reshape(-1, 4)
+    x, y, w, h = ref.T
+
+    # Проверяем размеры областей на вместимость на странице (как QRectF.contains)
+    left, right = np.minimum(x, x + w), np.maximum(x, x + w)
+    top, bottom = np.minimum(y, y + h), np.maximum(y, y + h)
+    enabled = (w != 0) & (h != 0) & (left >= 0) & (right <= ref_w) & (top >= 0) & (bottom <= ref_h)
+
+    # Экранные координаты (округление, как и у round, к ближайшему четному)
+    scr_x = np.round(x * scr_w / ref_w)
+    scr_y = np.round(y * scr_h / ref_h)
+    scr_width = np.round((x + w) * scr_w / ref_w) - scr_x - 1
+    scr_height = np.round((y + h) * scr_h / ref_h) - scr_y - 1
+    coords = np.column_stack((scr_x, scr_y, scr_width, scr_height)).astype(np.int64).tolist()
+
+    for sel, is_enabled, rect in zip(selections, enabled.tolist(), coords):
+        sel.enabled = is_enabled
+        sel.rect.setRect(*rect)
+
+
+class SelectionIndex:
+    """Индекс выделенных областей по страницам: выделения страницы получаются без обхода общего
+    списка выделений. Порядок выделений совпадает с порядком в общем списке (т.е. с порядком создания)
+    """
+
+    def __init__(self):
+        self._pages = {}  # Выделения по страницам {индекс страницы (-1 - глобальные): [выделения]}
+        self._order = {}  # Порядковые номера выделений {выделение: номер}
+        self._counter = 0  # Последний выданный порядковый номер
+
+    def __len__(self) -> int:
+        return sum(len(sels) for sels in self._pages.values())
+
+    def clear(self):
+        """Удаление из индекса всех выделений. Порядковые номера сохраняются, т.к. удаленные выделения
+        могут быть возвращены (при отмене удаления) на свои прежние места
+        """
+        self._pages.clear()
+
+    def reset(self):
+        """Полная очистка индекса вместе с порядковыми номерами выделений (при закрытии документа)"""
+        self._pages.clear()
+        self._order.clear()
+        self._counter = 0
+
+    def forget(self, sels):
+        """Освобождение порядковых номеров удаленных выделений, которые больше не могут быть возвращены
+        (выделения, находящиеся в индексе, не затрагиваются)
+        """
+        for sel in sels:
+            if sel in self._order and not any(item is sel for item in self._pages.get(sel.pno, ())):
+                del self._order[sel]
+
+    def add(self, sel: SelectionRect):
+        """Добавление выделения в индекс. Новое выделение получает следующий порядковый номер,
+        а возвращаемое (при отмене удаления) - свой прежний номер и прежнее место на странице
+        """
+        order = self._order.get(sel)
+        if order is None:
+            self._counter += 1
+            order = self._order[sel] = self._counter
+
+        sels = self._pages.setdefault(sel.pno, [])
+        if not sels or self._order[sels[-1]] < order:
+            sels.append(sel)
+        else:
+            sels.insert(self._bisect(sels, order), sel)
+
+    def remove(self, sel: SelectionRect, pno: int = None):
+        """Удаление выделения из индекса
+
+        Args:
+            sel (SelectionRect): выделение
+            pno (int): страница, под которой выделение было добавлено в индекс (None - sel.pno)
+        """
+        sels = self._pages.get(sel.pno if pno is None else pno)
+        if sels:
+            sels.remove(sel)
+
+    def on_page(self, pno: int) -> list:
+        """Выделения, привязанные к странице pno (-1 - глобальные выделения)"""
+        return self._pages.get(pno, [])
+
+    def page_selections(self, pno: int) -> list:
+        """Все выделения, действующие на странице pno (привязанные к ней и глобальные)"""
+        return list(heapq.merge(self.on_page(pno), self.on_page(-1), key=self._order.__getitem__))
+
+    def position(self, selections: list, sel: SelectionRect) -> int:
+        """Позиция выделения в общем списке выделений (двоичный поиск по порядковым номерам)"""
+        ind = self._bisect(selections, self._order[sel])
+        if ind == len(selections) or selections[ind] is not sel:
+            raise ValueError('Выделение не найдено в списке')
+        return ind
+
+    def _bisect(self, selections: list, order: int) -> int:
+        """Позиция, на которой в упорядоченном списке выделений должно стоять выделение с номером order"""
+        low, high = 0, len(selections)
+        while low < high:
+            mid = (low + high) // 2
+            if self._order[selections[mid]] < order:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+
+class SelectionGrid:
+    """Сетка для поиска выделенных областей страницы под указателем мыши: каждая область регистрируется
+    во всех ячейках, которые она пересекает (с учетом допуска MOUSE_TOLERANCE). Строится по текущим экранным
+    координатам и должна перестраиваться после их изменения
+    """
+
+    def __init__(self, selections: list, cell: int = HIT_GRID_CELL):
+        """
+        Args:
+            selections (list): список выделенных областей страницы
+            cell (int): размер ячейки сетки в экранных пикселях
+        """
+        self._cell = cell
+        self._cells = defaultdict(list)  # Индексы выделений в ячейках {(столбец, строка): [индексы]}
+
+        margin = MOUSE_TOLERANCE + 1
+        for i, sel in enumerate(selections):
+            r = sel.rect
+            col0 = (min(r.left(), r.right()) - margin) // cell
+            col1 = (max(r.left(), r.right()) + margin) // cell
+            row0 = (min(r.top(), r.bottom()) - margin) // cell
+            row1 = (max(r.top(), r.bottom()) + margin) // cell
+            for col in range(col0, col1 + 1):
+                for row in range(row0, row1 + 1):
+                    self._cells[(col, row)].append(i)
+
+    def candidates(self, pt: QPoint) -> list:
+        """Индексы выделений (по возрастанию), в зоне досягаемости которых может находиться точка pt"""
+        return self._cells.get((pt.x() // self._cell, pt.y() // self._cell), [])
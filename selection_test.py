@@ -0,0 +1,83 @@
+import unittest
+
+from PySide2.QtCore import QRectF
+
+from selection import SelectionIndex
+from selection import SelectionRect
+from selection import update_rects
+
+
+class TestUpdateRects(unittest.TestCase):
+    def _make_selections(self) -> list:
+        sels = []
+        for x, y, w, h in (
+            (10.3, 20.7, 100.5, 50.5),
+            (0.0, 0.0, 2480.0, 3508.0),
+            (-5.0, 10.0, 30.0, 30.0),
+            (2400.0, 3400.0, 100.0, 50.0),
+            (100.0, 100.0, -40.0, 60.0),
+            (50.0, 50.0, 0.0, 20.0),
+        ):
+            sel = SelectionRect(0)
+            sel.rect_ref = QRectF(x, y, w, h)
+            sels.append(sel)
+        return sels
+
+    def test_same_as_update_rect(self):
+        expected = self._make_selections()
+        actual = self._make_selections()
+        for scr_w, scr_h in ((1240, 1754), (595, 842), (3001, 777)):
+            for sel in expected:
+                sel.update_rect(scr_w, scr_h, 2480, 3508)
+            update_rects(actual, scr_w, scr_h, 2480, 3508)
+            for exp, act in zip(expected, actual):
+                self.assertEqual(exp.rect, act.rect)
+                self.assertEqual(exp.enabled, act.enabled)
+
+    def test_empty(self):
+        update_rects([], 100, 100, 200, 200)
+
+    def test_no_dict(self):
+        with self.assertRaises(AttributeError):
+            SelectionRect().extra = 1
+
+
+class TestSelectionIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = SelectionIndex()
+        self.sels = [SelectionRect(0) for _ in range(3)]
+        for sel in self.sels:
+            self.index.add(sel)
+
+    def test_undo_remove_all(self):
+        a, b, c = self.sels
+        # Удаляем B, затем все выделения
+        self.sels.pop(self.index.position(self.sels, b))
+        self.index.remove(b)
+        removed = list(enumerate(self.sels))
+        self.sels.clear()
+        self.index.clear()
+        # Отменяем удаление всех выделений, затем удаление B
+        for ind, sel in removed:
+            self.sels.insert(ind, sel)
+            self.index.add(sel)
+        self.sels.insert(1, b)
+        self.index.add(b)
+
+        self.assertEqual(self.sels, [a, b, c])
+        self.assertEqual(self.index.page_selections(0), [a, b, c])
+        self.assertEqual(self.index.position(self.sels, c), 2)
+
+    def test_forget(self):
+        a, b, c = self.sels
+        self.sels.remove(b)
+        self.index.remove(b)
+        self.index.forget([a, b])
+        self.assertEqual(self.index.position(self.sels, c), 1)
+        with self.assertRaises(KeyError):
+            self.index.position(self.sels, b)
+        self.assertEqual(self.index.page_selections(0), [a, c])
+
+
+if __name__ == '__main__':
+    unittest.main()
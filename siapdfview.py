@@ -23,7 +23,9 @@ root_widget (SiaPdfView: resizeEvent, keyPressEvent, wheelEvent)
 * pyzbar
 """
 
+import bisect
 import logging
+import math
 import os
 import re
 from io import BytesIO
@@ -33,9 +35,13 @@ import pytesseract
 from PIL import Image
 from PIL import ImageOps
 from PySide2.QtCore import QBuffer
+from PySide2.QtCore import QEvent
 from PySide2.QtCore import QIODevice
 from PySide2.QtCore import QPoint
+from PySide2.QtCore import QRect
 from PySide2.QtCore import QRectF
+from PySide2.QtCore import QSize
+from PySide2.QtCore import QTimer
 from PySide2.QtCore import Qt
 from PySide2.QtCore import Signal
 from PySide2.QtGui import QBrush
@@ -67,6 +73,14 @@ from PySide2.QtWidgets import QWidget
 from pyzbar.pyzbar import decode
 from pyzbar.wrapper import ZBarSymbol
 
+from changejournal import CH_ADD_SELECTIONS
+from changejournal import CH_REMOVE_SELECTIONS
+from changejournal import CH_ROTATE
+from changejournal import Change
+from changejournal import ChangeJournal
+from combinepd import image_to_pdf
+from pagecache import PageCache
+from qrdecode import release_document_qr
 from selection import DIR_E
 from selection import DIR_IN
 from selection import DIR_N
@@ -77,7 +91,11 @@ from selection import DIR_S
 from selection import DIR_SE
 from selection import DIR_SW
 from selection import DIR_W
+from selection import SelectionGrid
+from selection import SelectionIndex
 from selection import SelectionRect
+from selection import update_rects
+from textcache import release_document_text
 
 
 # Режимы перетаскивания мышью выделенной области или ее участка
@@ -87,6 +105,17 @@ MODE_MOVE_ALL = 2  # Перемещаем всю область
 MODE_MOVE_VERT_BORDER = 3  # Перемещаем вертикальную сторону (лево или право)
 MODE_MOVE_HOR_BORDER = 4  # Перемещаем горизонтальную сторону (верх или низ)
 
+# Ряд DPI для рендеринга страницы на экран (берется ближайшее большее к требуемому для текущего масштаба)
+RENDER_DPI_STEPS = (48, 72, 96, 144, 192, 288)
+
+# Тайловый рендеринг очень больших страниц (чертежи, сканы A0 и т.п.)
+TILE_SIZE = 512  # Размер стороны тайла (фрагмента изображения страницы) в пикселях
+TILED_MIN_PIXELS = 3000 * 3000  # Минимальное количество пикселей в изображении страницы для тайлового рендеринга
+TILED_PREVIEW_PIXELS = 2048 * 1024  # Количество пикселей в уменьшенном изображении под тайлами
+TILE_CACHE_BYTES = 64 * 1024 * 1024  # Объем памяти под кэш тайлов (байт)
+
+PAGE_MARGIN = 10  # Отступ вокруг страницы (и между страницами в режиме непрерывной прокрутки)
+
 # Действия с выделенной областью (для метода set_selection_point)
 ACT_FIX_FIRST_POINT = 1  # началось выделение области, оба угла фиксируются в точке нажатия мыши
 ACT_MOVE_SECOND_POINT = 2  # первый угол зафиксирован ранее, второй угол перемещается в точку курсора мыши
@@ -281,6 +310,7 @@ class SiaPdfView(QScrollArea):
     rect_selected = Signal(bool)  # Сигнал при изменении фокуса на выделенной области
     scroll_requested = Signal(QPoint, QPoint)  # Сигнал о необходимости прокрутки экрана при изменении масштаба
     coords_text_emited = Signal(str, int)  # Сигнал при изменении координат курсора при удерживаемом Alt/е
+    history_changed = Signal()  # Сигнал при изменении журнала изменений (доступности отмены/повтора)
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -289,12 +319,50 @@ class SiaPdfView(QScrollArea):
         self._is_real_file = False  # Это настоящий файл (или виртуальный/новый)
         self._current_page = -1  # Текущая страница документа
         self._psw = ''  # Пароль к зашифрованному документу PDF
+        self._journal = ChangeJournal()  # Журнал изменений документа (повороты страниц, выделения)
         self._scale_factor = 1.0  # Текущий масштаб страницы
         ppi = 96
         self._dpi = ppi * 3  # DPI, используемый для рендеринга страницы документа
 
         zoom = self._dpi / 72
-        self._matrix = fitz.Matrix(zoom, zoom)  # Матрица для рендеринга страницы документа
+        self._matrix = fitz.Matrix(zoom, zoom)  # Матрица "эталонной" системы координат страницы документа
+        self._render_dpi = 0  # DPI, с которым отрендерено изображение текущей страницы на экране
+
+        # Таймер для повторного (четкого) рендеринга страницы после того, как масштаб перестанет меняться
+        self._rerender_timer = QTimer(self)
+        self._rerender_timer.setSingleShot(True)
+        self._rerender_timer.setInterval(200)
+        self._rerender_timer.timeout.connect(self._update_page_pixmap)
+
+        self._page_cache = PageCache()  # Кэш отрендеренных изображений страниц
+        # Углы поворота страниц для ключей кэша {индекс страницы: угол} (ключи строятся без обращения
+        # к объектам страниц, т.к. документ может использоваться длительной операцией в другом потоке)
+        self._page_rotations = {}
+        self._tile_cache = PageCache(TILE_CACHE_BYTES)  # Кэш отрендеренных тайлов очень больших страниц
+        self._tiles_dpi = 0  # DPI тайлов текущей страницы (0 - страница выводится целиком, без тайлов)
+        self._tiles_size = (0, 0)  # Размеры изображения текущей страницы в пикселях при DPI тайлов
+        self._tiles_rotation = 0  # Угол поворота текущей страницы, для которого рендерятся тайлы
+        self._tiles_queue = []  # Очередь ключей тайлов, ожидающих рендеринга
+        # Таймер для рендеринга тайлов (по одному тайлу за срабатывание)
+        self._tile_timer = QTimer(self)
+        self._tile_timer.setSingleShot(True)
+        self._tile_timer.setInterval(0)
+        self._tile_timer.timeout.connect(self._render_next_tile)
+
+        # Режим непрерывной прокрутки: текущая страница отображается в _page_widget (с выделениями),
+        # а остальные видимые страницы - в виджетах из пула (создаются только для видимых страниц)
+        self._is_continuous = False  # Режим непрерывной прокрутки всех страниц документа
+        self._ref_sizes = None  # "Эталонные" размеры всех страниц документа
+        self._page_offsets = []  # Вертикальные смещения страниц на виджете-контейнере
+        self._page_sizes = []  # Экранные размеры страниц
+        self._preview_labels = {}  # Виджеты видимых нетекущих страниц {pno: (QLabel, ключ изображения)}
+        self._labels_pool = []  # Пул свободных виджетов страниц
+        self._is_page_scrolling = False  # Признак программной прокрутки к странице
+        # Таймер для упреждающего рендеринга соседних страниц (в моменты простоя интерфейса)
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(50)
+        self._prefetch_timer.timeout.connect(self._prefetch_pages)
 
         self.scr_w = 0  # Экранная ширина текущей страницы документа
         self.scr_h = 0  # Экранная высота текущей страницы документа
@@ -310,6 +378,9 @@ class SiaPdfView(QScrollArea):
         self.selections_max = 10000  # Максимальное количество выделенных областей
         self.selections: list[SelectionRect] = []  # Список выделенных областей на текущей странице
         self.selections_all: list[SelectionRect] = []  # Общий список выделенных областей на всех страницах
+        self._selection_index = SelectionIndex()  # Индекс выделенных областей по страницам
+        self._hit_grid = None  # Сетка поиска выделений текущей страницы под указателем мыши (None - не построена)
+        self.new_selection = None  # Выделение, создаваемое мышью (попадает в журнал после отпускания кнопки)
 
         self.move_mode = MODE_MOVE_NONE  # Текущий режим передвижения курсора мыши
 
@@ -353,9 +424,17 @@ class SiaPdfView(QScrollArea):
 
         # Связываем сигнал scroll_requested с методом-обработчиком
         self.scroll_requested.connect(self._scroll_point_to_point)
+        # Связываем прокрутку по вертикали с обновлением видимых страниц (режим непрерывной прокрутки)
+        self.verticalScrollBar().valueChanged.connect(self._on_vertical_scroll)
 
-    def combine_files(self, filelist: list):
-        """Скомбинировать документ"""
+    def combine_files(self, files: list):
+        """Скомбинировать документ из предварительно загруженных файлов (см. combinepd.load_files).
+        Сначала выводятся сообщения об ошибках загрузки, затем одним этапом запрашиваются пароли
+        к зашифрованным файлам, после чего файлы объединяются в порядке их следования в списке
+
+        Args:
+            files (list): список объектов LoadedFile
+        """
 
         # Заранее готовим объект сообщения об ошибке
         m_msg_box = QMessageBox(self)
@@ -375,45 +454,49 @@ class SiaPdfView(QScrollArea):
         # Закрываем предыдущий файл
         self.close_file()
 
+        # Сообщаем об ошибках загрузки файлов
+        valid_files = []
+        for loaded in files:
+            if not loaded.error:
+                valid_files.append(loaded)
+                continue
+
+            # Записываем кляузу в логи
+            logger.error('%s: %s', loaded.filename, loaded.error)
+
+            # Если ранее был выбран вариант пропускать все ошибки, то идем к следующему файлу
+            if is_skip_all:
+                continue
+
+            # Выводим сообщение об ошибке с тремя вариантами ответа Пропустить-Пропустить все-Отмена
+            m_msg_box.setText(f'Ошибка: {loaded.error}\nФайл: {loaded.filename}')
+            res = m_msg_box.exec()
+            if res == QMessageBox.StandardButton.Cancel:
+                # Пользователь выбрал отмену
+                return
+
+            # Если пользователь выбрал <Пропустить все>, то далее будем пропускать все ошибки
+            if res == QMessageBox.StandardButton.YesToAll:
+                is_skip_all = True
+
+        # Запрашиваем пароли ко всем зашифрованным файлам
+        passwords = self._request_passwords(valid_files)
+
         # Создаем основной объект fitz.Document
         self._doc = fitz.Document()
 
-        # Обходим список файлов
-        for filename in filelist:
+        # Объединяем файлы в заданном порядке
+        for loaded in valid_files:
+            # Пароль к зашифрованному файлу не получен - пропускаем его
+            if loaded.needs_pass and loaded.filename not in passwords:
+                continue
+
             try:
-                # Открываем файл
-                doc = fitz.Document(filename)
-                # Это не PDF?
-                if not doc.is_pdf:
-                    # Пытаемся сконвертировать в PDF
-                    pdfbytes = doc.convert_to_pdf()
-                    doc.close()
-                    doc = fitz.open("pdf", pdfbytes)
-
-                # Этот документ зашифрован?
+                doc = loaded.open()
                 if doc.needs_pass:
-                    # Запрашиваем пароль и пытаемся открыть документ
-                    self._decrypt_doc(filename, doc)
-
-            except Exception as e:
-                # Если произошла ошибка, то записываем кляузу в логи
-                logger.error(filename, exc_info=True)
-
-                # Если ранее был выбран вариант пропускать все ошибки, то идем к следующему файлу
-                if is_skip_all:
-                    continue
-
-                # Выводим сообщение об ошибке с тремя вариантами ответа Пропустить-Пропустить все-Отмена
-                m_msg_box.setText(f'Ошибка: {e}\nФайл: {filename}')
-                res = m_msg_box.exec()
-                if res == QMessageBox.StandardButton.Cancel:
-                    # Пользователь выбрал отмену
-                    self.close_file()
-                    return
-
-                # Если пользователь выбрал <Пропустить все>, то далее будем пропускать все ошибкифайлу
-                if res == QMessageBox.StandardButton.YesToAll:
-                    is_skip_all = True
+                    doc.authenticate(passwords[loaded.filename])
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.error(loaded.filename, exc_info=True)
                 continue
 
             # Если файл не зашифрован (либо пароль был снят), добавляем его в основной документ
@@ -452,8 +535,8 @@ class SiaPdfView(QScrollArea):
 
             # Это не PDF?
             if not self._doc.is_pdf:
-                # Пытаемся сконвертировать в PDF
-                pdfbytes = self._doc.convert_to_pdf()
+                # Пытаемся сконвертировать в PDF (изображения PNG по возможности встраиваем как есть)
+                pdfbytes = image_to_pdf(filename) or self._doc.convert_to_pdf()
                 self._doc.close()
                 self._current_filename = '*** Новый файл ****'  # Имя текущего файла
                 self._is_real_file = False  # Это виртуальный/новый файл
@@ -488,6 +571,40 @@ class SiaPdfView(QScrollArea):
             self._current_filename = ''  # Имя текущего файла
             self._is_real_file = False  # Это настоящий файл (или виртуальный/новый)
 
+    def _request_passwords(self, files: list) -> dict:
+        """Запрос паролей к зашифрованным файлам из списка. Для каждого файла сначала пробуются
+        пароли, введенные для предыдущих файлов, и только если они не подходят, пароль запрашивается
+
+        Args:
+            files (list): список объектов LoadedFile
+
+        Returns:
+            dict: словарь {имя файла: пароль} для файлов, которые удалось расшифровать
+        """
+        passwords = {}
+        for loaded in files:
+            if not loaded.needs_pass or loaded.filename in passwords:
+                continue
+
+            try:
+                doc = loaded.open()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.error(loaded.filename, exc_info=True)
+                continue
+
+            # Пробуем уже известные пароли, затем запрашиваем пароль у пользователя
+            for psw in dict.fromkeys(passwords.values()):
+                if doc.authenticate(psw):
+                    passwords[loaded.filename] = psw
+                    break
+            else:
+                if self._decrypt_doc(loaded.filename, doc):
+                    passwords[loaded.filename] = self._psw
+
+            doc.close()
+
+        return passwords
+
     def _decrypt_doc(self, filename: str, doc: fitz.Document) -> bool:
         """Расшифровать документ"""
 
@@ -527,7 +644,24 @@ class SiaPdfView(QScrollArea):
     def close_file(self):
         """Закрыть документ"""
         if self._doc is not None:
-            # Закрываем и обнуляем объект
+            # Останавливаем упреждающий рендеринг и очищаем кэш изображений страниц
+            self._prefetch_timer.stop()
+            self._rerender_timer.stop()
+            self._render_dpi = 0
+            self._tile_timer.stop()
+            self._tile_cache.clear()
+            self._tiles_queue.clear()
+            self._tiles_dpi = 0
+            self._release_preview_labels(set())
+            self._ref_sizes = None
+            self._page_offsets = []
+            self._page_sizes = []
+            self._page_cache.clear()
+            self._page_rotations.clear()
+
+            # Закрываем и обнуляем объект (освобождая его данные в кэшах текстового слоя и QR кодов)
+            release_document_text(self._doc)
+            release_document_qr(self._doc)
             self._doc.close()
             self._doc = None
 
@@ -535,9 +669,13 @@ class SiaPdfView(QScrollArea):
             self._current_filename = ''  # Имя текущего файла
             self._is_real_file = False  # Это настоящий файл (или виртуальный/новый)
             self._current_page = -1  # Текущая страница
+            self._journal.clear()  # Журнал изменений
+            self.history_changed.emit()
             self.selected_rect = -1  # Текущее выделение
             self.selections = []  # Список выделений на текущей странице
             self.selections_all = []  # Список всех выделений
+            self._selection_index.reset()  # Индекс выделений по страницам
+            self._hit_grid = None  # Сетка поиска выделений под указателем мыши
 
             # Сбрасываем виджет-контейнер в исходное состояние
             self._board_widget.setVisible(False)
@@ -576,6 +714,16 @@ class SiaPdfView(QScrollArea):
         """Пароль"""
         return self._psw
 
+    @property
+    def journal(self):
+        """Журнал изменений документа (повернутые страницы, изменения выделений) с момента открытия"""
+        return self._journal
+
+    @property
+    def rotated_pages(self):
+        """Индексы страниц, положение которых изменено в программе после открытия документа"""
+        return self._journal.rotated_pages
+
     @property
     def selections_count(self):
         """Количество выделенных областей на текущей странице"""
@@ -595,27 +743,35 @@ class SiaPdfView(QScrollArea):
 
     def goto_page(self, pno: int):
         """Переход на указанную страницу"""
-        self._show_page(pno)
+        self._goto(pno)
 
     def goto_next_page(self):
         """Переход на следующую страницу"""
         if self._current_page < self._doc.page_count - 1:
-            self._show_page(self._current_page + 1)
+            self._goto(self._current_page + 1)
 
     def goto_prev_page(self):
         """Переход на предыдущую страницу"""
         if self._current_page > 0:
-            self._show_page(self._current_page - 1)
+            self._goto(self._current_page - 1)
 
     def goto_home(self):
         """Переход на первую страницу"""
         if self.page_count > 0:
-            self._show_page(0)
+            self._goto(0)
 
     def goto_end(self):
         """Переход на последнюю страницу"""
         if self.page_count > 0:
-            self._show_page(self._doc.page_count - 1)
+            self._goto(self._doc.page_count - 1)
+
+    def _goto(self, pno: int):
+        """Переход на страницу (в режиме непрерывной прокрутки - с прокруткой к ней)"""
+        if pno == self._current_page:
+            return
+        self._show_page(pno)
+        if self._is_continuous:
+            self._scroll_to_page(pno)
 
     def zoom_in(self):
         """Увеличить масштаб"""
@@ -654,18 +810,17 @@ class SiaPdfView(QScrollArea):
         if is_selection and self.selected_rect == -1:
             return
 
-        # Берем всё изображение из виджета страницы
-        img = self._page_widget.pixmap().toImage()
+        if is_selection:
+            # Если копируем выделенную область, то рендерим только ее в "эталонном" разрешении
+            img = self._get_ref_image(self.selections[self.selected_rect].get_scaled_rect(1, 1, 1, 1))
+        else:
+            # Берем всё изображение страницы в "эталонном" разрешении
+            img = self._get_ref_image()
         # Устанавливаем соответствующий DPI/DPM
         dpm = self._dpi / 0.0254
         img.setDotsPerMeterX(dpm)
         img.setDotsPerMeterY(dpm)
 
-        if is_selection:
-            # Если копируем выделенную область, то вырезаем ее из изображения страницы
-            r = self.selections[self.selected_rect].get_scaled_rect(1, 1, 1, 1)
-            img = img.copy(r)
-
         # Запихиваем изображение в буфер обмена
         QGuiApplication.clipboard().setImage(img)
 
@@ -706,12 +861,10 @@ class SiaPdfView(QScrollArea):
 
         # Настраиваем pytesseract
         pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
-        # Берем всё изображение из виджета страницы
-        img = self._page_widget.pixmap().toImage()
         # Получаем координаты выделения
         r = self.selections[self.selected_rect].get_scaled_rect(1, 1, 1, 1)
-        # Вырезаем выделенную область из изображения страницы
-        img = fromqimage(img.copy(r))
+        # Рендерим выделенную область страницы в "эталонном" разрешении
+        img = fromqimage(self._get_ref_image(r))
         # Распознаем
         recttext = pytesseract.image_to_string(img, lang='rus+eng')
         # Если is_trim == True, то убираем из текста лишние "пробельные" символы
@@ -733,12 +886,10 @@ class SiaPdfView(QScrollArea):
         if self._current_page == -1 or self.selected_rect == -1:
             return
 
-        # Берем всё изображение из виджета страницы
-        img = self._page_widget.pixmap().toImage()
         # Получаем координаты выделения
         r = self.selections[self.selected_rect].get_scaled_rect(1, 1, 1, 1)
-        # Вырезаем выделенную область из изображения страницы
-        img = fromqimage(img.copy(r))
+        # Рендерим выделенную область страницы в "эталонном" разрешении
+        img = fromqimage(self._get_ref_image(r))
         # Распознаем QR коды
         decocde_qr = decode(img, [ZBarSymbol.QRCODE])
         # Если коды не найдены, пробуем инвертировать изображение
@@ -846,25 +997,43 @@ class SiaPdfView(QScrollArea):
             rect (_type_): прямоугольная область в экранной системе координат,
                            которая будет добавлена в качестве выделенной области
         """
-        # Создаем новый объект SelectionRect
-        sel = SelectionRect(pno)
-        # Трансформируем экранные координаты в "эталонные"
-        rotated_rect = (rect * self._doc[pno].rotation_matrix) * self._matrix
-        # Нормализируем углы прямоугольника
-        rotated_rect.normalize()
-        # Устанавливаем "эталонные" координаты выделенной области
-        sel.rect_ref.setCoords(rotated_rect.x0, rotated_rect.y0, rotated_rect.x1, rotated_rect.y1)
-        # Добавляем объект в общий список выделений на всех страницах
-        self.selections_all.append(sel)
-
-        # Если добавляемое выделение не находится на текущей странице и не глобальное, то выходим
-        if pno != self._current_page and pno != -1:
+        self.add_selections([(pno, rect)])
+
+    def add_selections(self, items: list):
+        """Добавить группу выделенных областей (одним изменением в журнале и одним обновлением экрана)
+
+        Args:
+            items (list): список (номер страницы, прямоугольная область в экранной системе координат)
+        """
+        if not items:
+            return
+
+        sels = []
+        for pno, rect in items:
+            # Создаем новый объект SelectionRect
+            sel = SelectionRect(pno)
+            # Трансформируем экранные координаты в "эталонные"
+            rotated_rect = (rect * self._doc[pno].rotation_matrix) * self._matrix
+            # Нормализируем углы прямоугольника
+            rotated_rect.normalize()
+            # Устанавливаем "эталонные" координаты выделенной области
+            sel.rect_ref.setCoords(rotated_rect.x0, rotated_rect.y0, rotated_rect.x1, rotated_rect.y1)
+            # Добавляем объект в общий список выделений на всех страницах
+            self.selections_all.append(sel)
+            self._selection_index.add(sel)
+            sels.append(sel)
+        self.record_selections_change(CH_ADD_SELECTIONS, sels)
+
+        # Выделения, находящиеся на текущей странице, и глобальные выделения сразу показываем
+        page_sels = [sel for sel in sels if sel.pno in (self._current_page, -1)]
+        if not page_sels:
             return
 
         # Приводим "эталонные" координаты в экранные с проверкой на вместимость в страницу
-        sel.update_rect(self.scr_w, self.scr_h, self.ref_w, self.ref_h)
-        # Добавляем объект в список выделений текущей страницы
-        self.selections.append(sel)
+        update_rects(page_sels, self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+        # Добавляем объекты в список выделений текущей страницы
+        self.selections.extend(page_sels)
+        self._hit_grid = None
         # Обновляем экран
         self._page_widget.update()
 
@@ -874,10 +1043,12 @@ class SiaPdfView(QScrollArea):
         if self._current_page == -1 or self.selected_rect == -1:
             return
 
-        # Меняем признак глобальности выделения
-        self.selections[self.selected_rect].pno = (
-            self._current_page if self.selections[self.selected_rect].pno == -1 else -1
-        )
+        # Меняем признак глобальности выделения (и переносим выделение в индексе на другую "страницу")
+        sel = self.selections[self.selected_rect]
+        old_pno = sel.pno
+        sel.pno = self._current_page if old_pno == -1 else -1
+        self._selection_index.remove(sel, old_pno)
+        self._selection_index.add(sel)
 
         # Обновляем экран
         self._page_widget.update()
@@ -895,39 +1066,154 @@ class SiaPdfView(QScrollArea):
         if self._current_page == -1:
             return
 
-        # Задаем индексы первой и последней страницы для переворота
-        if is_all:
-            pno = 0
-            pno_end = len(self._doc) - 1
-        else:
-            pno = self._current_page
-            pno_end = pno
+        angle = (0, 270, 90, 180)[rotation_dir]
+        if not angle:
+            return
+
+        # Задаем индексы страниц для переворота
+        pages = list(range(len(self._doc))) if is_all else [self._current_page]
+
+        # Поворачиваем страницы и записываем изменение в журнал
+        self._rotate_pages(pages, angle, self._current_page)
+        self._record_change(Change(CH_ROTATE, pages, angle, current_page=self._current_page))
 
+    def _rotate_pages(self, pages: list, angle: int, global_pno: int):
+        """Поворот страниц с трансформацией привязанных к ним выделений
+
+        Args:
+            pages (list): индексы поворачиваемых страниц
+            angle (int): угол поворота по часовой стрелке
+            global_pno (int): страница, по которой трансформируются глобальные выделения
+        """
         # Переворачиваем все страницы в цикле
-        while pno <= pno_end:
+        for pno in pages:
             # Сохраняем матрицу рендеринга для старой ориентации страницы
             src_rot_mat = self._doc[pno].rotation_matrix * self._matrix
             # Поворачиваем страницу документа в объекте fitz
-            self._doc[pno].set_rotation((self._doc[pno].rotation + (0, 270, 90, 180)[rotation_dir]) % 360)
+            self._doc[pno].set_rotation((self._doc[pno].rotation + angle) % 360)
+            self._page_rotations[pno] = self._doc[pno].rotation
             # Сохраняем матрицу рендеринга для новой ориентации страницы
             dst_rot_mat = self._doc[pno].rotation_matrix * self._matrix
             # В цикле трансформируем все выделения, которые были привязаны к странице, в т.ч. "глобальные"
-            for sel in self.selections_all:
-                # Глобальные выделения трансформируются только один раз - на текущей странице
-                if sel.pno == pno or (sel.pno == -1 and pno == self._current_page):
-                    # Получаем старые "эталонные" координаты выделения в fitz rect
-                    r = sel.rect_ref
-                    rc = fitz.Rect(r.x(), r.y(), r.x() + r.width(), r.y() + r.height())
-                    # Трансформируем координаты, применяя старую и новую матрицы
-                    rc = (rc / src_rot_mat) * dst_rot_mat
-                    # Сохраняем новые "эталонные" координаты выделения
-                    r.setRect(rc.x0, rc.y0, rc.x1 - rc.x0, rc.y1 - rc.y0)
-            # Индекс следующей страницы
-            pno += 1
-
-        # Обновляем отображение страницы
+            # (глобальные выделения трансформируются только один раз - на текущей странице)
+            sels = self._selection_index.on_page(pno)
+            if pno == global_pno:
+                sels = sels + self._selection_index.on_page(-1)
+            for sel in sels:
+                # Получаем старые "эталонные" координаты выделения в fitz rect
+                r = sel.rect_ref
+                rc = fitz.Rect(r.x(), r.y(), r.x() + r.width(), r.y() + r.height())
+                # Трансформируем координаты, применяя старую и новую матрицы
+                rc = (rc / src_rot_mat) * dst_rot_mat
+                # Сохраняем новые "эталонные" координаты выделения
+                r.setRect(rc.x0, rc.y0, rc.x1 - rc.x0, rc.y1 - rc.y0)
+
+        # Сбрасываем "эталонные" размеры страниц (они могли поменяться местами)
+        self._ref_sizes = None
+        # Обновляем отображение страницы (изображения остальных страниц берутся из кэша по углу поворота)
         self._show_page(self._current_page, True)
 
+    def record_selections_change(self, kind: int, sels: list):
+        """Запись в журнал добавления (после него) или удаления (до него) выделенных областей
+
+        Args:
+            kind (int): вид изменения (CH_ADD_SELECTIONS или CH_REMOVE_SELECTIONS)
+            sels (list): добавленные или удаляемые выделения (должны быть в общем списке выделений)
+        """
+        if not sels:
+            return
+        position = self._selection_index.position
+        items = sorted(((position(self.selections_all, sel), sel) for sel in sels), key=lambda item: item[0])
+        self._record_change(Change(kind, sorted({sel.pno for sel in sels}), items=items))
+
+    def _record_change(self, change: Change):
+        """Запись изменения в журнал. Удаленные выделения из отброшенных отмененных изменений больше
+        не могут быть возвращены - освобождаем их порядковые номера в индексе
+        """
+        discarded = self._journal.record(change)
+        if discarded:
+            referenced = self._journal.referenced_selections
+            self._selection_index.forget(sel for ch in discarded for _, sel in ch.items if sel not in referenced)
+        self.history_changed.emit()
+
+    def index_selection(self, sel: SelectionRect):
+        """Добавление в индекс выделения, только что добавленного в конец общего списка"""
+        self._selection_index.add(sel)
+        self._hit_grid = None
+
+    def drop_selection(self, sel: SelectionRect):
+        """Удаление выделения из общего списка и индекса"""
+        self.selections_all.pop(self._selection_index.position(self.selections_all, sel))
+        self._selection_index.remove(sel)
+        self._hit_grid = None
+
+    def invalidate_hit_grid(self):
+        """Сброс сетки поиска выделений под указателем мыши (после изменения экранных координат выделений)"""
+        self._hit_grid = None
+
+    def selections_near(self, pt: QPoint) -> list:
+        """Выделения текущей страницы, в зоне досягаемости которых может находиться точка pt
+
+        Returns:
+            list: список (индекс в списке выделений текущей страницы, выделение) по возрастанию индекса
+        """
+        if self._hit_grid is None:
+            self._hit_grid = SelectionGrid(self.selections)
+        return [(i, self.selections[i]) for i in self._hit_grid.candidates(pt) if i < len(self.selections)]
+
+    def undo(self):
+        """Отменить последний поворот страниц или изменение выделений"""
+        # Если нет текущей страницы, то сразу выходим
+        if self._current_page == -1:
+            return
+
+        change = self._journal.undo()
+        if change is not None:
+            self._apply_change(change, True)
+
+    def redo(self):
+        """Повторить последний отмененный поворот страниц или изменение выделений"""
+        # Если нет текущей страницы, то сразу выходим
+        if self._current_page == -1:
+            return
+
+        change = self._journal.redo()
+        if change is not None:
+            self._apply_change(change, False)
+
+    def _apply_change(self, change: Change, is_undo: bool):
+        """Применение (is_undo=False) или откат (is_undo=True) изменения из журнала"""
+        if change.kind == CH_ROTATE:
+            self._rotate_pages(change.pages, -change.angle % 360 if is_undo else change.angle, change.current_page)
+        elif (change.kind == CH_ADD_SELECTIONS) != is_undo:
+            # Возвращаем выделения на их прежние места в общем списке
+            for ind, sel in change.items:
+                self.selections_all.insert(ind, sel)
+                self._selection_index.add(sel)
+            self._reset_page_selections()
+        else:
+            for ind, sel in reversed(change.items):
+                self.selections_all.pop(ind)
+                self._selection_index.remove(sel)
+            self._reset_page_selections()
+
+        self.history_changed.emit()
+
+    def _reset_page_selections(self):
+        """Перезаполнение списка выделенных областей текущей страницы после изменения общего списка"""
+        # Сбрасываем фокус с выделенной области (если он был)
+        self.selected_rect = -1
+        self.selections = self._selection_index.page_selections(self._current_page)
+        self._hit_grid = None
+
+        # Пересчитываем "эталонные" координаты выделенных областей в экранные
+        update_rects(self.selections, self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+
+        # Обновляем экран
+        self._page_widget.update()
+        # Эмитируем сигнал об изменении фокуса на выделенной области
+        self.rect_selected.emit(False)
+
     def select_all(self):
         """Создать выделение всей страницы"""
         # Если нет текущей страницы, то сразу выходим
@@ -956,6 +1242,9 @@ class SiaPdfView(QScrollArea):
             self.selections.append(new_sel)
             # Добавляем новое выделение в общий список выделений на всех страницах
             self.selections_all.append(new_sel)
+            self._selection_index.add(new_sel)
+            self._hit_grid = None
+            self.record_selections_change(CH_ADD_SELECTIONS, [new_sel])
 
         # Обновляем экран
         self._page_widget.update()
@@ -975,21 +1264,24 @@ class SiaPdfView(QScrollArea):
         # Если снимаем все выделения
         if is_remove_all:
             # то очищаем полностью оба списка выделенных областей
+            self.record_selections_change(CH_REMOVE_SELECTIONS, self.selections_all)
             self.selections.clear()
             self.selections_all.clear()
+            self._selection_index.clear()
         else:
             # Если нет текущего выделения, то выходим
             if self.selected_rect == -1:
                 return
-            # Ищем индекс удаляемого выделения в общем списке выделенных областей
-            ind = self.selections_all.index(self.selections[self.selected_rect])
+            sel = self.selections[self.selected_rect]
+            self.record_selections_change(CH_REMOVE_SELECTIONS, [sel])
             # Удаляем элемент списка в общем списке выделенных областей
-            self.selections_all.pop(ind)
+            self.drop_selection(sel)
             # Удаляем элемент списка в списке выделенных областей текущей страницы
             self.selections.pop(self.selected_rect)
 
         # Снимаем фокус с выделенной области (если был)
         self.selected_rect = -1
+        self._hit_grid = None
         # Обновляем экран
         self._page_widget.update()
         # Эмитируем сигнал об изменении фокуса на выделенной области
@@ -1012,17 +1304,22 @@ class SiaPdfView(QScrollArea):
 
     def _set_sizes(self):
         """Изменяем размер виджета-контейнера страницы"""
+        # В режиме непрерывной прокрутки размещаем все страницы документа
+        if self._is_continuous:
+            self._layout_pages()
+            return
+
         # Определяем размер виджета-контейнера страницы исходя из размера виджета страницы + 20px, а
         # если полученная высота или ширина меньше высоты или ширины вьюпорта корневого контейнера,
         # то соответствующие размеры берем от вьюпорта корневого контейнера
-        ww = max(self.viewport().width(), self._page_widget.width() + 20)
-        hh = max(self.viewport().height(), self._page_widget.height() + 20)
+        ww = max(self.viewport().width(), self._page_widget.width() + 2 * PAGE_MARGIN)
+        hh = max(self.viewport().height(), self._page_widget.height() + 2 * PAGE_MARGIN)
         # Записываем полученные значения в размеры виджета-контейнера страницы
         self._board_widget.setFixedHeight(hh)
         self._board_widget.setFixedWidth(ww)
         # Сдвигаем виджет страницы внутри виджета-контейнера по горизонтали так, чтобы слева от
         # страницы был margin минимум 10 px, а при мелких масштабах, чтобы страница была по центру вьюпорта
-        self._page_widget.move((ww - self._page_widget.width()) // 2, 10)
+        self._page_widget.move((ww - self._page_widget.width()) // 2, PAGE_MARGIN)
 
     def _show_page(self, pno: int, is_force: bool = False):
         """Показать страницу документа
@@ -1038,18 +1335,27 @@ class SiaPdfView(QScrollArea):
 
         # Устанавливаем переданный индекс в качестве текущей страницы
         self._current_page = pno
-        # Рендерим изображение
-        pix = self._doc[pno].get_pixmap(alpha=False, matrix=self._matrix, colorspace=fitz.csRGB)
 
-        # Переводим изображение в QImage
-        new_image = QImage(pix.samples_mv, pix.width, pix.height, pix.width * 3, QImage.Format_RGB888)
-
-        # Запоминаем "эталонные" размеры страницы текущей документа
-        self.ref_w = pix.width
-        self.ref_h = pix.height
+        # Запоминаем "эталонные" размеры страницы текущей документа (размеры изображения при "эталонном" DPI)
+        ref_rect = (self._doc[pno].rect * self._matrix).irect
+        self.ref_w = ref_rect.width
+        self.ref_h = ref_rect.height
+
+        # Берем из кэша изображение с DPI, подходящим для текущего масштаба. Если его нет, то на время
+        # показываем изображение этой страницы с другим DPI (если оно есть в кэше), а четкое отрендерим позже
+        dpi = self._get_render_dpi()
+        if self._page_cache_key(pno, dpi) not in self._page_cache:
+            for cached_dpi in RENDER_DPI_STEPS:
+                if self._page_cache_key(pno, cached_dpi) in self._page_cache:
+                    dpi = cached_dpi
+                    self._rerender_timer.start()
+                    break
 
         # Устанавливаем новое изображение страницы
-        self._page_widget.setPixmap(QPixmap.fromImage(new_image))
+        self._set_page_image(pno, dpi)
+
+        # Запускаем упреждающий рендеринг соседних страниц
+        self._prefetch_timer.start()
 
         # Изменяем экранный размер отображения страницы исходя из установленного масштаба
         # при обычном отображении страницы выделенные области не пересчитываем, а если форс - то
@@ -1062,18 +1368,398 @@ class SiaPdfView(QScrollArea):
 
         # Сбрасываем фокус с выделенной области (если он был)
         self.selected_rect = -1
-        # Перезаполняем список выделенных областей на текущей странице
-        self.selections = [sel for sel in self.selections_all if sel.pno in (-1, pno)]
+        # Перезаполняем список выделенных областей на текущей странице (по индексу, без обхода всех выделений)
+        self.selections = self._selection_index.page_selections(pno)
+        self._hit_grid = None
 
-        # В цикле пересчитываем "эталонные" координаты выделенных областей в экранные
-        for sel in self.selections:
-            sel.update_rect(self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+        # Пересчитываем "эталонные" координаты выделенных областей в экранные
+        update_rects(self.selections, self.scr_w, self.scr_h, self.ref_w, self.ref_h)
 
         # Эмитируем сигнал об изменении фокуса на выделенной области
         self.rect_selected.emit(False)
         # Эмитируем сигнал об изменении страницы
         self.current_page_changed.emit(pno)
 
+    def _get_ref_image(self, rect: QRect = None) -> QImage:
+        """Отрендерить изображение текущей страницы (или ее области) в "эталонном" разрешении
+
+        Args:
+            rect (QRect, optional): область в "эталонной" системе координат. Defaults to None - вся страница.
+        """
+        if rect is None:
+            return self._get_page_pixmap(self._current_page, self._dpi).toImage()
+
+        # Рендерим только указанную область (размер изображения не зависит от размера страницы)
+        clip = fitz.Rect(rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height()) / self._matrix
+        pix = self._doc[self._current_page].get_pixmap(
+            alpha=False, matrix=self._matrix, clip=clip, colorspace=fitz.csRGB
+        )
+        return QImage(pix.samples_mv, pix.width, pix.height, pix.width * 3, QImage.Format_RGB888).copy()
+
+    def _get_render_dpi(self) -> int:
+        """DPI для рендеринга страницы на экран при текущем масштабе (не больше "эталонного")"""
+        # При масштабе 100% изображение с "эталонным" DPI уменьшается в 3 раза (т.е. до 96 DPI)
+        need_dpi = self._dpi / 3 * self._scale_factor * self.devicePixelRatioF()
+        for dpi in RENDER_DPI_STEPS:
+            if dpi >= need_dpi:
+                return min(dpi, self._dpi)
+        return self._dpi
+
+    def _page_cache_key(self, pno: int, dpi: int) -> tuple:
+        """Ключ изображения страницы в кэше (индекс страницы, угол поворота, DPI)"""
+        return pno, self._page_rotation(pno), dpi
+
+    def _page_rotation(self, pno: int) -> int:
+        """Угол поворота страницы (к объекту страницы обращаемся только при первом запросе)"""
+        rotation = self._page_rotations.get(pno)
+        if rotation is None:
+            rotation = self._page_rotations[pno] = self._doc[pno].rotation
+        return rotation
+
+    def _get_page_pixmap(self, pno: int, dpi: int) -> QPixmap:
+        """Получить изображение страницы с указанным DPI из кэша, либо отрендерить его и поместить в кэш"""
+        key = self._page_cache_key(pno, dpi)
+        pixmap = self._page_cache.get(key)
+        if pixmap is None:
+            # Рендерим изображение
+            zoom = dpi / 72
+            pix = self._doc[pno].get_pixmap(alpha=False, matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB)
+            # Переводим изображение в QPixmap (данные копируются, поэтому pix можно освобождать)
+            new_image = QImage(pix.samples_mv, pix.width, pix.height, pix.width * 3, QImage.Format_RGB888)
+            pixmap = QPixmap.fromImage(new_image)
+            self._page_cache.put(key, pixmap, pixmap.width() * pixmap.height() * pixmap.depth() // 8)
+        return pixmap
+
+    def _prefetch_pages(self):
+        """Упреждающий рендеринг следующей и предыдущей страниц (по одной странице за срабатывание таймера)"""
+        # Документ закрыт или виджет заблокирован (документ может использоваться длительной операцией)
+        if self._doc is None or self._current_page == -1 or not self.isEnabled():
+            return
+
+        dpi = self._get_render_dpi()
+        for pno in (self._current_page + 1, self._current_page - 1):
+            # Очень большие страницы заранее не рендерим - они выводятся тайлами
+            if not 0 <= pno < self._doc.page_count or self._is_tiled_page(pno, dpi):
+                continue
+            if self._page_cache_key(pno, dpi) not in self._page_cache:
+                self._get_page_pixmap(pno, dpi)
+                # Остальные страницы отрендерим при следующем срабатывании таймера
+                self._prefetch_timer.start()
+                return
+
+    def _is_tiled_page(self, pno: int, dpi: int) -> bool:
+        """Страница при указанном DPI настолько велика, что ее нужно выводить тайлами"""
+        render_rect = (self._doc[pno].rect * fitz.Matrix(dpi / 72, dpi / 72)).irect
+        return render_rect.width * render_rect.height > TILED_MIN_PIXELS
+
+    def _get_preview_dpi(self, pno: int, dpi: int) -> int:
+        """DPI уменьшенного изображения очень большой страницы (не больше TILED_PREVIEW_PIXELS пикселей)"""
+        page_rect = self._doc[pno].rect
+        preview_dpi = int(72 * math.sqrt(TILED_PREVIEW_PIXELS / (page_rect.width * page_rect.height)))
+        return min(max(preview_dpi, 1), dpi)
+
+    def _set_page_image(self, pno: int, dpi: int):
+        """Установить изображение страницы с указанным DPI в виджет страницы. Очень большие страницы
+        выводятся в виде уменьшенного изображения, поверх которого рисуются тайлы видимой области
+        """
+        # Сбрасываем очередь тайлов предыдущего изображения
+        self._tiles_queue.clear()
+
+        if self._is_tiled_page(pno, dpi):
+            self._page_widget.setPixmap(self._get_page_pixmap(pno, self._get_preview_dpi(pno, dpi)))
+
+            render_rect = (self._doc[pno].rect * fitz.Matrix(dpi / 72, dpi / 72)).irect
+            self._tiles_size = (render_rect.width, render_rect.height)
+            self._tiles_rotation = self._page_rotation(pno)
+            self._tiles_dpi = dpi
+        else:
+            self._page_widget.setPixmap(self._get_page_pixmap(pno, dpi))
+            self._tiles_dpi = 0
+
+        self._render_dpi = dpi
+        self._page_widget.update()
+
+    @property
+    def is_tiled(self) -> bool:
+        """Текущая страница выводится тайлами"""
+        return self._tiles_dpi > 0
+
+    def draw_tiles(self, painter: QPainter, rect: QRect):
+        """Вывести отрендеренные тайлы текущей страницы, попадающие в перерисовываемую область виджета
+        страницы. Недостающие тайлы ставятся в очередь на рендеринг
+
+        Args:
+            painter (QPainter): объект QPainter виджета страницы
+            rect (QRect): перерисовываемая область в системе координат виджета страницы
+        """
+        tiles_w, tiles_h = self._tiles_size
+        # Коэффициенты пересчета пикселей изображения с DPI тайлов в экранные
+        kx = self.scr_w / tiles_w
+        ky = self.scr_h / tiles_h
+
+        # Диапазоны индексов тайлов, попадающих в перерисовываемую область
+        tx0 = max(int(rect.left() / kx) // TILE_SIZE, 0)
+        tx1 = min(int(rect.right() / kx) // TILE_SIZE, (tiles_w - 1) // TILE_SIZE)
+        ty0 = max(int(rect.top() / ky) // TILE_SIZE, 0)
+        ty1 = min(int(rect.bottom() / ky) // TILE_SIZE, (tiles_h - 1) // TILE_SIZE)
+
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                key = (self._current_page, self._tiles_rotation, self._tiles_dpi, tx, ty)
+                tile = self._tile_cache.get(key)
+                if tile is None:
+                    # Тайла еще нет - на его месте остается уменьшенное изображение
+                    if key not in self._tiles_queue:
+                        self._tiles_queue.append(key)
+                    continue
+                target = QRectF(tx * TILE_SIZE * kx, ty * TILE_SIZE * ky, tile.width() * kx, tile.height() * ky)
+                painter.drawPixmap(target, tile, QRectF(tile.rect()))
+
+        if self._tiles_queue:
+            self._tile_timer.start()
+
+    def _render_next_tile(self):
+        """Рендеринг очередного тайла из очереди и перерисовка его области"""
+        # Документ закрыт или виджет заблокирован (документ может использоваться длительной операцией)
+        if self._doc is None or self._current_page == -1 or not self.isEnabled() or not self._tiles_queue:
+            return
+
+        key = self._tiles_queue.pop(0)
+        pno, rotation, dpi, tx, ty = key
+
+        # Тайл для страницы/поворота/DPI, которые уже не отображаются, не рендерим
+        if pno == self._current_page and rotation == self._tiles_rotation and dpi == self._tiles_dpi:
+            page = self._doc[pno]
+            tiles_w, tiles_h = self._tiles_size
+            zoom = dpi / 72
+            # Область тайла в пикселях и в системе координат (повернутой) страницы
+            x0, y0 = tx * TILE_SIZE, ty * TILE_SIZE
+            x1, y1 = min(x0 + TILE_SIZE, tiles_w), min(y0 + TILE_SIZE, tiles_h)
+            clip = fitz.Rect(x0, y0, x1, y1) / zoom
+
+            pix = page.get_pixmap(alpha=False, matrix=fitz.Matrix(zoom, zoom), clip=clip, colorspace=fitz.csRGB)
+            tile = QPixmap.fromImage(QImage(pix.samples_mv, pix.width, pix.height, pix.width * 3, QImage.Format_RGB888))
+            self._tile_cache.put(key, tile, tile.width() * tile.height() * tile.depth() // 8)
+
+            # Перерисовываем область тайла на экране
+            kx = self.scr_w / tiles_w
+            ky = self.scr_h / tiles_h
+            self._page_widget.update(
+                QRectF(x0 * kx, y0 * ky, (x1 - x0) * kx, (y1 - y0) * ky).toAlignedRect().adjusted(-1, -1, 1, 1)
+            )
+
+        if self._tiles_queue:
+            self._tile_timer.start()
+
+    @property
+    def is_continuous(self) -> bool:
+        """Режим непрерывной прокрутки всех страниц документа"""
+        return self._is_continuous
+
+    def set_continuous_mode(self, is_continuous: bool):
+        """Включить/выключить режим непрерывной прокрутки всех страниц документа"""
+        if self._is_continuous == is_continuous:
+            return
+        self._is_continuous = is_continuous
+
+        # Если документ не открыт, то режим применится при его открытии
+        if self._current_page == -1:
+            return
+
+        if not is_continuous:
+            # Возвращаем в пул все виджеты страниц, кроме текущей
+            self._release_preview_labels(set())
+            self.verticalScrollBar().setValue(0)
+
+        # Перестраиваем размещение страниц и прокручиваем к текущей странице
+        self._set_sizes()
+        if is_continuous:
+            self._scroll_to_page(self._current_page)
+
+    def _get_ref_sizes(self) -> list:
+        """Размеры всех страниц документа в "эталонной" системе координат (с учетом их поворота)
+
+        Returns:
+            list: список (ширина, высота) или пустой список, если размеры еще не определены, а виджет
+                  заблокирован (документ может использоваться длительной операцией)
+        """
+        if self._ref_sizes is None:
+            if not self.isEnabled():
+                return []
+            self._ref_sizes = []
+            for page in self._doc:
+                ref_rect = (page.rect * self._matrix).irect
+                self._ref_sizes.append((ref_rect.width, ref_rect.height))
+        return self._ref_sizes
+
+    def _layout_pages(self):
+        """Размещение всех страниц документа друг под другом на виджете-контейнере
+        (режим непрерывной прокрутки)
+        """
+        # Размеры страниц пока недоступны - страницы будут размещены после разблокировки виджета
+        ref_sizes = self._get_ref_sizes()
+        if not ref_sizes:
+            return
+
+        # Определяем экранные размеры и вертикальные смещения всех страниц
+        ww = self.viewport().width()
+        y = PAGE_MARGIN
+        self._page_offsets = []
+        self._page_sizes = []
+        for ref_w, ref_h in ref_sizes:
+            size = self._scale_factor / 3 * QSize(ref_w, ref_h)
+            self._page_offsets.append(y)
+            self._page_sizes.append(size)
+            ww = max(ww, size.width() + 2 * PAGE_MARGIN)
+            y += size.height() + PAGE_MARGIN
+
+        # Записываем полученные значения в размеры виджета-контейнера страниц
+        self._board_widget.setFixedHeight(max(self.viewport().height(), y + PAGE_MARGIN))
+        self._board_widget.setFixedWidth(ww)
+
+        # Виджет текущей страницы размещаем на месте этой страницы
+        self._page_widget.move((ww - self._page_widget.width()) // 2, self._page_offsets[self._current_page])
+
+        # Обновляем виджеты видимых страниц
+        self._update_visible_pages()
+
+    def _get_preview_pixmap(self, pno: int, dpi: int) -> QPixmap:
+        """Изображение нетекущей страницы для режима непрерывной прокрутки
+        (для очень больших страниц - уменьшенное)
+        """
+        if self._is_tiled_page(pno, dpi):
+            dpi = self._get_preview_dpi(pno, dpi)
+        return self._get_page_pixmap(pno, dpi)
+
+    def _update_visible_pages(self, is_rerender: bool = False):
+        """Показать изображения нетекущих страниц, попадающих в область просмотра (с запасом
+        в половину ее высоты), и вернуть в пул виджеты страниц, вышедших из нее
+
+        Args:
+            is_rerender (bool, optional): перерендерить изображения, DPI которых не соответствует
+                                          текущему масштабу. Defaults to False.
+        """
+        if not self._is_continuous or not self._page_offsets:
+            return
+
+        # Виджет заблокирован (документ может использоваться длительной операцией) - изображения
+        # страниц обновятся после разблокировки
+        if not self.isEnabled():
+            return
+
+        # Определяем диапазон видимых страниц
+        margin = self.viewport().height() // 2
+        top = self.verticalScrollBar().value() - margin
+        bottom = self.verticalScrollBar().value() + self.viewport().height() + margin
+        visible = set()
+        pno = self._page_at(top)
+        while pno < len(self._page_offsets) and self._page_offsets[pno] < bottom:
+            if pno != self._current_page and self._page_offsets[pno] + self._page_sizes[pno].height() > top:
+                visible.add(pno)
+            pno += 1
+
+        # Возвращаем в пул виджеты страниц, которые больше не видны
+        self._release_preview_labels(visible)
+
+        dpi = self._get_render_dpi()
+        ww = self._board_widget.width()
+        for pno in sorted(visible):
+            label, key = self._preview_labels.get(pno, (None, None))
+            if label is None:
+                # Берем виджет из пула или создаем новый
+                label = self._labels_pool.pop() if self._labels_pool else self._create_preview_label()
+
+            # Изображение рендерим для новых виджетов, после поворота страницы, а при is_rerender -
+            # и после изменения масштаба (пока масштаб меняется, изображение растягивается)
+            new_key = self._page_cache_key(pno, dpi)
+            if key is None or key[:2] != new_key[:2] or (is_rerender and key != new_key):
+                label.setPixmap(self._get_preview_pixmap(pno, dpi))
+                key = new_key
+            self._preview_labels[pno] = (label, key)
+
+            size = self._page_sizes[pno]
+            label.setGeometry((ww - size.width()) // 2, self._page_offsets[pno], size.width(), size.height())
+            label.show()
+
+    def _create_preview_label(self) -> QLabel:
+        """Создать виджет для отображения нетекущей страницы (режим непрерывной прокрутки)"""
+        label = QLabel(self._board_widget)
+        label.setBackgroundRole(QPalette.ColorRole.Base)
+        label.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        label.setScaledContents(True)
+        # Нажатия мыши обрабатывает виджет-контейнер (делает страницу текущей)
+        label.setAttribute(Qt.WA_TransparentForMouseEvents)
+        return label
+
+    def _release_preview_labels(self, visible: set):
+        """Вернуть в пул виджеты нетекущих страниц, не входящих в множество visible"""
+        for pno in [pno for pno in self._preview_labels if pno not in visible]:
+            label, _ = self._preview_labels.pop(pno)
+            label.hide()
+            label.clear()
+            self._labels_pool.append(label)
+
+    def _page_at(self, y: int) -> int:
+        """Индекс страницы, на которую приходится вертикальная координата y виджета-контейнера"""
+        return max(bisect.bisect_right(self._page_offsets, y) - 1, 0)
+
+    def _scroll_to_page(self, pno: int):
+        """Прокрутить область просмотра к началу страницы (режим непрерывной прокрутки)"""
+        self._is_page_scrolling = True
+        try:
+            self.verticalScrollBar().setValue(self._page_offsets[pno] - PAGE_MARGIN)
+        finally:
+            self._is_page_scrolling = False
+        self._update_visible_pages()
+
+    def _on_vertical_scroll(self, value: int):
+        """Обработчик прокрутки по вертикали (режим непрерывной прокрутки)"""
+        if not self._is_continuous or self._current_page == -1 or not self._page_offsets:
+            return
+
+        self._update_visible_pages()
+
+        # При программной прокрутке к странице текущую страницу не меняем, как и при заблокированном
+        # виджете (документ может использоваться длительной операцией)
+        if self._is_page_scrolling or not self.isEnabled():
+            return
+
+        # Текущей становится страница, на которую приходится верхняя треть области просмотра
+        pno = self._page_at(value + self.viewport().height() // 3)
+        if pno != self._current_page:
+            self._show_page(pno)
+
+    def activate_page_at(self, pos: QPoint) -> bool:
+        """Сделать текущей нетекущую страницу, на которую приходится точка pos виджета-контейнера
+        (режим непрерывной прокрутки)
+
+        Returns:
+            bool: True, если текущая страница сменилась
+        """
+        if not self._is_continuous or self._current_page == -1 or not self._page_offsets:
+            return False
+
+        pno = self._page_at(pos.y())
+        if pno == self._current_page or pos.y() > self._page_offsets[pno] + self._page_sizes[pno].height():
+            return False
+
+        self._show_page(pno)
+        return True
+
+    def _update_page_pixmap(self):
+        """Перерендерить изображение текущей страницы, если его DPI не соответствует текущему масштабу"""
+        # Документ закрыт или виджет заблокирован (документ может использоваться длительной операцией)
+        if self._doc is None or self._current_page == -1 or not self.isEnabled():
+            return
+
+        # Перерендериваем изображения видимых нетекущих страниц (режим непрерывной прокрутки)
+        self._update_visible_pages(True)
+
+        dpi = self._get_render_dpi()
+        if dpi != self._render_dpi:
+            # Экранный размер виджета не меняется, поэтому экранные координаты выделений остаются прежними
+            self._set_page_image(self._current_page, dpi)
+
     def _update_size(self, is_update_selections: bool = True):
         """Обновляем экранный размер отображения страницы исходя из установленного масштаба
 
@@ -1081,7 +1767,7 @@ class SiaPdfView(QScrollArea):
             is_update_selections (bool, optional): обновить экранные размеры выделенных областей. Defaults to True.
         """
         # Определяем размеры отображения страницы на экране исходя из текущего масштаба
-        new_size = self._scale_factor / 3 * self._page_widget.pixmap().size()
+        new_size = self._scale_factor / 3 * QSize(self.ref_w, self.ref_h)
         # Устанавливаем размеры отображения страницы на экране
         self._page_widget.resize(new_size)
         # Изменяем размер виджета-контейнера страницы
@@ -1095,8 +1781,8 @@ class SiaPdfView(QScrollArea):
             return
 
         # Обновляем экранные размеры выделенных областей исходя из "эталонных" значений
-        for sel in self.selections:
-            sel.update_rect(self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+        update_rects(self.selections, self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+        self._hit_grid = None
 
     def scale_image(self, factor, wheel_mouse_pos=None, newscale=1.0):
         """Масштабировать изображение страницы
@@ -1141,13 +1827,20 @@ class SiaPdfView(QScrollArea):
         src_point.setX(src_point.x() * factor)
         src_point.setY(src_point.y() * factor)
 
-        # Изменяем экранный размер отображения страницы исходя из установленного масштаба
-        self._update_size()
-
-        # Эмитируем сигнал об изменении масштаба
-        self.zoom_factor_changed.emit(self._scale_factor)
-        # Эмитируем сигнал о необходимости сдвинуть содержимое корневого виджета исходя из двух переданных координат
-        self.scroll_requested.emit(src_point, dest_point)
+        # Пока размещение страниц меняется, текущую страницу по положению прокрутки не определяем
+        self._is_page_scrolling = True
+        try:
+            # Изменяем экранный размер отображения страницы исходя из установленного масштаба
+            # (пока масштаб меняется, изображение растягивается, а после - перерендеривается с подходящим DPI)
+            self._update_size()
+            self._rerender_timer.start()
+
+            # Эмитируем сигнал об изменении масштаба
+            self.zoom_factor_changed.emit(self._scale_factor)
+            # Эмитируем сигнал о необходимости сдвинуть содержимое корневого виджета исходя из двух переданных координат
+            self.scroll_requested.emit(src_point, dest_point)
+        finally:
+            self._is_page_scrolling = False
 
     def set_selection_points(self, pt: QPoint, nm: int):
         """Установить координаты текущей выделенной области в соответствии с переданной координатой положения
@@ -1299,6 +1992,16 @@ class SiaPdfView(QScrollArea):
         if self._current_page != -1:
             self._set_sizes()
 
+    def changeEvent(self, event: QEvent):
+        """Обработчик изменения состояния виджета"""
+        super().changeEvent(event)
+        # После разблокировки виджета (окончания длительной операции) выполняем размещение и рендеринг
+        # страниц, отложенные на время блокировки (например, при изменении размеров окна)
+        if event.type() == QEvent.EnabledChange and self.isEnabled() and self._current_page != -1:
+            if self._is_continuous:
+                self._layout_pages()
+            self._update_page_pixmap()
+
     def keyPressEvent(self, event: QKeyEvent):
         """Обработчик нажатия клавиши клавиатуры"""
         key = event.key()
@@ -1428,6 +2131,7 @@ class SiaPdfView(QScrollArea):
 
         # Обновляем координаты выделения
         self.selections[self.selected_rect].update_rect_ref(self.scr_w, self.scr_h, self.ref_w, self.ref_h)
+        self.invalidate_hit_grid()
 
         # Обновляем экран
         self._page_widget.update()
@@ -1470,7 +2174,7 @@ class SiaPdfView(QScrollArea):
         if val > 0:
             # Прокручивание страницы вверх
             self.verticalScrollBar().setValue(before - delta)
-            if before != self.verticalScrollBar().value() or self._current_page == 0:
+            if self._is_continuous or before != self.verticalScrollBar().value() or self._current_page == 0:
                 return
             # Перелистывание страницы назад
             self.goto_prev_page()
@@ -1479,7 +2183,11 @@ class SiaPdfView(QScrollArea):
         elif val < 0:
             # Прокручивание страницы вниз
             self.verticalScrollBar().setValue(before + delta)
-            if before != self.verticalScrollBar().value() or self._current_page == self.page_count - 1:
+            if (
+                self._is_continuous
+                or before != self.verticalScrollBar().value()
+                or self._current_page == self.page_count - 1
+            ):
                 return
             # Перелистывание страницы вперед
             self.goto_next_page()
@@ -1520,6 +2228,10 @@ class BoardWidget(QWidget):
         # Корневой виджет
         m_root_widget = self._root_widget
 
+        # В режиме непрерывной прокрутки нажатие на нетекущую страницу делает ее текущей
+        if m_root_widget.activate_page_at(event.pos()):
+            return
+
         # Определяем положение мыши в системе координат страницы документа
         pt = self._page_widget.mapFromParent(event.pos())
 
@@ -1560,8 +2272,8 @@ class BoardWidget(QWidget):
 
         # Нет (или не стало) фокуса на выделении?
         if m_root_widget.selected_rect == -1:
-            # Перебираем все выделения на странице
-            for i, r in enumerate(m_root_widget.selections):
+            # Перебираем выделения на странице, в зоне досягаемости которых может находиться указатель
+            for i, r in m_root_widget.selections_near(pt):
                 # Проверяем как соотносится положение мыши с выделенной областью
                 dir_rect = r.get_dir_rect(pt)
                 if dir_rect == DIR_IN:  # внутри
@@ -1603,6 +2315,9 @@ class BoardWidget(QWidget):
             # Добавляем новую выделенную область в списки
             m_root_widget.selections.append(newsel)
             m_root_widget.selections_all.append(newsel)
+            m_root_widget.index_selection(newsel)
+            # В журнал выделение попадет после отпускания кнопки мыши (если оно не окажется слишком маленьким)
+            m_root_widget.new_selection = newsel
             # Переходим в режим перемещения угла
             m_root_widget.move_mode = MODE_MOVE_CORNER
             # "Фиксируем" начальный угол нового выделения
@@ -1620,8 +2335,8 @@ class BoardWidget(QWidget):
         # По умолчанию такое вот значение
         cursor_shape = Qt.CursorShape.BlankCursor
 
-        # Перебираем все выделенные области
-        for i, r in enumerate(self._root_widget.selections):
+        # Перебираем выделенные области, в зоне досягаемости которых может находиться указатель
+        for i, r in self._root_widget.selections_near(pt):
             # Определяем местоположение указателя мыши по отношению к этой выделенной области
             dir_rect = r.get_dir_rect(pt)
 
@@ -1698,15 +2413,16 @@ class BoardWidget(QWidget):
 
             # Находились в режим перемещения угла или середины выделения (изменения размера)
             if root_widget.move_mode in (MODE_MOVE_CORNER, MODE_MOVE_VERT_BORDER, MODE_MOVE_HOR_BORDER):
+                sel = root_widget.selections[root_widget.selected_rect]
                 # Обновляем "эталонные" координаты выделенной области (исходя из новых экранных)
-                root_widget.selections[root_widget.selected_rect].update_rect_ref(
-                    root_widget.scr_w, root_widget.scr_h, root_widget.ref_w, root_widget.ref_h
-                )
+                sel.update_rect_ref(root_widget.scr_w, root_widget.scr_h, root_widget.ref_w, root_widget.ref_h)
                 # Если размер области слишком мал, то ликвидируем его
-                if root_widget.selections[root_widget.selected_rect].is_null:
-                    ind = root_widget.selections_all.index(root_widget.selections[root_widget.selected_rect])
+                if sel.is_null:
+                    # Удаление существующего выделения записываем в журнал (новое в него еще не попало)
+                    if sel is not root_widget.new_selection:
+                        root_widget.record_selections_change(CH_REMOVE_SELECTIONS, [sel])
                     # удаляем из общего списка
-                    root_widget.selections_all.pop(ind)
+                    root_widget.drop_selection(sel)
                     # удаляем из списка выделений текущего окна
                     root_widget.selections.pop(root_widget.selected_rect)
                     # сбрасываем индекс
@@ -1715,6 +2431,9 @@ class BoardWidget(QWidget):
                     self._page_widget.update()
                     # эмитируем сигнал rect_selected
                     root_widget.rect_selected.emit(False)
+                elif sel is root_widget.new_selection:
+                    # Новое выделение создано - записываем его в журнал
+                    root_widget.record_selections_change(CH_ADD_SELECTIONS, [sel])
 
             # Находимся в режим перемещения всего выделения
             elif root_widget.move_mode == MODE_MOVE_ALL:
@@ -1725,6 +2444,9 @@ class BoardWidget(QWidget):
 
             # Сбрасываем режим перемещения
             root_widget.move_mode = MODE_MOVE_NONE
+            root_widget.new_selection = None
+            # Координаты выделений могли измениться - сетку поиска под указателем мыши надо перестроить
+            root_widget.invalidate_hit_grid()
             # Обновляем форму курсора исходя из положения мыши в системе координат страницы документа
             self.set_cursor_shape(self._page_widget.mapFromParent(event.pos()))
 
@@ -1785,6 +2507,13 @@ class PageWidget(QLabel):  # pylint: disable=too-many-instance-attributes
         """Обработчик события прорисовки виджета"""
         super().paintEvent(event)
 
+        # Для очень больших страниц поверх уменьшенного изображения выводим тайлы видимой области
+        if self._root_widget.is_tiled:
+            painter = QPainter()
+            painter.begin(self)
+            self._root_widget.draw_tiles(painter, event.rect())
+            painter.end()
+
         # Если на странице нет выделенных областей, то сразу выходим
         if not self._root_widget.selections:
             return
@@ -8,6 +8,9 @@ import re
 import fitz
 import xlsxwriter
 
+from textcache import get_page_textbox
+from textcache import get_page_words
+
 
 # Константы для описания характеристик узлов сетки таблицы
 NODE_DIR_UP = 1
@@ -115,11 +118,12 @@ def make_text(words):
     return "\n".join([" ".join(line[1]) for line in lines])
 
 
-def parse_page_tables(page, worksheet, start_row, cell_format, strong: bool = True):  # noqa: ignore=C901
+def parse_page_tables(doc, pno: int, worksheet, start_row, cell_format, strong: bool = True):  # noqa: ignore=C901
     """Анализ и разбор табличных данных на странице файла PDF и добавление их на лист файла XLSX
 
     Args:
-        page (object): сраница файла PDF
+        doc (object): файл PDF (объект fitz document)
+        pno (int): индекс страницы файла PDF
         worksheet (object): лист файла XLSX
         start_row (int): строка листа файла XLSX, с которой начнется добавление данных
         cell_format (object): формат ячеек файла XLSX
@@ -129,6 +133,7 @@ def parse_page_tables(page, worksheet, start_row, cell_format, strong: bool = Tr
     Returns:
         int: количество добавленных на лист файла XLSX строк
     """
+    page = doc[pno]  # страница файла PDF
     min_delta = 1  # Погрешность x и y, в пределах которой дополнительные наравляющие не создаются
     rm = page.rotation_matrix  # матрица для переворота исходных координат документа в отображаемые на экране
 
@@ -282,7 +287,8 @@ def parse_page_tables(page, worksheet, start_row, cell_format, strong: bool = Tr
                                 # типа оптимистический вариант, без вложенных областей
                                 if nodes[rdx2][cdx2] & NODE_DIR_LEFT:  # найден нижний правый узел
                                     rc = fitz.Rect([vert_cdx, hori_rdx, vert[cdx2], hori[rdx2]]) / rm
-                                    recttext = page.get_text("text", clip=rc).rstrip()
+                                    # текст берем из один раз разобранного текстового слоя страницы
+                                    recttext = get_page_textbox(doc, pno, rc).rstrip()
                                     recttext = re.sub(r'\s+', ' ', recttext)
                                     if (rdx2 > rdx + 1) or (cdx2 > cdx + 1):
                                         # отлавливаем ошибку, т.к. в некоторых таблицах могут быть пересечения областей
@@ -303,7 +309,7 @@ def parse_page_tables(page, worksheet, start_row, cell_format, strong: bool = Tr
                             break
 
     else:  # упрощенный режим - шинковка по направляющим, без учета "объединенности" ячеек
-        words = page.get_text("words")  # получаем список всех слов на странице
+        words = get_page_words(doc, pno)  # получаем список всех слов на странице
         # переводим в "экранные" координаты
         transwords = []
         for w in words:
@@ -361,9 +367,9 @@ def parse_tables(doc, xlsfile: str, strong: bool = True, progress_callback=None)
     current_row = 0  # Текущая строка таблицы Excel
 
     # Обходим все страницы файла PDF
-    for pno, page in enumerate(doc):
+    for pno in range(page_count):
         # Добавляем на лист данные из текущей страницы
-        current_row += parse_page_tables(page, worksheet, current_row, cell_format, strong)
+        current_row += parse_page_tables(doc, pno, worksheet, current_row, cell_format, strong)
 
         # Вызываем callback функцию для обновления прогрессбара
         if progress_callback is not None:
@@ -0,0 +1,134 @@
+"""
+Этот файл содержит кэш текстового слоя страниц документов PDF. Текстовый слой страницы разбирается
+один раз (одним объектом fitz.TextPage), а полученные из него слова и текст используются при
+деперсонификации, экспорте реестра ПД и анализе таблиц. Кэш документа освобождается при его закрытии
+"""
+
+from collections import deque
+
+import fitz
+
+
+# Флаги разбора текстового слоя (те же, что по умолчанию используются в page.get_text для "text" и "words")
+TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+
+# Количество страниц, для которых хранятся сами объекты fitz.TextPage (они занимают много памяти
+# и нужны только для извлечения текста из произвольных участков страницы)
+TEXTPAGE_CACHE_PAGES = 4
+
+
+class PageText:
+    """Разобранный текстовый слой страницы"""
+
+    def __init__(self, textpage):
+        self.words = textpage.extractWORDS()  # Слова с координатами (как page.get_text("words"))
+        self.text = textpage.extractText()  # Текст страницы (как page.get_text("text"))
+        self.textpage = textpage  # Объект fitz.TextPage (None - уже вытеснен из кэша)
+
+
+class TextCache:
+    """Кэш текстового слоя страниц документов. Слова и текст хранятся до закрытия документа,
+    объекты fitz.TextPage - только для нескольких последних страниц
+    """
+
+    def __init__(self, max_textpages: int = TEXTPAGE_CACHE_PAGES):
+        # Текстовый слой по документам {id документа: (документ, {(индекс страницы, small_glyph_heights): PageText})}
+        # (режим small_glyph_heights влияет на координаты слов, поэтому входит в ключ). Документ хранится
+        # вместе с текстовым слоем, чтобы до освобождения (release) его id не мог достаться другому документу
+        self._docs = {}
+        self._max_textpages = max_textpages
+        self._textpages = deque()  # Страницы с сохраненными объектами fitz.TextPage в порядке их разбора
+
+    def __len__(self) -> int:
+        return sum(len(pages) for _, pages in self._docs.values())
+
+    def get(self, doc, pno: int, with_textpage: bool = False) -> PageText:
+        """Получение текстового слоя страницы (при отсутствии в кэше - с разбором страницы)
+
+        Args:
+            doc (fitz doc): документ PDF
+            pno (int): индекс страницы
+            with_textpage (bool): нужен объект fitz.TextPage (если он уже вытеснен, страница разбирается заново)
+
+        Returns:
+            PageText: текстовый слой страницы
+        """
+        pages = self._docs.setdefault(id(doc), (doc, {}))[1]
+        key = (pno, fitz.TOOLS.set_small_glyph_heights())
+        page_text = pages.get(key)
+        if page_text is not None and (page_text.textpage is not None or not with_textpage):
+            return page_text
+
+        textpage = doc[pno].get_textpage(flags=TEXT_FLAGS)
+        if page_text is None:
+            page_text = pages[key] = PageText(textpage)
+        else:
+            page_text.textpage = textpage
+
+        # Вытесняем объекты fitz.TextPage самых "старых" страниц
+        self._textpages.append(page_text)
+        while len(self._textpages) > self._max_textpages:
+            self._textpages.popleft().textpage = None
+        return page_text
+
+    def release(self, doc):
+        """Освобождение текстового слоя документа (при его закрытии)"""
+        _, pages = self._docs.pop(id(doc), (None, None))
+        if pages:
+            for page_text in pages.values():
+                page_text.textpage = None
+            self._textpages = deque(page_text for page_text in self._textpages if page_text.textpage is not None)
+
+    def clear(self):
+        """Очистка кэша"""
+        self._docs.clear()
+        self._textpages.clear()
+
+
+# Общий кэш текстового слоя
+_text_cache = TextCache()
+
+
+def get_page_words(doc, pno: int) -> list:
+    """Слова страницы с координатами (то же, что page.get_text("words"))
+
+    Args:
+        doc (fitz doc): документ PDF
+        pno (int): индекс страницы
+
+    Returns:
+        list: список (x0, y0, x1, y1, слово, номер блока, номер строки, номер слова)
+    """
+    return list(_text_cache.get(doc, pno).words)
+
+
+def get_page_text(doc, pno: int) -> str:
+    """Текст страницы (то же, что page.get_text("text"))
+
+    Args:
+        doc (fitz doc): документ PDF
+        pno (int): индекс страницы
+
+    Returns:
+        str: текст страницы
+    """
+    return _text_cache.get(doc, pno).text
+
+
+def get_page_textbox(doc, pno: int, rect) -> str:
+    """Текст участка страницы (аналог page.get_text("text", clip=rect) без повторного разбора страницы)
+
+    Args:
+        doc (fitz doc): документ PDF
+        pno (int): индекс страницы
+        rect (fitz.Rect): участок страницы
+
+    Returns:
+        str: текст участка страницы
+    """
+    return _text_cache.get(doc, pno, True).textpage.extractTextbox(rect)
+
+
+def release_document_text(doc):
+    """Освобождение текстового слоя документа из общего кэша (при закрытии документа)"""
+    _text_cache.release(doc)
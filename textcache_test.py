@@ -0,0 +1,62 @@
+import unittest
+
+import fitz
+
+from textcache import TextCache
+
+
+class TestTextCache(unittest.TestCase):
+    def setUp(self):
+        self.doc = fitz.open()
+        for i in range(3):
+            page = self.doc.new_page()
+            page.insert_text((50, 80), f'Page {i} first line')
+            page.insert_text((50, 200), f'Second line {i}')
+        self.cache = TextCache(max_textpages=2)
+
+    def tearDown(self):
+        self.doc.close()
+
+    def test_same_as_get_text(self):
+        for pno in range(len(self.doc)):
+            page_text = self.cache.get(self.doc, pno)
+            self.assertEqual(page_text.words, self.doc[pno].get_text('words'))
+            self.assertEqual(page_text.text, self.doc[pno].get_text('text'))
+
+    def test_page_parsed_once(self):
+        page_text = self.cache.get(self.doc, 0)
+        self.assertIs(self.cache.get(self.doc, 0), page_text)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_textpage_eviction(self):
+        first = self.cache.get(self.doc, 0)
+        self.cache.get(self.doc, 1)
+        self.cache.get(self.doc, 2)
+        self.assertIsNone(first.textpage)
+        # Объект fitz.TextPage пересоздается по требованию, слова и текст остаются прежними
+        self.assertIs(self.cache.get(self.doc, 0, True), first)
+        self.assertIsNotNone(first.textpage)
+        self.assertEqual(first.textpage.extractTextbox(fitz.Rect(40, 60, 300, 90)).strip(), 'Page 0 first line')
+
+    def test_release(self):
+        self.cache.get(self.doc, 0)
+        self.cache.get(self.doc, 1)
+        self.cache.release(self.doc)
+        self.assertEqual(len(self.cache), 0)
+        # Повторное освобождение (и освобождение документа, которого нет в кэше) ничего не делает
+        self.cache.release(self.doc)
+
+    def test_separate_documents(self):
+        other = fitz.open()
+        other.new_page().insert_text((50, 80), 'Other document')
+        try:
+            self.assertEqual(self.cache.get(other, 0).text, other[0].get_text('text'))
+            self.assertEqual(self.cache.get(self.doc, 0).text, self.doc[0].get_text('text'))
+            self.cache.release(other)
+            self.assertEqual(len(self.cache), 1)
+        finally:
+            other.close()
+
+
+if __name__ == '__main__':
+    unittest.main()